@@ -0,0 +1,185 @@
+"""
+Benchmark the assets scan on a generated fixture VPK set
+
+Writes --archives single-file VPKs into --fixture (kept between runs), each holding models,
+sounds, textures, a sound script and --pcfs particle files, then times:
+    legacy    serial scan, every PCF written to temp.pcf and loaded with valvepcf (if installed)
+    serial    serial scan, PCFs parsed in memory
+    parallel  process pool scan, PCFs parsed in memory
+    cold      parallel scan filling an empty cache
+    warm      cached scan after one archive changed and another was only touched
+
+Usage:
+    python benchmark.py [--archives 16] [--files 4000] [--pcfs 40] [--jobs N] [--fixture bench_fixture]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import uuid
+
+import vpk
+
+import parser as assets_parser
+
+PCF_HEADER = "<!-- dmx encoding binary 2 format pcf 1 -->\n"
+
+
+def build_pcf(systems):
+    """Binary DMX v2 PCF with a root element listing one particle system definition per name"""
+    strings = ['DmElement', 'DmeParticleSystemDefinition', 'particleSystemDefinitions', 'radius', 'material']
+    data = bytearray(PCF_HEADER.encode('ascii') + b'\0')
+    data += struct.pack('<H', len(strings))
+    for string in strings:
+        data += string.encode('ascii') + b'\0'
+
+    data += struct.pack('<I', 1 + len(systems))
+    data += struct.pack('<H', 0) + b'untitled\0' + uuid.uuid4().bytes
+    for name in systems:
+        data += struct.pack('<H', 1) + name.encode('ascii') + b'\0' + uuid.uuid4().bytes
+
+    data += struct.pack('<I', 1)
+    data += struct.pack('<HBI', 2, 15, len(systems)) + struct.pack(f'<{len(systems)}i', *range(1, len(systems) + 1))
+    for name in systems:
+        data += struct.pack('<I', 2)
+        data += struct.pack('<HBf', 3, 3, 5.0)
+        data += struct.pack('<HB', 4, 5) + f"effects/{name}.vmt".encode('ascii') + b'\0'
+
+    return bytes(data)
+
+
+def build_fixture(directory, archives, files, pcfs, seed=1):
+    """One tf/pakNN_dir.vpk per archive; returns the *dir.vpk paths"""
+    rng = random.Random(seed)
+    tf_dir = os.path.join(directory, 'tf')
+    os.makedirs(tf_dir, exist_ok=True)
+
+    paths = []
+    for archive in range(archives):
+        path = os.path.join(tf_dir, f"pak{archive:02}_dir.vpk")
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+
+        with tempfile.TemporaryDirectory() as source:
+            def put(name, content):
+                full_path = os.path.join(source, name)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'wb') as f:
+                    f.write(content)
+
+            for i in range(files):
+                kind = rng.choice(('models/props/prop_{}.mdl', 'sound/ambient/noise_{}.wav', 'materials/brick/wall_{}.vtf'))
+                put(kind.format(f"{archive}_{i}"), b'\0' * 16)
+            for i in range(pcfs):
+                systems = [f"system_{archive}_{i}_{j}" for j in range(rng.randint(20, 120))]
+                put(f"particles/effect_{archive}_{i}.pcf", build_pcf(systems))
+            put(f"scripts/game_sounds_{archive}.txt", ''.join(
+                f'"Fixture.Sound{archive}_{i}"\n{{\n\t"wave" "ambient/noise_{i}.wav"\n}}\n' for i in range(200)
+            ).encode('ascii'))
+
+            vpk.new(source).save(path)
+
+    return paths
+
+
+def toggle_file(vpk_file, name):
+    """Repack an archive with name added, or removed if it's already there; returns whether it was added"""
+    with tempfile.TemporaryDirectory() as source:
+        with vpk.open(vpk_file) as archive:
+            contents = {filepath: archive[filepath].read() for filepath in archive}
+        added = contents.pop(name, None) is None
+        if added:
+            contents[name] = b'\0' * 16
+        for filepath, content in contents.items():
+            full_path = os.path.join(source, filepath)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'wb') as f:
+                f.write(content)
+
+        vpk.new(source).save(vpk_file)
+
+    return added
+
+
+def scan_archive_legacy(vpk_file):
+    """The scan as it was: PCFs round-tripped through temp.pcf and valvepcf"""
+    import valvepcf
+
+    found = {kind: set() for kind in assets_parser.kinds}
+    temp_pcf = f"temp_{os.getpid()}.pcf"
+    with vpk.open(vpk_file) as archive:
+        for filepath in archive:
+            ext = os.path.splitext(filepath)[1].lower()
+            if ext in assets_parser.particle_exts:
+                with open(temp_pcf, 'wb') as out:
+                    out.write(archive[filepath].read())
+                found['particles'].update(system._name for system in valvepcf.Pcf(temp_pcf).systems)
+            elif ext in assets_parser.model_exts:
+                found['models'].add(filepath)
+    os.remove(temp_pcf)
+    return found
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assets scan benchmark")
+    parser.add_argument('--archives', type=int, default=16)
+    parser.add_argument('--files', type=int, default=4000, help="Non-particle files per archive")
+    parser.add_argument('--pcfs', type=int, default=40, help="Particle files per archive")
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--fixture', default='bench_fixture')
+    args = parser.parse_args()
+
+    paths, build_s = timed(build_fixture, args.fixture, args.archives, args.files, args.pcfs)
+    print(f"fixture: {len(paths)} archives in {args.fixture} ({build_s:.1f}s to build)")
+
+    (serial, _), serial_s = timed(assets_parser.scan, paths, 1, None)
+    (parallel, _), parallel_s = timed(assets_parser.scan, paths, args.jobs, None)
+    assert serial == parallel
+
+    cache = os.path.join(args.fixture, 'cache')
+    shutil.rmtree(cache, ignore_errors=True)
+    (cold, _), cold_s = timed(assets_parser.scan, paths, args.jobs, cache)
+    assert cold == serial
+    # A real change to the first archive, and only a new mtime on the last
+    changed = 'models/props/bench_changed.mdl'
+    added = toggle_file(paths[0], changed)
+    os.utime(paths[-1])
+    (warm, rescanned), warm_s = timed(assets_parser.scan, paths, args.jobs, cache)
+    assert rescanned == paths[:1]
+    assert (changed in warm['models']) == added and (changed in cold['models']) != added
+    assert all(warm[kind] == cold[kind] for kind in assets_parser.kinds if kind != 'models')
+    assert set(warm['models']) ^ set(cold['models']) == {changed}
+
+    try:
+        legacy, legacy_s = timed(lambda: [scan_archive_legacy(path) for path in paths])
+    except ImportError:
+        legacy_s = None
+    else:
+        legacy_particles = set().union(*(found['particles'] for found in legacy))
+        assert legacy_particles == set(serial['particles'])
+
+    counts = ", ".join(f"{len(serial[kind])} {kind}" for kind in assets_parser.kinds)
+    print(f"found: {counts}")
+    if legacy_s is not None:
+        print(f"  legacy   {legacy_s:8.2f}s")
+    else:
+        print("  legacy   (valvepcf not installed)")
+    print(f"  serial   {serial_s:8.2f}s")
+    print(f"  parallel {parallel_s:8.2f}s  ({serial_s / parallel_s:.1f}x serial)")
+    print(f"  cold     {cold_s:8.2f}s")
+    print(f"  warm     {warm_s:8.2f}s  ({len(rescanned)} of {len(paths)} archives rescanned)")
+
+
+if __name__ == "__main__":
+    main()
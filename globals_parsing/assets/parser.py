@@ -1,33 +1,41 @@
+import hashlib
+import heapq
+import json
 import os
-import re
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import vpk
-from sortedcontainers import SortedSet
-import valvepcf
+from valvepcf.structs import PCF
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from kv1 import KeyValuesError, events
 
 sound_exts = {'.wav', '.mp3'}
 model_exts = {'.mdl'}
 particle_exts = {'.pcf'}
 texture_exts = {'.vtf'}
 
-sounds = SortedSet()
-models = SortedSet()
-particles = SortedSet()
-textures = SortedSet()
-sound_scripts = SortedSet()
-
+kinds = ['sounds', 'models', 'particles', 'textures', 'sound_scripts']
 
-output_dir = "output/pcf_files"
-tf_dir = 'D:/Program Files/Steam/steamapps/common/Team Fortress 2'
-dir_vpk_files = []
+output_dir = "output"
+cache_dir = "cache"
+cache_version = 2
 target_dirs = ['tf', 'hl']
 
-for subdir in target_dirs:
-    full_subdir_path = os.path.join(tf_dir, subdir)
-    if not os.path.exists(full_subdir_path):
-        continue
 
-    dir_vpk_files += [os.path.join(full_subdir_path, f) for f in os.listdir(full_subdir_path) if f.endswith('dir.vpk')]
+def find_dir_vpk_files(tf_dir):
+    dir_vpk_files = []
+    for subdir in target_dirs:
+        full_subdir_path = os.path.join(tf_dir, subdir)
+        if not os.path.exists(full_subdir_path):
+            continue
+
+        dir_vpk_files += [os.path.join(full_subdir_path, f) for f in sorted(os.listdir(full_subdir_path)) if f.endswith('dir.vpk')]
+
+    return dir_vpk_files
+
 
 def cut_prefix(path, prefix):
     if path.startswith(prefix):
@@ -35,49 +43,160 @@ def cut_prefix(path, prefix):
 
     return path
 
-temp_pcf = "temp.pcf"
 
-for vpk_file in dir_vpk_files:
+def pcf_system_names(data):
+    """
+    Particle system names of a PCF held in memory
+
+    PCF.parse reads the DMX structure from bytes, so nothing is written to disk. The root
+    element's element-array attributes (type 15) list the particle systems by element index.
+    """
+    pcf = PCF.parse(data)
+
+    def string(value):
+        # Names are inline before binary version 4 and string table indices from then on
+        return pcf.strings[value] if isinstance(value, int) else value
+
+    systems = []
+    for attribute in pcf.attributes[0]:
+        if attribute.attributeType == 15:
+            systems += [string(pcf.elements[index].elementName) for index in attribute.attributeData
+                        if 0 <= index < len(pcf.elements)]
+    return systems
+
+
+def sound_script_names(stream, name=''):
+    """Top-level entries of a game_sounds*.txt, read as a stream; stops at a syntax error"""
+    try:
+        for path, key, value in events(stream):
+            if not path and value is None:
+                yield key
+    except KeyValuesError as error:
+        print(f"{name}: {error}", file=sys.stderr)
+
+
+def scan_archive(vpk_file):
+    """Assets of one *dir.vpk, as {kind: sorted names}; runs in a worker process"""
+    found = {kind: set() for kind in kinds}
+
     with vpk.open(vpk_file) as archive:
         for filepath in archive:
             ext = os.path.splitext(filepath)[1].lower()
             if ext in sound_exts:
-                sounds.add(cut_prefix(filepath, "sound/"))
+                found['sounds'].add(cut_prefix(filepath, "sound/"))
             elif ext in model_exts:
-                models.add(filepath)
+                found['models'].add(filepath)
             elif ext in particle_exts:
-                data = archive[filepath].read()
-                with open(temp_pcf, 'wb') as out:
-                    out.write(data)
-
-                pcf = valvepcf.Pcf(temp_pcf)
-                for system in pcf.systems:
-                    particles.add(system._name)
+                found['particles'].update(pcf_system_names(archive[filepath].read()))
             elif ext in texture_exts:
-                textures.add(cut_prefix(filepath, "materials/"))
+                found['textures'].add(cut_prefix(filepath, "materials/"))
             elif filepath.lower().startswith("scripts/game_sounds") and filepath.endswith(".txt"):
-                content = archive[filepath].read().decode(errors='ignore')
-                names = re.findall(r'^"([^"]+)"\s*\{', content, flags=re.MULTILINE)
-                sound_scripts.update(names)
+                found['sound_scripts'].update(sound_script_names(archive[filepath], filepath))
+
+    return {kind: sorted(names) for kind, names in found.items()}
+
+
+def tree_hash(vpk_file):
+    """SHA-256 of a *dir.vpk directory tree, which holds every file's CRC and location"""
+    with open(vpk_file, 'rb') as f:
+        _signature, version, tree_size = struct.unpack('<III', f.read(12))
+        f.seek(12 if version == 1 else 28)
+        return hashlib.sha256(f.read(tree_size)).hexdigest()
+
+
+def archive_key(vpk_file):
+    stat = os.stat(vpk_file)
+    return {'version': cache_version, 'path': os.path.abspath(vpk_file), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def cache_file(vpk_file, directory):
+    return os.path.join(directory, hashlib.sha1(os.path.abspath(vpk_file).encode('utf-8')).hexdigest()[:16] + '.json')
+
+
+def load_cached(vpk_file, directory):
+    """
+    Cached assets of an archive, or None if it has to be rescanned
+
+    Path, size and mtime matching is enough; when only the mtime moved (copied or re-downloaded
+    files), an unchanged directory tree hash still counts as a hit.
+    """
+    try:
+        with open(cache_file(vpk_file, directory), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    key = archive_key(vpk_file)
+    if any(entry.get(field) != key[field] for field in ('version', 'path', 'size')):
+        return None
+    if entry.get('mtime') != key['mtime']:
+        if entry.get('tree_hash') != tree_hash(vpk_file):
+            return None
+        save_cached(vpk_file, directory, entry['assets'], entry['tree_hash'])
+
+    return entry['assets']
+
+
+def save_cached(vpk_file, directory, assets, digest=None):
+    os.makedirs(directory, exist_ok=True)
+    entry = dict(archive_key(vpk_file), tree_hash=digest or tree_hash(vpk_file), assets=assets)
+    with open(cache_file(vpk_file, directory), 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+
+
+def merge_sorted(lists):
+    """k-way merge of sorted lists, dropping duplicates"""
+    merged = []
+    for name in heapq.merge(*lists):
+        if not merged or merged[-1] != name:
+            merged.append(name)
+
+    return merged
+
+
+def scan(dir_vpk_files, jobs=None, cache=cache_dir):
+    """
+    Assets of all archives as {kind: sorted names}, and the archives that were rescanned
+
+    Archives missing from the cache are scanned across a process pool (or serially with jobs=1);
+    pass cache=None to rescan everything without touching the cache.
+    """
+    found = {}
+    stale = []
+    for vpk_file in dir_vpk_files:
+        cached = load_cached(vpk_file, cache) if cache else None
+        if cached is None:
+            stale.append(vpk_file)
+        else:
+            found[vpk_file] = cached
 
-with open("output/sounds.txt", 'w') as output:
-    for path in sounds:
-        output.write(f'"{path}",\n')
+    if jobs == 1:
+        results = list(map(scan_archive, stale))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(scan_archive, stale))
 
-with open("output/models.txt", 'w') as output:
-    for path in models:
-        output.write(f'"{path}",\n')
+    for vpk_file, assets in zip(stale, results):
+        found[vpk_file] = assets
+        if cache:
+            save_cached(vpk_file, cache, assets)
 
-with open("output/particles.txt", 'w') as output:
-    for path in particles:
-        output.write(f'"{path}",\n')
+    assets = {kind: merge_sorted([found[vpk_file][kind] for vpk_file in dir_vpk_files]) for kind in kinds}
+    return assets, stale
 
-with open("output/textures.txt", 'w') as output:
-    for path in textures:
-        output.write(f'"{path}",\n')
 
-with open("output/sound_scripts.txt", 'w') as output:
-    for path in sound_scripts:
-        output.write(f'"{path}",\n')
+def write_outputs(assets, directory=output_dir):
+    os.makedirs(directory, exist_ok=True)
+    for kind in kinds:
+        with open(os.path.join(directory, f"{kind}.txt"), 'w') as output:
+            for path in assets[kind]:
+                output.write(f'"{path}",\n')
 
 
+if __name__ == "__main__":
+    tf_dir = os.environ.get("TF2_DIR", 'D:/Program Files/Steam/steamapps/common/Team Fortress 2')
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    dir_vpk_files = find_dir_vpk_files(tf_dir)
+    assets, rescanned = scan(dir_vpk_files, jobs)
+    write_outputs(assets)
+    print(f"{len(rescanned)} of {len(dir_vpk_files)} archives rescanned")
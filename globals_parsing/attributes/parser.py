@@ -1,11 +1,19 @@
-import re
-from sortedcontainers import SortedSet
+import os
+import sys
 
-with open("input.txt", "r") as input, open("output.txt", "w") as output:
-    attributes = SortedSet()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from kv1 import events
 
-    for match in re.finditer(r'"name"[ \t]*(".+?")', input.read()):
-        attributes.add(match.group(1))
 
-    for attribute in attributes:
-        output.write(attribute + ",\n")
\ No newline at end of file
+def attribute_names(stream):
+    """Names of the attributes in an items_game "attributes" block, or in its bare contents"""
+    for path, key, value in events(stream):
+        if key == "name" and value is not None and (len(path) == 1 or path[-2:-1] == ("attributes",)):
+            yield value
+
+
+if __name__ == "__main__":
+    with open("input.txt", "r") as input, open("output.txt", "w") as output:
+        # Sorted as written, quotes included
+        for attribute in sorted({f'"{name}"' for name in attribute_names(input)}):
+            output.write(attribute + ",\n")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Run the globals_parsing extractors as one incremental build
+
+Every extractor is fingerprinted from the SHA-256 of its parser.py and its inputs; extractors
+whose fingerprint matches the last build and whose outputs still exist are skipped. The rest run
+in parallel, each in its own directory as if run by hand. build_manifest.json records what was
+regenerated, with the hashes of every input and output.
+
+Usage:
+    python build.py [--only functions events] [--force] [--jobs 4] [--tf-dir PATH] [--dry-run]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ROOT, "build_manifest.json")
+MANIFEST_VERSION = 1
+
+PARSER = "parser.py"
+
+DEFAULT_TF_DIR = "D:/Program Files/Steam/steamapps/common/Team Fortress 2"
+
+
+class Extractor(NamedTuple):
+
+    """ One parser.py, with paths relative to its directory """
+
+    name: str
+    directory: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+
+
+EXTRACTORS = (
+    Extractor("assets", "assets", ("../kv1.py",), (
+        "output/sounds.txt", "output/models.txt", "output/particles.txt",
+        "output/textures.txt", "output/sound_scripts.txt",
+    )),
+    Extractor("attributes", "attributes", ("input.txt", "../kv1.py"), ("output.txt",)),
+    Extractor("classes", "properties/classes", ("input.txt",), ("output.txt",)),
+    Extractor("constants", "constants", ("input.txt", "../wiki_tables.py"), ("out.txt",)),
+    Extractor("convars", "convars", ("input.txt",), ("output.txt",)),
+    Extractor("datamaps", "datamaps", ("../shared/datamaps.txt", "../shared/properties.txt"), (
+        "../inputs/output.txt", "../outputs/output.txt", "../keyvalues/output/number.txt",
+        "../keyvalues/output/string.txt", "../keyvalues/output/vector.txt", "output/datamaps.json",
+    )),
+    Extractor("entities", "entities", ("input.txt",), ("output.txt",)),
+    Extractor("events", "events", ("input.txt",), ("out.txt",)),
+    Extractor("functions", "functions", ("input.txt", "../wiki_tables.py"), (
+        "out.txt", "out_obsolete.txt", "out_global.txt", "out_global_obsolete.txt",
+    )),
+    Extractor("properties", "properties", ("../shared/properties.json",), (
+        "output/integer.txt", "output/float.txt", "output/string.txt", "output/boolean.txt",
+        "output/entity.txt", "output/vector.txt", "output/integer_array.txt",
+        "output/float_array.txt", "output/string_array.txt", "output/boolean_array.txt",
+        "output/entity_array.txt", "output/vector_array.txt",
+    )),
+)
+
+
+def vpk_inputs(tf_dir: str) -> tuple[str, ...]:
+
+    """ The assets extractor reads the game's VPK directories rather than files in the tree """
+
+    return tuple(sorted(
+        path for subdir in ("tf", "hl")
+        for path in glob.glob(os.path.join(tf_dir, subdir, "*dir.vpk"))
+    ))
+
+
+class Hasher:
+
+    """ SHA-256 of files, each read once per build however many extractors share it """
+
+    def __init__(self):
+
+        self._digests: dict[str, Optional[str]] = {}
+
+    def digest(self, path: str) -> Optional[str]:
+
+        """ Hex digest, or None if the file doesn't exist """
+
+        path = os.path.normpath(path)
+        if path not in self._digests:
+            self._digests[path] = hash_file(path)
+        return self._digests[path]
+
+
+def hash_file(path: str) -> Optional[str]:
+
+    if not os.path.isfile(path):
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def input_paths(extractor: Extractor, tf_dir: str) -> tuple[str, ...]:
+
+    directory = os.path.join(ROOT, extractor.directory)
+    paths = [os.path.join(directory, PARSER)]
+    paths += [os.path.normpath(os.path.join(directory, path)) for path in extractor.inputs]
+    if extractor.name == "assets":
+        # With no VPKs found, report the pattern as the missing input
+        paths += vpk_inputs(tf_dir) or (os.path.join(tf_dir, "tf", "*dir.vpk"),)
+    return tuple(paths)
+
+
+def display_path(path: str) -> str:
+
+    """ Paths inside globals_parsing are recorded relative to it, so manifests are portable """
+
+    relative = os.path.relpath(path, ROOT)
+    return path if relative.startswith("..") else relative.replace(os.sep, "/")
+
+
+def fingerprint(digests: dict[str, str]) -> str:
+
+    sha = hashlib.sha256()
+    for path, digest in sorted(digests.items()):
+        sha.update(f"{path}\0{digest}\n".encode("utf-8"))
+    return sha.hexdigest()
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def run_extractor(extractor: Extractor, tf_dir: str) -> tuple[int, str, float]:
+
+    """ Run parser.py from its own directory; returns exit code, stderr and wall time """
+
+    env = dict(os.environ, TF2_DIR=tf_dir)
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, PARSER], cwd=os.path.join(ROOT, extractor.directory),
+        env=env, capture_output=True, text=True,
+    )
+    return process.returncode, process.stderr, time.perf_counter() - start
+
+
+def plan(extractors: tuple[Extractor, ...], previous: dict, hasher: Hasher, tf_dir: str, force: bool) -> dict[str, dict]:
+
+    """
+    Fingerprint every extractor and decide what to do with it
+
+    Each entry gets a status: "stale" (to run), "up-to-date", or "missing-input" when an input
+    isn't on disk, in which case the previous outputs are left alone.
+    """
+
+    entries = {}
+    for extractor in extractors:
+        digests = {display_path(path): hasher.digest(path) for path in input_paths(extractor, tf_dir)}
+        missing = sorted(path for path, digest in digests.items() if digest is None)
+        entry = {"directory": extractor.directory, "inputs": digests}
+
+        if missing:
+            entry.update(status="missing-input", missing=missing)
+        else:
+            entry["fingerprint"] = fingerprint(digests)
+            last = previous.get(extractor.name, {})
+            outputs_exist = all(
+                os.path.isfile(os.path.join(ROOT, extractor.directory, output)) for output in extractor.outputs
+            )
+            if not force and outputs_exist and last.get("fingerprint") == entry["fingerprint"]:
+                entry.update(status="up-to-date", outputs=last.get("outputs", {}))
+            else:
+                entry["status"] = "stale"
+        entries[extractor.name] = entry
+    return entries
+
+
+def build(extractors: tuple[Extractor, ...], jobs: int, tf_dir: str, force: bool = False, dry_run: bool = False,
+          manifest_path: str = MANIFEST_PATH) -> dict:
+
+    """ Run the stale extractors and write the manifest; returns the manifest """
+
+    previous = load_manifest(manifest_path).get("extractors", {})
+    entries = plan(extractors, previous, Hasher(), tf_dir, force)
+    stale = [extractor for extractor in extractors if entries[extractor.name]["status"] == "stale"]
+
+    if dry_run:
+        return {"version": MANIFEST_VERSION, "extractors": entries}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = dict(zip(
+            (extractor.name for extractor in stale),
+            executor.map(lambda extractor: run_extractor(extractor, tf_dir), stale),
+        ))
+
+    for extractor in stale:
+        entry = entries[extractor.name]
+        returncode, stderr, duration = results[extractor.name]
+        entry["duration_s"] = round(duration, 3)
+        if returncode != 0:
+            lines = stderr.strip().splitlines()
+            entry.update(status="failed", error=lines[-1] if lines else f"exit code {returncode}")
+            # Forget the fingerprint so the next build retries
+            entry.pop("fingerprint", None)
+            continue
+
+        before = previous.get(extractor.name, {}).get("outputs", {})
+        outputs = {output: hash_file(os.path.join(ROOT, extractor.directory, output)) for output in extractor.outputs}
+        entry.update(
+            status="regenerated",
+            outputs=outputs,
+            changed=sorted(output for output, digest in outputs.items() if before.get(output) != digest),
+        )
+
+    # Extractors outside --only keep their previous entries
+    for name, entry in previous.items():
+        entries.setdefault(name, entry)
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "built": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "extractors": dict(sorted(entries.items())),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def main():
+
+    names = [extractor.name for extractor in EXTRACTORS]
+
+    parser = argparse.ArgumentParser(description="Incremental build of the globals_parsing outputs")
+    parser.add_argument("--only", nargs="+", choices=names, metavar="NAME", help="Extractors to consider")
+    parser.add_argument("--force", action="store_true", help="Run extractors even if their inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Extractors run at once")
+    parser.add_argument("--tf-dir", default=os.environ.get("TF2_DIR", DEFAULT_TF_DIR), help="Team Fortress 2 install, for assets")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    args = parser.parse_args()
+
+    extractors = tuple(extractor for extractor in EXTRACTORS if not args.only or extractor.name in args.only)
+    manifest = build(extractors, args.jobs, args.tf_dir, args.force, args.dry_run)
+
+    failed = False
+    for extractor in extractors:
+        entry = manifest["extractors"][extractor.name]
+        status = entry["status"]
+        detail = ""
+        if status == "regenerated":
+            detail = f" in {entry['duration_s']:.2f}s, changed: {', '.join(entry['changed']) or 'none'}"
+        elif status == "missing-input":
+            detail = f": {', '.join(entry['missing'])}"
+        elif status == "failed":
+            detail = f": {entry['error']}"
+            failed = True
+        print(f"{extractor.name:>12} {status}{detail}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,24 @@
+import os
 import re
+import sys
 
-def extract_constants_info(constants_text):
-    table_regex = re.compile(r"!\s*Name\s*!\s*Value\s*(.*?)\|}", re.MULTILINE | re.DOTALL)
-
-    constants_file = open("out.txt", 'w', encoding='utf-8')
-    for enum_match in re.finditer(r"(?<!=)===\s*(\w+)\s*===(?!=)", constants_text):
-        enum = enum_match.group(1)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wiki_tables import section_tables
 
-        table_match = re.search(table_regex, constants_text[enum_match.end():])
-        if not table_match:
-            continue
+table_columns = ['Name', 'Value']
 
-        output = wiki_table_to_enum_info(table_match.group(1), enum)
-        constants_file.write(output)
 
-    constants_file.close()
+def extract_constants_info(constants_text):
+    enum_tables, _ = section_tables(constants_text, table_columns)
 
+    with open("out.txt", 'w', encoding='utf-8') as constants_file:
+        constants_file.write(''.join(wiki_table_to_enum_info(rows, enum) for enum, rows in enum_tables))
 
 
-def wiki_table_to_enum_info(table_text, enum_name):
+def wiki_table_to_enum_info(table_rows, enum_name):
     output = f"\t{enum_name}: {{\n"
     print(f'\t{enum_name}: {{\n\t\tsignature: "{enum_name}: enum"\n\t}},')
-    for constant_info in table_text.split("|-\n"):
+    for constant_info in table_rows:
         lines = constant_info.split('\n')
 
         constant_name_match = re.search(r">\s*(\w+).*<", lines[0])
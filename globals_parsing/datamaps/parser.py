@@ -0,0 +1,151 @@
+import json
+import os
+import re
+
+# Member line of the datamaps dump:
+#   - m_iszName (Offset 120) (Save|Key)(4 Bytes) - targetname
+member_regex = re.compile(r"( *)- (\S*) \(Offset (\d+)\) \(([^)]*)\)\((\d+) Bytes\)(?: - (\S+))?")
+sub_class_regex = re.compile(r"( *) Sub-Class Table \(\d+ Deep\): (\w+)")
+
+# Keyvalues the datamaps can't type, or type wrongly
+known_keyvalues = {
+    "rendercolor": "vector",
+    "renderamt": "integer",
+    "disableshadows": "bool",
+    "mins": "vector",
+    "maxs": "vector",
+    "disablereceiveshadows": "bool",
+    "nodamageforces": "bool",
+    # "angle": "float",
+    "angles": "vector",
+    "origin": "vector",
+    "targetname": "string",
+}
+
+keyvalue_files = {
+    "integer": "number",
+    "float": "number",
+    "bool": "number",
+    "string": "string",
+    "vector": "vector",
+}
+
+
+def new_table():
+    return {"members": []}
+
+
+def parse_datamaps(lines):
+    """
+    Indentation tree of a datamaps dump, built in one streaming pass
+
+    {class: table}, where a table is {"members": [...]} in dump order and a sub-class table is a
+    member with its own "members". A sub-class table's members sit one space deeper than its
+    header; a shallower line closes it.
+    """
+    classes = {}
+    stack = []  # (member indent, table) for the class and each open sub-class table
+    for line in lines:
+        member_match = member_regex.match(line)
+        sub_class_match = None if member_match else sub_class_regex.match(line)
+
+        if not member_match and not sub_class_match:
+            name = line.strip()
+            if name and not line[0].isspace():
+                stack = [(0, classes.setdefault(name.split()[0], new_table()))]
+            continue
+
+        if not stack:
+            stack = [(0, classes.setdefault("", new_table()))]
+
+        indent = len((member_match or sub_class_match).group(1))
+        while len(stack) > 1 and stack[-1][0] > indent:
+            stack.pop()
+
+        table = stack[-1][1]
+        if sub_class_match:
+            sub_table = dict(name=sub_class_match.group(2), **new_table())
+            table["members"].append(sub_table)
+            stack.append((indent + 1, sub_table))
+            continue
+
+        name, offset, flags, size, key = member_match.group(2, 3, 4, 5, 6)
+        table["members"].append({
+            "name": name,
+            "offset": int(offset),
+            "flags": flags.split("|"),
+            "size": int(size),
+            "key": key,
+        })
+
+    return classes
+
+
+def walk(table, prefix=""):
+    """(property path, field) for every field of a table and its sub-class tables, in dump order"""
+    for member in table["members"]:
+        if "members" in member:
+            yield from walk(member, prefix + member["name"] + ".")
+        else:
+            yield prefix + member["name"], member
+
+
+def collect(classes, properties):
+    """Input names, output names and {keyvalue: kind} across all classes"""
+    inputs, outputs = set(), set()
+    keyvalues = dict(known_keyvalues)
+    for table in classes.values():
+        for path, field in walk(table):
+            key = field["key"]
+            if not key:
+                continue
+            if "Input" in field["flags"]:
+                inputs.add(key)
+            elif "Output" in field["flags"]:
+                outputs.add(key)
+            elif key not in keyvalues:
+                if path not in properties:
+                    print(path)
+                    continue
+
+                kind = properties[path].replace("_array", "")
+                # targetname
+                if kind == "instance":
+                    kind = "string"
+                keyvalues[key] = kind
+
+    return inputs, outputs, keyvalues
+
+
+def read_properties(path):
+    properties = {}
+    with open(path, "r") as input:
+        for line in input:
+            property_match = re.match(r"(\S+): (\w+)", line)
+            if property_match:
+                properties[property_match.group(1)] = property_match.group(2)
+
+    return properties
+
+
+def write_names(path, names):
+    with open(path, "w") as output:
+        for name in sorted(names):
+            output.write(f'"{name}",\n')
+
+
+if __name__ == "__main__":
+    with open("../shared/datamaps.txt", "r") as input:
+        classes = parse_datamaps(input)
+
+    inputs, outputs, keyvalues = collect(classes, read_properties("../shared/properties.txt"))
+
+    write_names("../inputs/output.txt", inputs)
+    write_names("../outputs/output.txt", outputs)
+    for file_name in sorted(set(keyvalue_files.values())):
+        write_names(f"../keyvalues/output/{file_name}.txt",
+                    [key for key, kind in keyvalues.items() if keyvalue_files[kind] == file_name])
+
+    os.makedirs("output", exist_ok=True)
+    with open("output/datamaps.json", "w") as output:
+        json.dump(classes, output, indent=1)
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parser import collect, known_keyvalues, parse_datamaps, walk
+
+fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "datamaps.txt")
+
+
+def load_fixture():
+    with open(fixture_path, "r") as input:
+        return parse_datamaps(input)
+
+
+def test_sub_class_paths():
+    """Nested Sub-Class tables prefix their members, and a shallower line closes them"""
+    classes = load_fixture()
+    assert list(classes) == ["CBaseEntity", "CTFPlayer"]
+
+    assert [path for path, _ in walk(classes["CBaseEntity"])] == [
+        "m_iClassname",
+        "m_iName",
+        "m_Collision.m_vecMins",
+        "m_Collision.m_vecMaxs",
+        "m_Collision.m_Bounds.m_flRadius",
+        "m_Collision.m_Bounds.m_nHitboxSet",
+        "m_Collision.m_usSolidFlags",
+        "m_flSpeed",
+        "InputKill",
+        "m_OnUser1",
+    ]
+    assert [path for path, _ in walk(classes["CTFPlayer"])] == [
+        "m_Shared.m_ConditionList.m_nPreventedDamage",
+        "m_Shared.m_flCloakMeter",
+        "InputSetHealth",
+    ]
+
+
+def test_member_fields():
+    """Offset, flags, size and key name of a member line"""
+    fields = dict(walk(load_fixture()["CBaseEntity"]))
+    assert fields["m_Collision.m_Bounds.m_flRadius"] == {
+        "name": "m_flRadius",
+        "offset": 240,
+        "flags": ["Save", "Key"],
+        "size": 4,
+        "key": "radius",
+    }
+    assert fields["m_Collision.m_usSolidFlags"]["key"] is None
+
+
+def test_collect():
+    """Inputs and outputs by flag, keyvalues typed through their nested property path"""
+    properties = {
+        "m_iClassname": "string",
+        "m_Collision.m_Bounds.m_flRadius": "float",
+        "m_Collision.m_Bounds.m_nHitboxSet": "integer",
+        "m_flSpeed": "float",
+        "m_Shared.m_ConditionList.m_nPreventedDamage": "integer_array",
+        "m_Shared.m_flCloakMeter": "float",
+    }
+    inputs, outputs, keyvalues = collect(load_fixture(), properties)
+
+    assert inputs == {"Kill", "SetHealth"}
+    assert outputs == {"OnUser1"}
+    assert {key: kind for key, kind in keyvalues.items() if key not in known_keyvalues} == {
+        "classname": "string",
+        "radius": "float",
+        "hitboxset": "integer",
+        "speed": "float",
+        "prevented": "integer",
+        "cloak": "float",
+    }
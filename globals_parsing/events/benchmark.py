@@ -0,0 +1,66 @@
+"""
+Benchmark template removal on events/input.txt scaled up
+
+Compares the old character-by-character remove_braces, which copies its output list every time an
+outer template closes, with the span-based one in parser.py, and checks both give the same text.
+
+Usage:
+    python benchmark.py [--scale 1 10 100] [--input input.txt]
+"""
+
+import argparse
+import os
+import time
+
+from parser import remove_braces
+
+
+def legacy_remove_braces(text):
+    result = []
+    stack = []
+    i = 0
+
+    while i < len(text):
+        if text[i:i+2] == '{{':
+            stack.append(i)
+            i += 2
+        elif text[i:i+2] == '}}' and stack:
+            start = stack.pop()
+            if not stack:
+                result = result[:start]
+            i += 2
+        else:
+            if not stack:
+                result.append(text[i])
+            i += 1
+
+    return ''.join(result)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Template stripper benchmark")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--input', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input.txt'))
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as input_file:
+        text = input_file.read()
+
+    print(f"{'scale':>6} {'size':>9} {'templates':>10} {'legacy':>10} {'spans':>9} {'speedup':>8}")
+    for scale in args.scale:
+        scaled = text * scale
+        legacy, legacy_s = timed(legacy_remove_braces, scaled)
+        stripped, stripped_s = timed(remove_braces, scaled)
+        assert legacy == stripped
+        print(f"{scale:>6} {len(scaled) // 1024:>7}KB {scaled.count('{{'):>10} {legacy_s * 1e3:>8.0f}ms "
+              f"{stripped_s * 1e3:>7.1f}ms {legacy_s / stripped_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,33 @@
 import re
 
+template_regex = re.compile(r"\{\{|\}\}")
+
+
 def remove_braces(text):
-    result = []
-    stack = []
-    i = 0
-
-    while i < len(text):
-        if text[i:i+2] == '{{':
-            stack.append(i)
-            i += 2
-        elif text[i:i+2] == '}}' and stack:
-            start = stack.pop()
-            if not stack:
-                # Only remove outermost {{ ... }}
-                result = result[:start]
-            i += 2
-        else:
-            if not stack:
-                result.append(text[i])
-            i += 1
-
-    return ''.join(result)
+    """
+    Text with every outermost {{ ... }} template removed
+
+    Works on spans between the brace pairs found by one regex scan, so it stays linear however
+    many templates the page has. A "}}" with no template open is kept as text, and an unclosed
+    template drops the rest of the text.
+    """
+    pieces = []
+    depth = 0
+    kept_from = 0
+    for match in template_regex.finditer(text):
+        if match.group() == '{{':
+            if depth == 0:
+                pieces.append(text[kept_from:match.start()])
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                kept_from = match.end()
+
+    if depth == 0:
+        pieces.append(text[kept_from:])
+
+    return ''.join(pieces)
 
 def extract_events_info(text):
     text = remove_braces(text)
@@ -0,0 +1,62 @@
+"""
+Benchmark locating the wiki tables of functions/input.txt
+
+Compares the old approach (slice the text after every === Class === header and search it again
+for the next table) with the single-pass tokenizer in wiki_tables.py, on the input repeated
+--scale times, and checks both pair the same classes with the same tables.
+
+Usage:
+    python benchmark.py [--scale 1 4 16] [--input input.txt]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wiki_tables import section_tables
+
+from parser import table_columns
+
+
+def legacy_section_tables(text):
+    table_regex = re.compile(r"!\s*Function\s*!\s*Signature\s*!\s*Description\s*(.*?)\|}", re.MULTILINE | re.DOTALL)
+    tables = []
+    last_index = 0
+    for class_match in re.finditer(r"(?<!=)===\s*(\w+)\s*===(?!=)", text):
+        last_index = class_match.end()
+        table_match = re.search(table_regex, text[last_index:])
+        if table_match:
+            tables.append((class_match.group(1), table_match.group(1).split("|-\n")))
+
+    return tables, [table.split("|-\n") for table in re.findall(table_regex, text[last_index:])]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wiki table tokenizer benchmark")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--input', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input.txt'))
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as input_file:
+        text = input_file.read()
+
+    print(f"{'scale':>6} {'size':>9} {'legacy':>9} {'single pass':>12} {'speedup':>8}")
+    for scale in args.scale:
+        scaled = text * scale
+        legacy, legacy_s = timed(legacy_section_tables, scaled)
+        tokenized, tokenized_s = timed(section_tables, scaled, table_columns)
+        assert legacy == tokenized
+        print(f"{scale:>6} {len(scaled) // 1024:>7}KB {legacy_s * 1e3:>7.1f}ms {tokenized_s * 1e3:>10.1f}ms {legacy_s / tokenized_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,37 @@
+import os
 import re
+import sys
 
-def extract_methods_info(class_text):
-    class_text = class_text.replace('\\', '\\\\')
-    class_text = class_text.replace('"', '\\"')
-
-    methods_file = open('out.txt', 'w', encoding='utf-8')
-    obsolete_methods_files = open('out_obsolete.txt', 'w', encoding='utf-8')
-    last_index = 0
-    table_regex = re.compile(r"!\s*Function\s*!\s*Signature\s*!\s*Description\s*(.*?)\|}", re.MULTILINE | re.DOTALL)
-    print("\\\\b(", end='')
-    for class_match in re.finditer(r"(?<!=)===\s*(\w+)\s*===(?!=)", class_text):
-        class_name = class_match.group(1)
-        last_index = class_match.end()
-
-        table_match = re.search(table_regex, class_text[last_index:])
-        if not table_match:
-            continue
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wiki_tables import section_tables
 
-        normal_output, obsolete_output = wiki_table_to_function_info(table_match.group(1), class_name)
-        methods_file.write(normal_output)
-        obsolete_methods_files.write(obsolete_output)
+table_columns = ['Function', 'Signature', 'Description']
 
-    methods_file.close()
-    obsolete_methods_files.close()
 
-    methods_file = open('out_global.txt', 'w', encoding='utf-8')
-    obsolete_methods_files = open('out_global_obsolete.txt', 'w', encoding='utf-8')
+def extract_methods_info(class_text):
+    class_text = class_text.replace('\\', '\\\\')
+    class_text = class_text.replace('"', '\\"')
 
-    for table in re.findall(table_regex, class_text[last_index:]):
-        normal_output, obsolete_output = wiki_table_to_function_info(table)
-        methods_file.write(normal_output)
-        obsolete_methods_files.write(obsolete_output)
+    class_tables, global_tables = section_tables(class_text, table_columns)
 
+    print("\\\\b(", end='')
+    methods, obsolete_methods = [], []
+    for class_name, rows in class_tables:
+        normal_output, obsolete_output = wiki_table_to_function_info(rows, class_name)
+        methods.append(normal_output)
+        obsolete_methods.append(obsolete_output)
+
+    global_methods, obsolete_global_methods = [], []
+    for rows in global_tables:
+        normal_output, obsolete_output = wiki_table_to_function_info(rows)
+        global_methods.append(normal_output)
+        obsolete_global_methods.append(obsolete_output)
     print(")\\\\b")
-    methods_file.close()
-    obsolete_methods_files.close()
+
+    for path, outputs in (('out.txt', methods), ('out_obsolete.txt', obsolete_methods),
+                          ('out_global.txt', global_methods), ('out_global_obsolete.txt', obsolete_global_methods)):
+        with open(path, 'w', encoding='utf-8') as output_file:
+            output_file.write(''.join(outputs))
 
 
 def get_header(name):
@@ -85,7 +82,7 @@ def convert_wiki_to_markdown_format(method_description):
                                 method_description)
     return method_description
 
-def wiki_table_to_function_info(table_text, table_class = None):
+def wiki_table_to_function_info(table_rows, table_class = None):
     normal_output = ''
     obsolete_output = ''
 
@@ -126,7 +123,7 @@ def wiki_table_to_function_info(table_text, table_class = None):
 
         return obsolete, method_description
 
-    for method_info in table_text.split("|-\n"):
+    for method_info in table_rows:
         lines = method_info.split('\n')
 
         method_name_match = re.search(r">\s*(\w+).*<", lines[0])
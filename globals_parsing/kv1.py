@@ -0,0 +1,92 @@
+import codecs
+import re
+
+STRING = 'string'
+OPEN = '{'
+CLOSE = '}'
+
+chunk_size = 1 << 16
+
+# Whitespace and comments, quoted strings (escapes left as written), braces, [$PLATFORM]
+# conditionals and bare words
+token_regex = re.compile(r'(\s+|//[^\n]*)|"((?:[^"\\]|\\.)*)"|([{}])|(\[[^\]\n]*\])|([^\s{}"]+)')
+
+
+class KeyValuesError(ValueError):
+    pass
+
+
+def tokenize(stream):
+    """
+    Yield (STRING, text), (OPEN, None) and (CLOSE, None) from a KeyValues stream
+
+    The stream is read in chunks (bytes are decoded as UTF-8, invalid bytes dropped), so memory
+    stays bounded by the longest token rather than the file size.
+    """
+    decoder = None
+    buffer = ''
+    eof = False
+    first = True
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        if isinstance(chunk, bytes):
+            decoder = decoder or codecs.getincrementaldecoder('utf-8-sig')(errors='ignore')
+            chunk = decoder.decode(chunk, final=eof)
+        if first:
+            chunk = chunk.lstrip('\ufeff')
+            first = False
+        buffer += chunk
+
+        position = 0
+        while position < len(buffer):
+            match = token_regex.match(buffer, position)
+            # A token running into the end of the buffer may continue in the next chunk
+            if not match or (match.end() == len(buffer) and not eof):
+                break
+
+            position = match.end()
+            skipped, quoted, brace, _conditional, word = match.groups()
+            if quoted is not None:
+                yield STRING, quoted
+            elif brace is not None:
+                yield brace, None
+            elif word is not None:
+                yield STRING, word
+
+        buffer = buffer[position:]
+
+    if buffer:
+        raise KeyValuesError(f"Unterminated string: {buffer[:40]!r}")
+
+
+def events(stream):
+    """
+    Yield (path, key, value) for a KeyValues stream without building the tree
+
+    path is the tuple of enclosing block keys. A block yields (path, key, None) when it opens and
+    its contents then have path + (key,).
+    """
+    path = []
+    key = None
+    for kind, text in tokenize(stream):
+        if kind == STRING:
+            if key is None:
+                key = text
+            else:
+                yield tuple(path), key, text
+                key = None
+        elif kind == OPEN:
+            if key is None:
+                raise KeyValuesError(f"Block without a key in {'/'.join(path) or 'the root'}")
+            yield tuple(path), key, None
+            path.append(key)
+            key = None
+        else:
+            if not path:
+                raise KeyValuesError("Unbalanced }")
+            path.pop()
+            key = None
+
+    if path:
+        raise KeyValuesError(f"Unclosed block {'/'.join(path)}")
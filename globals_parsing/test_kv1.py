@@ -0,0 +1,91 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import kv1
+from kv1 import CLOSE, OPEN, STRING, KeyValuesError, events, tokenize
+
+# Byte order mark, escapes, a [$PLATFORM] conditional, comments, and 2, 3 and 4 byte UTF-8
+sample = '\ufeff' + '''// Sound script
+"Weapon_Café.Single"
+{
+	"channel"	"CHAN_WEAPON"	[$WIN32]
+	"wave"		"weapons/café_shoot.wav"
+	"comment"	"Quoted \\"escapes\\" stay as written"
+	rndwave
+	{
+		wave	"日本/音.wav"
+		wave	"🔫.wav" // trailing comment
+	}
+}
+'''
+
+
+def read_all(generator, data, size):
+    """Everything generator yields for data read in size chunks"""
+    previous = kv1.chunk_size
+    kv1.chunk_size = size
+    try:
+        stream = io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data)
+        return list(generator(stream))
+    finally:
+        kv1.chunk_size = previous
+
+
+def test_tokens():
+    """Quoted and bare strings, braces, and comments and conditionals skipped"""
+    assert read_all(tokenize, '"a b" c { // d\n [$X] }', 1 << 16) == [
+        (STRING, "a b"), (STRING, "c"), (OPEN, None), (CLOSE, None),
+    ]
+
+
+def test_events():
+    """Keys paired with values, and blocks opened with their path"""
+    assert read_all(events, sample.encode('utf-8'), 1 << 16) == [
+        ((), "Weapon_Café.Single", None),
+        (("Weapon_Café.Single",), "channel", "CHAN_WEAPON"),
+        (("Weapon_Café.Single",), "wave", "weapons/café_shoot.wav"),
+        (("Weapon_Café.Single",), "comment", 'Quoted \\"escapes\\" stay as written'),
+        (("Weapon_Café.Single",), "rndwave", None),
+        (("Weapon_Café.Single", "rndwave"), "wave", "日本/音.wav"),
+        (("Weapon_Café.Single", "rndwave"), "wave", "🔫.wav"),
+    ]
+
+
+def test_chunk_sizes():
+    """Every chunk size from 1 byte to 64KB gives the same events, for bytes and text streams"""
+    data = sample.encode('utf-8')
+    expected = read_all(events, data, 1 << 16)
+    for size in list(range(1, len(data) + 2)) + [4096, 1 << 16]:
+        assert read_all(events, data, size) == expected, size
+        assert read_all(events, sample, size) == expected, size
+
+
+def test_split_multibyte_character():
+    """A UTF-8 character split between chunks decodes whole, in a quoted and a bare token"""
+    data = '"🔫" 日本'.encode('utf-8')
+    for size in range(1, len(data) + 1):
+        assert read_all(tokenize, data, size) == [(STRING, "🔫"), (STRING, "日本")], size
+
+
+def test_unterminated_string():
+    """A quote left open at the end of the stream is an error, whatever the chunk size"""
+    for size in (1, 3, 1 << 16):
+        try:
+            read_all(tokenize, b'"key" "value', size)
+        except KeyValuesError as error:
+            assert "value" in str(error)
+        else:
+            assert False, size
+
+
+def test_unbalanced_blocks():
+    """Stray and unclosed braces are errors"""
+    for text in ('"a" { "b" "c"', '"a" "b" }', '{ "a" "b" }'):
+        try:
+            read_all(events, text, 1 << 16)
+        except KeyValuesError:
+            pass
+        else:
+            assert False, text
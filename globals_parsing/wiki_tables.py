@@ -0,0 +1,50 @@
+import re
+
+SECTION = 'section'
+TABLE = 'table'
+
+section_regex = r"(?<!=)===\s*(?P<section>\w+)\s*===(?!=)"
+
+
+def compile_tokenizer(columns):
+    """One pattern matching either a === Section === header or a table with the given header columns"""
+    table_regex = r"!\s*" + r"\s*!\s*".join(map(re.escape, columns)) + r"\s*(?P<table>.*?)\|}"
+    return re.compile(f"{section_regex}|{table_regex}", re.DOTALL)
+
+
+def tokenize(text, columns):
+    """
+    Yield (SECTION, name) and (TABLE, rows) in document order, in a single pass over text
+
+    Only tables whose header row is `columns` are tokenized; rows are the table body split on
+    "|-" separators. Sections are level 3 headers with a one word title.
+    """
+    for match in compile_tokenizer(columns).finditer(text):
+        section = match.group('section')
+        if section is not None:
+            yield SECTION, section
+        else:
+            yield TABLE, match.group('table').split("|-\n")
+
+
+def section_tables(text, columns):
+    """
+    (section, rows) for every section header, pairing it with the first table after it, and the
+    tables after the last header
+
+    A header with no table of its own before the next one gets that one's table too, as the
+    extractors always did.
+    """
+    pending = []
+    tables = []
+    trailing = []
+    for kind, value in tokenize(text, columns):
+        if kind == SECTION:
+            pending.append(value)
+            trailing = []
+        else:
+            tables += [(section, value) for section in pending]
+            pending = []
+            trailing.append(value)
+
+    return tables, trailing
@@ -0,0 +1,270 @@
+""" Prefix-compressed, memory-mapped index of game asset names """
+
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, Optional
+
+from globals_db import DATA_DIR, GlobalsDatabaseError
+
+ASSET_INDEX_PATH = os.path.join(DATA_DIR, "assets.idx")
+
+ASSET_KINDS = ("models", "particles", "sound_scripts", "sounds", "textures")
+
+MAGIC = b"SQAI"
+FORMAT_VERSION = 1
+
+# Entries per front-coded block; the first entry of a block is stored whole
+BLOCK_SIZE = 16
+
+_HEADER     = struct.Struct("<4sHH")    # magic, version, list count
+_LIST_ENTRY = struct.Struct("<16sIIQQ")  # kind, entries, blocks, offsets position, data position
+_ENTRY      = struct.Struct("<BH")      # shared prefix length, suffix length
+_OFFSET     = struct.Struct("<I")
+
+# Sound names may start with mixing characters ("#music.wav", ")weapons/...") that aren't part of the path
+_SOUND_CHARS = "*#@><^)(}$!?"
+
+
+def normalize_asset_name(kind: str, name: str) -> str:
+
+    """ Asset lookups are case-insensitive and accept either slash """
+
+    name = name.replace("\\", "/").lower()
+    if kind == "sounds":
+        name = name.lstrip(_SOUND_CHARS).removeprefix("sound/")
+    elif kind == "textures":
+        name = name.removeprefix("materials/")
+    return name
+
+
+def write_asset_index(path: str, lists: dict[str, Iterable[str]]) -> None:
+
+    """ Write normalized, sorted, deduplicated asset lists as front-coded blocks """
+
+    encoded_lists = []
+    for kind, names in lists.items():
+        keys = sorted({normalize_asset_name(kind, name).encode("utf-8") for name in names})
+
+        data = bytearray()
+        offsets = bytearray()
+        previous = b""
+        for i, key in enumerate(keys):
+            if i % BLOCK_SIZE == 0:
+                offsets += _OFFSET.pack(len(data))
+                shared = 0
+            else:
+                shared = min(_common_prefix(previous, key), 255)
+            suffix = key[shared:]
+            data += _ENTRY.pack(shared, len(suffix))
+            data += suffix
+            previous = key
+
+        encoded_lists.append((kind.encode("utf-8"), len(keys), len(offsets) // _OFFSET.size, bytes(offsets), bytes(data)))
+
+    position = _HEADER.size + _LIST_ENTRY.size * len(encoded_lists)
+    table = bytearray()
+    body = bytearray()
+    for kind, count, blocks, offsets, data in encoded_lists:
+        offsets_position = position + len(body)
+        body += offsets
+        data_position = position + len(body)
+        body += data
+        table += _LIST_ENTRY.pack(kind, count, blocks, offsets_position, data_position)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_lists)))
+        f.write(table)
+        f.write(body)
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+
+    length = min(len(a), len(b))
+    i = 0
+    while i < length and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class _AssetList:
+
+    """ One sorted list inside the mapped file """
+
+    def __init__(self, mapped: mmap.mmap, count: int, blocks: int, offsets_position: int, data_position: int):
+
+        self.map = mapped
+        self.count = count
+        self.blocks = blocks
+        self.offsets_position = offsets_position
+        self.data_position = data_position
+
+    def _block_start(self, block: int) -> int:
+        return self.data_position + _OFFSET.unpack_from(self.map, self.offsets_position + block * _OFFSET.size)[0]
+
+    def _first_key(self, block: int) -> bytes:
+
+        start = self._block_start(block)
+        _, length = _ENTRY.unpack_from(self.map, start)
+        start += _ENTRY.size
+        return self.map[start:start + length]
+
+    def _find_block(self, key: bytes) -> int:
+
+        """ Last block whose first key is <= key (binary search straight over the mapped file) """
+
+        low, high = 0, self.blocks
+        while low < high:
+            middle = (low + high) // 2
+            if self._first_key(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def _decode_block(self, block: int) -> Iterator[bytes]:
+
+        position = self._block_start(block)
+        remaining = min(BLOCK_SIZE, self.count - block * BLOCK_SIZE)
+        previous = b""
+        for _ in range(remaining):
+            shared, length = _ENTRY.unpack_from(self.map, position)
+            position += _ENTRY.size
+            previous = previous[:shared] + self.map[position:position + length]
+            position += length
+            yield previous
+
+    def iter_from(self, key: bytes) -> Iterator[bytes]:
+
+        """ Keys >= key, in order """
+
+        block = max(self._find_block(key), 0)
+        for current in range(block, self.blocks):
+            for entry in self._decode_block(current):
+                if entry >= key:
+                    yield entry
+
+    def __contains__(self, key: bytes) -> bool:
+
+        block = self._find_block(key)
+        if block < 0:
+            return False
+        for entry in self._decode_block(block):
+            if entry >= key:
+                return entry == key
+        return False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for block in range(self.blocks):
+            yield from self._decode_block(block)
+
+
+class AssetIndex:
+
+    """
+    Read-only asset index
+
+    The file is memory-mapped on first use and searched in place: only the few blocks a lookup
+    touches are decoded, so worker processes share the OS page cache instead of each holding
+    tens of thousands of Python strings.
+    """
+
+    def __init__(self, path: str = ASSET_INDEX_PATH):
+
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._lists: dict[str, _AssetList] = {}
+        # Whether the file exists, checked once; the asset checks ask before every call site
+        self._available: Optional[bool] = None
+
+    @property
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = os.path.exists(self.path)
+        return self._available
+
+    def _open(self) -> None:
+
+        if self._map is not None:
+            return
+        if not self.available:
+            raise GlobalsDatabaseError(f"Asset index not found: {self.path} (run build_globals.py)")
+
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, list_count = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise GlobalsDatabaseError(f"Incompatible asset index: {self.path} (run build_globals.py)")
+
+        for i in range(list_count):
+            kind, count, blocks, offsets_position, data_position = _LIST_ENTRY.unpack_from(mapped, _HEADER.size + i * _LIST_ENTRY.size)
+            self._lists[kind.rstrip(b"\0").decode("utf-8")] = _AssetList(mapped, count, blocks, offsets_position, data_position)
+        self._map = mapped
+        self._available = True
+
+    def _list(self, kind: str) -> Optional[_AssetList]:
+        self._open()
+        return self._lists.get(kind)
+
+    @property
+    def kinds(self) -> list[str]:
+        self._open()
+        return list(self._lists)
+
+    def count(self, kind: str) -> int:
+        asset_list = self._list(kind)
+        return asset_list.count if asset_list else 0
+
+    def contains(self, kind: str, name: str) -> bool:
+
+        """ Check if an asset of the given kind exists """
+
+        asset_list = self._list(kind)
+        return asset_list is not None and normalize_asset_name(kind, name).encode("utf-8") in asset_list
+
+    def iter_prefix(self, kind: str, prefix: str) -> Iterator[str]:
+
+        """ Asset names starting with a prefix, in sorted order """
+
+        asset_list = self._list(kind)
+        if asset_list is None:
+            return
+        key = normalize_asset_name(kind, prefix).encode("utf-8")
+        for entry in asset_list.iter_from(key):
+            if not entry.startswith(key):
+                return
+            yield entry.decode("utf-8")
+
+    def has_prefix(self, kind: str, prefix: str) -> bool:
+        return next(self.iter_prefix(kind, prefix), None) is not None
+
+    def names(self, kind: str) -> Iterator[str]:
+
+        """ Every asset name of a kind, in sorted order """
+
+        asset_list = self._list(kind)
+        if asset_list is not None:
+            for entry in asset_list:
+                yield entry.decode("utf-8")
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._lists.clear()
+            self._map.close()
+            self._map = None
+        self._available = None
+
+
+_shared: Optional[AssetIndex] = None
+
+
+def shared_asset_index() -> AssetIndex:
+
+    """ Process-wide index, mapped on the first asset call seen """
+
+    global _shared
+    if _shared is None:
+        _shared = AssetIndex()
+    return _shared
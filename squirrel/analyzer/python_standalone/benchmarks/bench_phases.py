@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analyzer phase by phase on a synthetic corpus
+
+Times lexing (the token stream filled up front), parsing (parser.program()), the extraction
+listener's walk, annotation stripping and checking separately, on programs from corpus.py or on
+given .tnut files. Results are written as JSON; --compare prints the per-phase ratio against an
+earlier results file so regressions show up run over run.
+
+Usage:
+    python benchmarks/bench_phases.py [--functions 50] [--classes 10] [--depth 3] [--density 0.7]
+                                      [--files 1] [--seed 1] [--repeat 3] [--output phases.json]
+                                      [--compare baseline.json] [paths ...]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream, ParseTreeWalker
+
+from corpus import DEFAULT_SPEC, CorpusSpec, generate_program
+from squirrel_analyzer import SquirrelTypeChecker, TypeAnnotationStripper
+from SquirrelParserLexer import SquirrelParserLexer
+from SquirrelParserParser import SquirrelParserParser
+from type_extractor import TypeExtractionListener
+
+PHASES = ("lex", "parse", "walk", "strip", "check")
+
+
+def run_once(name: str, source: str, checker: SquirrelTypeChecker) -> tuple[dict[str, float], dict[str, int]]:
+
+    """ Seconds per phase for one pass over source, and what it produced """
+
+    times = {}
+
+    start = time.perf_counter()
+    token_stream = CommonTokenStream(SquirrelParserLexer(InputStream(source)))
+    token_stream.fill()
+    times["lex"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parser = SquirrelParserParser(token_stream)
+    tree = parser.program()
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    listener = TypeExtractionListener()
+    ParseTreeWalker().walk(listener, tree)
+    times["walk"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    TypeAnnotationStripper(source).strip_annotations()
+    times["strip"] = time.perf_counter() - start
+
+    result = {
+        "variables" : listener.variables,
+        "functions" : listener.functions,
+        "classes"   : listener.classes,
+        "calls"     : listener.calls,
+        "constants" : listener.constants,
+    }
+    checker.current_file = name
+    start = time.perf_counter()
+    checker.check_extracted(result)
+    times["check"] = time.perf_counter() - start
+
+    counts = {
+        "tokens"        : len(token_stream.tokens),
+        "syntax_errors" : parser.getNumberOfSyntaxErrors(),
+        "messages"      : len(checker.messages),
+    }
+    return times, counts
+
+
+def run(name: str, source: str, repeat: int) -> dict:
+
+    """ Median and minimum per phase over repeat passes, each with a fresh checker """
+
+    samples: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    for _ in range(repeat):
+        times, counts = run_once(name, source, SquirrelTypeChecker())
+        for phase in PHASES:
+            samples[phase].append(times[phase])
+
+    return {
+        "name"   : name,
+        "bytes"  : len(source.encode("utf-8")),
+        "lines"  : source.count("\n") + 1,
+        **counts,
+        "phases" : {phase: {"median_s": statistics.median(s), "min_s": min(s)} for phase, s in samples.items()},
+    }
+
+
+def load_sources(args: argparse.Namespace) -> tuple[list[tuple[str, str]], dict]:
+
+    """ (name, source) pairs to benchmark and the description stored with the results """
+
+    if args.paths:
+        sources = []
+        for path in args.paths:
+            with open(path, "r", encoding="utf-8") as f:
+                sources.append((path, f.read()))
+        return sources, {"paths": args.paths}
+
+    spec = CorpusSpec(args.functions, args.classes, args.depth, args.density, args.seed)
+    sources = [(f"corpus_{index:03}.tnut", generate_program(spec._replace(seed=spec.seed + index)))
+               for index in range(args.files)]
+    return sources, {"spec": spec._asdict(), "files": args.files}
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Analyzer phase benchmark")
+    parser.add_argument("paths", nargs="*", help=".tnut files to use instead of a generated corpus")
+    parser.add_argument("--functions", type=int, default=DEFAULT_SPEC.functions)
+    parser.add_argument("--classes", type=int, default=DEFAULT_SPEC.classes)
+    parser.add_argument("--depth", type=int, default=DEFAULT_SPEC.depth)
+    parser.add_argument("--density", type=float, default=DEFAULT_SPEC.density)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SPEC.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    sources, corpus = load_sources(args)
+    # ANTLR fills its shared DFA cache on the first parse; keep that out of the timings
+    for name, source in sources[:1]:
+        run_once(name, source, SquirrelTypeChecker())
+    files = [run(name, source, args.repeat) for name, source in sources]
+    totals = {phase: sum(f["phases"][phase]["median_s"] for f in files) for phase in PHASES}
+
+    results = {
+        "corpus" : corpus,
+        "repeat" : args.repeat,
+        "python" : platform.python_version(),
+        "files"  : files,
+        "totals" : totals,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["totals"]
+
+    print(f"{'file':<20} {'KB':>6} {'tokens':>7} " + " ".join(f"{phase:>9}" for phase in PHASES))
+    for f in files:
+        print(f"{os.path.basename(f['name']):<20} {f['bytes'] / 1024:>6.1f} {f['tokens']:>7} "
+              + " ".join(f"{f['phases'][phase]['median_s'] * 1e3:>7.1f}ms" for phase in PHASES))
+    print(f"{'total':<20} {'':>6} {'':>7} " + " ".join(f"{totals[phase] * 1e3:>7.1f}ms" for phase in PHASES))
+    if baseline:
+        print(f"{'vs baseline':<20} {'':>6} {'':>7} "
+              + " ".join(f"{totals[phase] / baseline[phase]:>8.2f}x" if baseline.get(phase) else f"{'-':>9}"
+                         for phase in PHASES))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark "did you mean" suggestions on misspelled names
+
+Compares the trigram index in data/suggest.db against a brute-force edit-distance scan of the
+whole vocabulary, on names from the vocabulary with one or two random edits.
+
+Usage:
+    python benchmarks/bench_suggestions.py [--vocabularies textures netprops] [--queries 50] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from suggestion_index import SuggestionIndex, closest, edit_distance
+
+
+def misspell(name: str, rng: random.Random) -> str:
+
+    """ name with one or two random insertions, deletions or substitutions """
+
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(name))
+        edit = rng.choice("ids")
+        if edit == "i":
+            name = name[:position] + rng.choice(string.ascii_lowercase) + name[position:]
+        elif edit == "d" and len(name) > 4:
+            name = name[:position] + name[position + 1:]
+        else:
+            name = name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+    return name
+
+
+def run(index: SuggestionIndex, vocabulary: str, queries: int, seed: int) -> dict:
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    names = index._vocabulary(vocabulary).names
+    load_s = time.perf_counter() - start
+
+    misspelled = [misspell(rng.choice(names), rng) for _ in range(queries)]
+
+    start = time.perf_counter()
+    indexed = [index.suggest(vocabulary, name) for name in misspelled]
+    indexed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [closest(name, names) for name in misspelled]
+    brute_s = time.perf_counter() - start
+
+    # A query agrees when the best suggestion is as close as the brute-force best
+    agree = sum(
+        1 for query, got, want in zip(misspelled, indexed, expected)
+        if (not got and not want) or (got and want and edit_distance(query, got[0]) == edit_distance(query, want[0]))
+    )
+
+    return {
+        "vocabulary": vocabulary,
+        "names": len(names),
+        "load_s": load_s,
+        "indexed_ms": indexed_s / queries * 1e3,
+        "brute_ms": brute_s / queries * 1e3,
+        "agreement": agree / queries,
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Suggestion index benchmark")
+    parser.add_argument("--vocabularies", nargs="+", default=["textures", "sounds", "netprops"])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    index = SuggestionIndex()
+    if not index.available:
+        print("Error: data/suggest.db not found (run build_globals.py)", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{'vocabulary':>12} {'names':>7} {'load':>9} {'trigram/miss':>13} {'brute/miss':>11} {'agreement':>10}")
+    for vocabulary in args.vocabularies:
+        r = run(index, vocabulary, args.queries, args.seed)
+        print(f"{r['vocabulary']:>12} {r['names']:>7} {r['load_s'] * 1e3:>7.1f}ms {r['indexed_ms']:>11.2f}ms "
+              f"{r['brute_ms']:>9.1f}ms {r['agreement']:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark union construction and assignability on unions of many class types
+
+Compares the canonical UnionType against the previous representation
+(a raw set checked member by member).
+
+Usage:
+    python benchmarks/bench_unions.py [--sizes 10 100 500] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from class_hierarchy import ClassHierarchy
+from squirrel_types import ClassType, UnionType, NULL_TYPE, make_union
+
+
+def build_classes(count: int) -> list[ClassType]:
+
+    """ count classes in chains of 4: Class0 <- Class1 <- Class2 <- Class3, Class4 <- ... """
+
+    hierarchy = ClassHierarchy()
+    classes = []
+    for i in range(count):
+        base = f"Class{i - 1}" if i % 4 else None
+        hierarchy.define(f"Class{i}", base)
+        classes.append(ClassType(f"Class{i}", hierarchy=hierarchy))
+    for i, cls in enumerate(classes):
+        if i % 4:
+            cls.base_class = classes[i - 1]
+    return classes
+
+
+def raw_assignable(source: set, target: set) -> bool:
+
+    """ Assignability as done before normalization: every member against every member """
+    return all(any(t.is_assignable_to(ot) for ot in target) for t in source)
+
+
+def best_of(repeat: int, func) -> float:
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(size: int, repeat: int) -> dict:
+
+    classes = build_classes(size)
+
+    # A union written the long way: nested, with duplicates, subclasses and null
+    halves = [set(classes[: size // 2]), set(classes[size // 4:]) | {NULL_TYPE}]
+    raw_members = halves[0] | halves[1]
+    raw_target = set(classes)
+
+    canonical = make_union([make_union(halves[0]), make_union(halves[1])])
+    canonical_target = UnionType(classes)
+
+    results = {
+        "size": size,
+        "raw_members": len(raw_members),
+        "canonical_members": len(canonical.inner_type.types) if hasattr(canonical, "inner_type") else 1,
+        "construct_s": best_of(repeat, lambda: make_union([make_union(halves[0]), make_union(halves[1])])),
+        "raw_assign_s": best_of(repeat, lambda: raw_assignable(raw_members - {NULL_TYPE}, raw_target)),
+        "canonical_assign_s": best_of(repeat, lambda: canonical.inner_type.is_assignable_to(canonical_target)),
+    }
+    return results
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Union normalization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'classes':>8} {'members raw/canon':>18} {'construct':>11} {'assign raw':>11} {'assign canon':>13}")
+    for size in args.sizes:
+        r = run(size, args.repeat)
+        members = f"{r['raw_members']}/{r['canonical_members']}"
+        print(f"{r['size']:>8} {members:>18} {r['construct_s'] * 1e3:>9.2f}ms "
+              f"{r['raw_assign_s'] * 1e3:>9.2f}ms {r['canonical_assign_s'] * 1e3:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
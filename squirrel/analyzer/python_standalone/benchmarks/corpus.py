@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic .tnut corpus
+
+Generates annotated Squirrel programs from a seed: classes in inheritance chains, top-level
+functions whose bodies nest if/while/foreach blocks to a given depth, and engine API calls for the
+call-site checks. The same parameters always give the same text.
+
+Usage:
+    python benchmarks/corpus.py [--out corpus] [--functions 50] [--classes 10] [--depth 3]
+                                [--density 0.7] [--files 1] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+from typing import NamedTuple
+
+ENTITY = "CBaseEntity|null"
+TYPES = ("int", "float", "string", "bool", "array<int>", "table", ENTITY)
+
+LITERALS = {
+    "int"        : lambda rng: str(rng.randint(0, 1000)),
+    "float"      : lambda rng: f"{rng.uniform(0, 100):.2f}",
+    "string"     : lambda rng: f'"text{rng.randint(0, 99)}"',
+    "bool"       : lambda rng: rng.choice(("true", "false")),
+    "array<int>" : lambda rng: "[" + ", ".join(str(rng.randint(0, 9)) for _ in range(rng.randint(0, 4))) + "]",
+    "table"      : lambda rng: "{ key: " + str(rng.randint(0, 9)) + " }",
+    ENTITY       : lambda rng: "null",
+}
+
+# Engine calls the call-site checks look at
+API_CALLS = (
+    'NetProps.GetPropInt({entity}, "m_iHealth")',
+    'NetProps.SetPropFloat({entity}, "m_flModelScale", 1.5)',
+    'EntFireByHandle({entity}, "Kill", "", 0.0, null, null)',
+    'Entities.FindByClassname(null, "tf_player_manager")',
+    'PrecacheModel("models/ambulance.mdl")',
+    'Convars.GetInt("mp_timelimit")',
+)
+
+
+class CorpusSpec(NamedTuple):
+
+    """ Shape of one generated program """
+
+    functions: int = 50
+    classes: int = 10
+    depth: int = 3
+    density: float = 0.7
+    seed: int = 1
+
+
+DEFAULT_SPEC = CorpusSpec()
+
+
+class _Generator:
+
+    def __init__(self, spec: CorpusSpec):
+
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.lines: list[str] = []
+        self.indent = 0
+        self.counter = 0
+
+    def emit(self, text: str = "") -> None:
+        self.lines.append("    " * self.indent + text if text else "")
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def annotation(self, type_name: str) -> str:
+
+        """ ": type" for the configured fraction of declarations, else nothing """
+
+        return f": {type_name}" if self.rng.random() < self.spec.density else ""
+
+    def declaration(self) -> str:
+
+        type_name = self.rng.choice(TYPES)
+        name = self.name("value")
+        self.emit(f"local {name}{self.annotation(type_name)} = {LITERALS[type_name](self.rng)}")
+        return name
+
+    def block(self, depth: int) -> None:
+
+        """ A few statements, recursing into nested blocks until depth runs out """
+
+        numbers = [self.declaration() for _ in range(self.rng.randint(1, 3))]
+        self.emit(self.rng.choice(API_CALLS).format(entity="self_entity"))
+
+        if depth <= 0:
+            return
+
+        kind = self.rng.choice(("if", "while", "foreach"))
+        if kind == "if":
+            self.emit("if (self_entity != null) {")
+        elif kind == "while":
+            counter = self.name("i")
+            self.emit(f"local {counter}{self.annotation('int')} = 0")
+            self.emit(f"while ({counter} < {self.rng.randint(2, 8)}) {{")
+            self.indent += 1
+            self.emit(f"{counter}++")
+            self.indent -= 1
+        else:
+            self.emit("foreach (index, item in [1, 2, 3]) {")
+
+        self.indent += 1
+        self.block(depth - 1)
+        self.indent -= 1
+        self.emit("}")
+        if numbers and self.rng.random() < 0.3:
+            self.emit(f"printl({numbers[0]})")
+
+    def generate_class(self, index: int) -> None:
+
+        # Chains of 4, like the engine's class hierarchies
+        extends = f" extends Class{index - 1}" if index % 4 else ""
+        self.emit(f"class Class{index}{extends} {{")
+        self.indent += 1
+        for field in range(self.rng.randint(1, 4)):
+            type_name = self.rng.choice(TYPES[:4])
+            self.emit(f"field{index}_{field}{self.annotation(type_name)} = {LITERALS[type_name](self.rng)}")
+        self.emit("")
+        self.emit(f"constructor(value{self.annotation('int')}) {{")
+        self.indent += 1
+        self.emit(f"this.field{index}_0 = field{index}_0")
+        self.indent -= 1
+        self.emit("}")
+        for method in range(self.rng.randint(1, 3)):
+            self.emit("")
+            self.emit(f"function method{method}(self_entity{self.annotation(ENTITY)}){self.annotation('int')} {{")
+            self.indent += 1
+            self.block(max(0, self.spec.depth - 1))
+            self.emit(f"return {self.rng.randint(0, 9)}")
+            self.indent -= 1
+            self.emit("}")
+        self.indent -= 1
+        self.emit("}")
+        self.emit("")
+
+    def generate_function(self, index: int) -> None:
+
+        params = ", ".join(f"arg{i}{self.annotation(self.rng.choice(TYPES))}" for i in range(self.rng.randint(0, 3)))
+        params = ", ".join(filter(None, ("self_entity" + self.annotation(ENTITY), params)))
+        self.emit(f"function Function{index}({params}){self.annotation('int')} {{")
+        self.indent += 1
+        self.block(self.spec.depth)
+        if index:
+            self.emit(f"Function{self.rng.randrange(index)}(self_entity)")
+        self.emit(f"return {self.rng.randint(0, 9)}")
+        self.indent -= 1
+        self.emit("}")
+        self.emit("")
+
+    def generate(self) -> str:
+
+        self.emit(f"// Generated by benchmarks/corpus.py: {self.spec}")
+        self.emit("")
+        for index in range(self.spec.classes):
+            self.generate_class(index)
+        for index in range(self.spec.functions):
+            self.generate_function(index)
+        return "\n".join(self.lines)
+
+
+def generate_program(spec: CorpusSpec) -> str:
+
+    """ Source of one annotated program """
+
+    return _Generator(spec).generate()
+
+
+def write_corpus(directory: str, spec: CorpusSpec, files: int = 1) -> list[str]:
+
+    """ files programs, seeded spec.seed, spec.seed + 1, ...; returns their paths """
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"corpus_{index:03}.tnut")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_program(spec._replace(seed=spec.seed + index)))
+        paths.append(path)
+    return paths
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Synthetic .tnut corpus generator")
+    parser.add_argument("--out", default="corpus", help="Output directory")
+    parser.add_argument("--functions", type=int, default=DEFAULT_SPEC.functions)
+    parser.add_argument("--classes", type=int, default=DEFAULT_SPEC.classes)
+    parser.add_argument("--depth", type=int, default=DEFAULT_SPEC.depth)
+    parser.add_argument("--density", type=float, default=DEFAULT_SPEC.density, help="Fraction of declarations annotated")
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SPEC.seed)
+    args = parser.parse_args()
+
+    spec = CorpusSpec(args.functions, args.classes, args.depth, args.density, args.seed)
+    for path in write_corpus(args.out, spec, args.files):
+        print(f"{path}: {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Compile the globals_parsing outputs into the analyzer's binary databases
+
+Usage:
+    python build_globals.py [--source ../../../globals_parsing] [--output data] [--ts-output ../../src/data]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Optional
+
+from asset_index import ASSET_KINDS, normalize_asset_name, write_asset_index
+from globals_bundle import write_bundle
+from globals_db import DATA_DIR, write_database
+from netprop_index import kind_code
+from string_sets import write_string_sets
+from suggestion_index import write_suggestion_index
+
+GLOBALS_PARSING_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "globals_parsing"))
+TS_DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "data"))
+
+API_DATABASE       = "vscript_api.db"
+NETPROPS_DATABASE  = "netprops.db"
+ENTITIES_DATABASE  = "entities.db"
+EVENTS_DATABASE    = "events.db"
+CONSTANTS_DATABASE = "constants.db"
+ASSET_INDEX        = "assets.idx"
+STRING_SETS        = "string_sets.bin"
+SUGGESTIONS_INDEX  = "suggest.db"
+STRING_COMPLETIONS = "stringCompletions.json"
+
+# Script-visible singletons and the class documented for them on the wiki
+API_INSTANCES = {
+    "Convars"             : "Convars",
+    "Entities"            : "CEntities",
+    "EntityOutputs"       : "CScriptEntityOutputs",
+    "NavMesh"             : "CNavMesh",
+    "NetProps"            : "CNetPropManager",
+    "PlayerVoiceListener" : "CPlayerVoiceListener",
+}
+
+# Engine class inheritance, which the wiki tables don't spell out
+API_BASES = {
+    "CBaseAnimating"         : "CBaseEntity",
+    "CBaseCombatWeapon"      : "CBaseAnimating",
+    "CBaseFlex"              : "CBaseAnimating",
+    "CBaseCombatCharacter"   : "CBaseFlex",
+    "CBasePlayer"            : "CBaseCombatCharacter",
+    "CBaseMultiplayerPlayer" : "CBasePlayer",
+    "CTFPlayer"              : "CBaseMultiplayerPlayer",
+    "CTFBot"                 : "CTFPlayer",
+    "CEconEntity"            : "CBaseAnimating",
+    "NextBotCombatCharacter" : "CBaseCombatCharacter",
+    "CTFBaseBoss"            : "NextBotCombatCharacter",
+    "CPointTemplate"         : "CBaseEntity",
+    "CFuncTrackTrain"        : "CBaseEntity",
+    "CSceneEntity"           : "CBaseEntity",
+    "CEnvEntityMaker"        : "CBaseEntity",
+    "CPointScriptTemplate"   : "CBaseEntity",
+}
+
+# Wiki type names that have an analyzer equivalent
+TYPE_ALIASES = {
+    "handle"  : "instance",
+    "num"     : "int|float",
+    "unknown" : "any",
+    "object"  : "any",
+}
+
+_ENTRY_RE     = re.compile(r'^\t(\w+): \{$')
+_SIGNATURE_RE = re.compile(r'^\t\tsignature: "((?:[^"\\]|\\.)*)"')
+_HEADER_RE    = re.compile(r'^\t \* (\w+)\s*\*$')
+_PARAM_RE     = re.compile(r"^\s*(\w+)\s*:\s*([\w<>|\[\]]+)\W*?(=.*)?$")
+_FIELD_RE     = re.compile(r'^\t\t\t"(\w+): (\w+)')
+_CONSTANT_RE  = re.compile(r'^\t\t(\w+): \{$')
+_VALUE_RE     = re.compile(r'^\t\t\tdescription: "Value: `(.*)`"')
+
+
+def read_entries(path: str) -> list[tuple[Optional[str], str, str]]:
+
+    """ (class header, entry name, signature) for every entry of a functions/ output file """
+
+    entries = []
+    header = None
+    name = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            header_match = _HEADER_RE.match(line)
+            if header_match:
+                header = header_match.group(1)
+                continue
+            entry_match = _ENTRY_RE.match(line)
+            if entry_match:
+                name = entry_match.group(1)
+                continue
+            signature_match = _SIGNATURE_RE.match(line)
+            if signature_match and name:
+                entries.append((header, name, signature_match.group(1).replace('\\"', '"')))
+                name = None
+    return entries
+
+
+def read_enum_names(path: str) -> set[str]:
+
+    """ Enum names declared in constants/out.txt """
+
+    with open(path, "r", encoding="utf-8") as f:
+        return {m.group(1) for m in map(_ENTRY_RE.match, f) if m}
+
+
+def normalize_type(type_name: str, enums: set[str]) -> str:
+
+    """ Map a wiki type name onto one parse_type understands """
+
+    if type_name in enums:
+        return "int"
+    return TYPE_ALIASES.get(type_name, type_name)
+
+
+def compile_signature(signature: str, enums: set[str]) -> Optional[tuple]:
+
+    """
+    Compile "Class.Method(a: int, b: string = null) -> bool" into
+    (((name, type, optional), ...), return type). The name part is ignored.
+    """
+
+    open_paren = signature.find("(")
+    close_paren = signature.rfind(")")
+    if open_paren == -1 or close_paren < open_paren:
+        return None
+
+    params = []
+    params_text = signature[open_paren + 1:close_paren].strip()
+    for param_text in params_text.split(",") if params_text else []:
+        if param_text.strip() == "...":
+            params.append(("...", "any", True))
+            continue
+        param_match = _PARAM_RE.match(param_text)
+        if not param_match:
+            params.append((param_text.strip(), "any", False))
+            continue
+        params.append((param_match.group(1), normalize_type(param_match.group(2), enums), param_match.group(3) is not None))
+
+    return_text = signature[close_paren + 1:].strip()
+    return_type = normalize_type(return_text[2:].strip(), enums) if return_text.startswith("->") else "any"
+    return tuple(params), return_type
+
+
+def compile_functions(source_dir: str) -> dict[str, object]:
+
+    """
+    Compile functions/out*.txt into database sections
+
+        "classes"       {class name: base class name or None}
+        "instances"     {singleton name: class name}
+        "class:<Name>"  {"constructor": entry or None, "methods": {name: entry}}
+        "globals"       {name: entry}
+
+    where entry is (params, return type, obsolete).
+    """
+
+    functions_dir = os.path.join(source_dir, "functions")
+    enums = read_enum_names(os.path.join(source_dir, "constants", "out.txt"))
+
+    classes: dict[str, dict] = {}
+    global_functions: dict[str, tuple] = {}
+
+    for filename, obsolete in (("out.txt", False), ("out_obsolete.txt", True)):
+        for header, name, signature in read_entries(os.path.join(functions_dir, filename)):
+            compiled = compile_signature(signature, enums)
+            if header is None or compiled is None:
+                continue
+            cls = classes.setdefault(header, {"constructor": None, "methods": {}})
+            entry = compiled + (obsolete,)
+            if name == header:
+                # Overloaded constructors: keep the most general one
+                if cls["constructor"] is None or len(entry[0]) > len(cls["constructor"][0]):
+                    cls["constructor"] = entry
+            else:
+                cls["methods"].setdefault(name, entry)
+
+    last_class = read_entries(os.path.join(functions_dir, "out.txt"))[-1][0]
+    last_methods = classes.get(last_class, {}).get("methods", {})
+
+    for filename, obsolete in (("out_global.txt", False), ("out_global_obsolete.txt", True)):
+        leading = True
+        for _, name, signature in read_entries(os.path.join(functions_dir, filename)):
+            # The global scan starts inside the last class table and repeats it; skip that part
+            if leading and (name == "None" or name in last_methods):
+                continue
+            leading = False
+            compiled = compile_signature(signature, enums)
+            if compiled is not None:
+                global_functions.setdefault(name, compiled + (obsolete,))
+
+    sections: dict[str, object] = {
+        "classes": {name: API_BASES.get(name) for name in classes},
+        "instances": {name: cls for name, cls in API_INSTANCES.items() if cls in classes},
+        "globals": global_functions,
+    }
+    for name, cls in classes.items():
+        sections[f"class:{name}"] = cls
+
+    return sections
+
+
+def compile_netprops(source_dir: str) -> dict[str, object]:
+
+    """ Compile shared/properties.json into {"netprops": {name: kind code}} """
+
+    with open(os.path.join(source_dir, "shared", "properties.json"), "r", encoding="utf-8") as f:
+        properties = json.load(f)
+    return {"netprops": {name: kind_code(kind) for name, kind in sorted(properties.items())}}
+
+
+def compile_events(source_dir: str) -> dict[str, object]:
+
+    """ Compile events/out.txt into {"events": {event name: ((field, type), ...)}} """
+
+    events: dict[str, list] = {}
+    fields = None
+    with open(os.path.join(source_dir, "events", "out.txt"), "r", encoding="utf-8") as f:
+        for line in f:
+            entry_match = _ENTRY_RE.match(line.rstrip("\n"))
+            if entry_match:
+                fields = events.setdefault(entry_match.group(1).removeprefix("OnGameEvent_"), [])
+                continue
+            field_match = _FIELD_RE.match(line)
+            if field_match and fields is not None:
+                fields.append((field_match.group(1), TYPE_ALIASES.get(field_match.group(2), field_match.group(2))))
+    return {"events": {name: tuple(fields) for name, fields in sorted(events.items())}}
+
+
+def constant_value(text: str) -> tuple[str, object]:
+
+    """ (type name, value) of a constants table value; the value is None where the wiki has a note instead """
+
+    try:
+        return "int", int(text, 0)
+    except ValueError:
+        pass
+    try:
+        return "float", float(text)
+    except ValueError:
+        pass
+    if text.startswith("null"):
+        return "null", None
+    return "int", None
+
+
+def compile_constants(source_dir: str) -> dict[str, object]:
+
+    """
+    Compile constants/out.txt into database sections
+
+        "enums"        sorted enum names
+        "enum:<Name>"  {constant name: (type name, value)}
+    """
+
+    enums: dict[str, dict[str, tuple]] = {}
+    members = None
+    name = None
+    with open(os.path.join(source_dir, "constants", "out.txt"), "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            enum_match = _ENTRY_RE.match(line)
+            if enum_match:
+                members = enums.setdefault(enum_match.group(1), {})
+                continue
+            constant_match = _CONSTANT_RE.match(line)
+            if constant_match:
+                name = constant_match.group(1)
+                continue
+            value_match = _VALUE_RE.match(line)
+            if value_match and members is not None and name:
+                members[name] = constant_value(value_match.group(1))
+                name = None
+
+    sections: dict[str, object] = {"enums": tuple(sorted(enums))}
+    for enum, enum_members in enums.items():
+        sections[f"enum:{enum}"] = enum_members
+    return sections
+
+
+def compile_entities(source_dir: str) -> dict[str, object]:
+
+    """ Compile shared/entities.json into {"classnames": sorted lowercase classnames} """
+
+    with open(os.path.join(source_dir, "shared", "entities.json"), "r", encoding="utf-8") as f:
+        return {"classnames": sorted({name.lower() for name in json.load(f)})}
+
+
+# Name lists bundled into the string sets file: set name -> list in globals_parsing
+STRING_SET_SOURCES = {
+    "convars"          : os.path.join("convars", "output.txt"),
+    "attributes"       : os.path.join("attributes", "output.txt"),
+    "inputs"           : os.path.join("inputs", "output.txt"),
+    "outputs"          : os.path.join("outputs", "output.txt"),
+    # Keyvalues by kind; a key can be in several, depending on the entity
+    "keyvalues.number" : os.path.join("keyvalues", "output", "number.txt"),
+    "keyvalues.string" : os.path.join("keyvalues", "output", "string.txt"),
+    "keyvalues.vector" : os.path.join("keyvalues", "output", "vector.txt"),
+}
+
+
+def read_name_list(path: str) -> list[str]:
+
+    """ Names of a globals_parsing list ('"name",' per line) """
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip().rstrip(",").strip('"') for line in f if line.strip()]
+
+
+def compile_assets(source_dir: str) -> dict[str, list[str]]:
+
+    """ Read assets/output/<kind>.txt for every asset kind the analyzer checks """
+
+    output_dir = os.path.join(source_dir, "assets", "output")
+    return {kind: read_name_list(os.path.join(output_dir, f"{kind}.txt")) for kind in ASSET_KINDS}
+
+
+def compile_string_sets(source_dir: str) -> dict[str, list[str]]:
+
+    """ Read every list of STRING_SET_SOURCES """
+
+    return {name: read_name_list(os.path.join(source_dir, path)) for name, path in STRING_SET_SOURCES.items()}
+
+
+# Lists of the TS package's stringCompletions.json in StringKind order (squirrel/src/types.ts), by
+# compiled list name. None marks lists maintained by hand in the JSON: targetnames, client convars,
+# and the netprop kinds, which the TS side curates apart from shared/properties.json
+STRING_COMPLETION_LISTS = (
+    "inputs", "outputs", None, "classnames",
+    "keyvalues.number", "keyvalues.vector", "keyvalues.string", "attributes",
+    "models", "sounds", "sound_scripts", "particles", "convars", None,
+    None, None, None, None, None, None,
+    None, None, None, None, None, None,
+)
+
+
+def export_string_completions(path: str, lists: dict[str, list[str]]) -> int:
+
+    """ Rewrite the compiled lists of stringCompletions.json in place; returns how many changed """
+
+    with open(path, "r", encoding="utf-8") as f:
+        completions = json.load(f)
+    if len(completions) != len(STRING_COMPLETION_LISTS):
+        raise ValueError(f"{path} has {len(completions)} lists, expected {len(STRING_COMPLETION_LISTS)}")
+
+    changed = 0
+    for kind, name in enumerate(STRING_COMPLETION_LISTS):
+        if name is not None and completions[kind] != lists[name]:
+            completions[kind] = lists[name]
+            changed += 1
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(completions, indent=2))
+    return changed
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compile globals_parsing outputs for the analyzer")
+    parser.add_argument("--source", default=GLOBALS_PARSING_DIR, help="globals_parsing directory")
+    parser.add_argument("--output", default=DATA_DIR, help="Directory for the compiled databases")
+    parser.add_argument("--ts-output", default=TS_DATA_DIR, help="TS package data directory, for stringCompletions.json")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source):
+        print(f"Error: globals_parsing directory not found: {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    sections = compile_functions(args.source)
+    path = os.path.join(args.output, API_DATABASE)
+    write_database(path, sections)
+    print(f"{path}: {len(sections['classes'])} classes, {len(sections['globals'])} global functions")
+
+    netprops = compile_netprops(args.source)
+    path = os.path.join(args.output, NETPROPS_DATABASE)
+    write_database(path, netprops)
+    print(f"{path}: {len(netprops['netprops'])} netprops")
+
+    constants = compile_constants(args.source)
+    path = os.path.join(args.output, CONSTANTS_DATABASE)
+    write_database(path, constants)
+    constant_count = sum(len(constants[f"enum:{enum}"]) for enum in constants["enums"])
+    print(f"{path}: {len(constants['enums'])} enums, {constant_count} constants")
+
+    events = compile_events(args.source)
+    path = os.path.join(args.output, EVENTS_DATABASE)
+    write_database(path, events)
+    print(f"{path}: {len(events['events'])} game events")
+
+    entities = compile_entities(args.source)
+    path = os.path.join(args.output, ENTITIES_DATABASE)
+    write_database(path, entities)
+    print(f"{path}: {len(entities['classnames'])} classnames")
+
+    assets = compile_assets(args.source)
+    path = os.path.join(args.output, ASSET_INDEX)
+    write_asset_index(path, assets)
+    print(f"{path}: " + ", ".join(f"{len(names)} {kind}" for kind, names in assets.items()))
+
+    string_sets = compile_string_sets(args.source)
+    path = os.path.join(args.output, STRING_SETS)
+    write_string_sets(path, string_sets)
+    print(f"{path}: " + ", ".join(f"{len(names)} {name}" for name, names in string_sets.items()))
+
+    vocabularies = {kind: [normalize_asset_name(kind, name) for name in names] for kind, names in assets.items()}
+    vocabularies["netprops"] = list(netprops["netprops"])
+    vocabularies["classnames"] = entities["classnames"]
+    vocabularies["events"] = list(events["events"])
+    for name, names in string_sets.items():
+        vocabulary = "keyvalues" if name.startswith("keyvalues.") else name
+        vocabularies.setdefault(vocabulary, []).extend(names)
+    path = os.path.join(args.output, SUGGESTIONS_INDEX)
+    write_suggestion_index(path, vocabularies)
+    print(f"{path}: trigram index of {', '.join(vocabularies)}")
+
+    lists = dict(string_sets, **assets, classnames=read_name_list(os.path.join(args.source, "entities", "output.txt")))
+    path = os.path.join(args.ts_output, STRING_COMPLETIONS)
+    changed = export_string_completions(path, lists)
+    print(f"{path}: {changed} of {sum(1 for name in STRING_COMPLETION_LISTS if name)} compiled lists changed")
+
+    counts = {
+        "classes"    : len(sections["classes"]),
+        "functions"  : len(sections["globals"]),
+        "constants"  : constant_count,
+        "events"     : len(events["events"]),
+        "netprops"   : len(netprops["netprops"]),
+        "classnames" : len(entities["classnames"]),
+    }
+    counts.update((kind, len(names)) for kind, names in assets.items())
+    version = write_bundle(args.output, counts)
+    print(f"{os.path.join(args.output, 'bundle.db')}: version {version[:12]}")
+
+
+if __name__ == "__main__":
+    main()
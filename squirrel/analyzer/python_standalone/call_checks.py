@@ -0,0 +1,385 @@
+""" Call-site checks of string arguments against the precompiled VScript globals """
+
+from typing import Callable, Optional
+
+from asset_index import normalize_asset_name, shared_asset_index
+from constant_index import shared_constant_index
+from entity_classes import CLASSNAME_ARGUMENTS, WILDCARD, shared_entity_class_index
+from netprop_index import NETPROP_ACCESSORS, shared_netprop_index
+from string_sets import shared_string_sets
+from suggestion_index import did_you_mean, edit_distance, shared_suggestion_index
+from type_extractor import CallInfo, literal_kind, string_literal_value, table_literal_members
+
+# Asset-taking functions: name -> (argument index, asset kinds tried in order)
+MODEL_ARGUMENT   = (0, ("models",))
+SOUND_ARGUMENT   = (0, ("sounds",))
+SCRIPT_ARGUMENT  = (0, ("sound_scripts", "sounds"))
+
+ASSET_ARGUMENTS = {
+    "PrecacheModel"                     : MODEL_ARGUMENT,
+    "SetModel"                          : MODEL_ARGUMENT,
+    "SetModelSimple"                    : MODEL_ARGUMENT,
+    "SetCustomModel"                    : MODEL_ARGUMENT,
+    "SetCustomModelWithClassAnimations" : MODEL_ARGUMENT,
+    "SetCustomViewModel"                : MODEL_ARGUMENT,
+    "GetModelIndex"                     : MODEL_ARGUMENT,
+    "IsModelPrecached"                  : MODEL_ARGUMENT,
+    "FindByModel"                       : (1, ("models",)),
+    "PrecacheSound"                     : SOUND_ARGUMENT,
+    "IsSoundPrecached"                  : SOUND_ARGUMENT,
+    "PrecacheScriptSound"               : SCRIPT_ARGUMENT,
+    "PrecacheSoundScript"               : SCRIPT_ARGUMENT,
+    "EmitSound"                         : SCRIPT_ARGUMENT,
+    "StopSound"                         : SCRIPT_ARGUMENT,
+    "EmitSoundOn"                       : SCRIPT_ARGUMENT,
+    "StopSoundOn"                       : SCRIPT_ARGUMENT,
+    "EmitSoundOnClient"                 : SCRIPT_ARGUMENT,
+    "EmitAmbientSoundOn"                : SCRIPT_ARGUMENT,
+    "StopAmbientSoundOn"                : SCRIPT_ARGUMENT,
+    "GetSoundDuration"                  : SCRIPT_ARGUMENT,
+    "DispatchParticleEffect"            : (0, ("particles",)),
+}
+
+CONVAR_READERS = ("GetBool", "GetInt", "GetFloat", "GetStr", "IsConVarOnAllowList")
+
+ATTRIBUTE_METHODS = ("AddAttribute", "GetAttribute", "RemoveAttribute",
+                     "AddCustomAttribute", "GetCustomAttribute", "RemoveCustomAttribute")
+
+# Functions naming an input: name -> (input argument, parameter argument)
+INPUT_ARGUMENTS = {
+    "EntFire"         : (1, 2),
+    "DoEntFire"       : (1, 2),
+    "EntFireByHandle" : (1, 2),
+    "AcceptInput"     : (0, 1),
+}
+
+# Functions naming outputs: name -> (output argument, input argument or None)
+OUTPUT_ARGUMENTS = {
+    "EntityOutputs.AddOutput"      : (1, 3),
+    "EntityOutputs.RemoveOutput"   : (1, 3),
+    "EntityOutputs.HasOutput"      : (1, None),
+    "EntityOutputs.GetOutputTable" : (1, None),
+    "ConnectOutput"                : (0, None),
+    "DisconnectOutput"             : (0, None),
+}
+
+KEYVALUE_KINDS = ("number", "string", "vector")
+
+# KeyValueFrom* setter -> keyvalue kinds it can set. Strings are parsed, so they can set any kind
+KEYVALUE_SETTERS = {
+    "KeyValueFromInt"    : {"number"},
+    "KeyValueFromFloat"  : {"number"},
+    "KeyValueFromVector" : {"vector"},
+    "KeyValueFromString" : set(KEYVALUE_KINDS),
+}
+
+# Literal kind -> keyvalue kinds it can set in a SpawnEntityFromTable table
+_LITERAL_KEYVALUE_KINDS = {
+    "number" : {"number"},
+    "bool"   : {"number"},
+    "string" : set(KEYVALUE_KINDS),
+    "vector" : {"vector"},
+}
+
+# Constant type -> literal kind it stands for
+_CONSTANT_KINDS = {
+    "int"    : "number",
+    "float"  : "number",
+    "bool"   : "bool",
+    "string" : "string",
+}
+
+_ASSET_DESCRIPTIONS = {
+    "models"        : "model",
+    "particles"     : "particle system",
+    "sound_scripts" : "sound script",
+    "sounds"        : "sound",
+    "textures"      : "texture",
+}
+
+
+class CallSiteChecker:
+
+    """
+    Dispatches extracted calls to argument checks
+
+    Checks are registered by full callee text ("NetProps.GetPropInt") or, for methods that can be
+    called on any instance, by method name ("KeyValueFromInt"). The indexes a check consults are
+    only loaded once a matching call is seen.
+    """
+
+    def __init__(self, checker):
+
+        self.checker = checker
+        self.by_callee: dict[str, Callable[[CallInfo], None]] = {}
+        self.by_method: dict[str, Callable[[CallInfo], None]] = {}
+
+        for accessor in NETPROP_ACCESSORS:
+            self.by_callee[f"NetProps.{accessor}"] = self.check_netprop
+        for callee in CLASSNAME_ARGUMENTS:
+            self.by_callee[callee] = self.check_classname
+        self.by_callee["SpawnEntityFromTable"] = self.check_spawn_entity
+        self.by_callee["Convars.SetValue"] = self.check_convar_write
+        for reader in CONVAR_READERS:
+            self.by_callee[f"Convars.{reader}"] = self.check_convar_read
+        for method in ATTRIBUTE_METHODS:
+            self.by_method[method] = self.check_attribute
+        for function in INPUT_ARGUMENTS:
+            self.by_method[function] = self.check_input
+        for function in OUTPUT_ARGUMENTS:
+            if "." in function:
+                self.by_callee[function] = self.check_output
+            else:
+                self.by_method[function] = self.check_output
+        for setter in KEYVALUE_SETTERS:
+            self.by_method[setter] = self.check_keyvalue_setter
+        for function in ASSET_ARGUMENTS:
+            self.by_method[function] = self.check_asset
+        self.by_method["EmitSoundEx"] = self.check_emit_sound_ex
+
+    def check(self, calls: list[CallInfo]) -> None:
+
+        """ Run the registered check of every call that has one """
+
+        for call in calls:
+            handler = self.by_callee.get(call.callee) or self.by_method.get(call.method)
+            if handler:
+                handler(call)
+
+    def location(self, call: CallInfo, argument: int):
+
+        line, column = call.argument_locations[argument]
+        return self.checker.location(line, column)
+
+    def check_netprop(self, call: CallInfo) -> None:
+
+        """ NetProps.<accessor>(entity, "m_propName", ...) """
+
+        if len(call.literals) < 2 or call.literals[1] is None:
+            return
+
+        index = shared_netprop_index()
+        if not index.available:
+            return
+
+        name = call.literals[1]
+        problem = index.check_access(call.method, name)
+        if problem is None:
+            return
+        if index.kind(name) is None:
+            self.checker.warning(problem + self.suggestions("netprops", name), self.location(call, 1), "unknown-netprop")
+        else:
+            self.checker.warning(problem, self.location(call, 1), "netprop-kind-mismatch")
+
+    def literal(self, call: CallInfo, argument: Optional[int]) -> Optional[str]:
+
+        """ String literal passed as an argument, if there is one """
+
+        if argument is None or len(call.literals) <= argument:
+            return None
+        return call.literals[argument]
+
+    def check_name(self, set_name: str, name: str, location, message: str, code: str) -> None:
+
+        """ Warn if name isn't in a bundled string set """
+
+        sets = shared_string_sets()
+        if sets.available and not sets.contains(set_name, name):
+            self.checker.warning(message + self.suggestions(set_name, name), location, code)
+
+    def check_convar_write(self, call: CallInfo) -> None:
+
+        """ Convars.SetValue("name", value) only works for allow-listed convars """
+
+        name = self.literal(call, 0)
+        if name:
+            self.check_name("convars", name, self.location(call, 0), f"Convar '{name}' is not on the VScript allow list", "convar-not-allowed")
+
+    def check_convar_read(self, call: CallInfo) -> None:
+
+        """
+        Convars.GetInt("name"), ...
+
+        Any convar can be read, so only names one edit away from an allow-listed convar are
+        reported, as likely typos.
+        """
+
+        name = self.literal(call, 0)
+        sets = shared_string_sets()
+        if not name or not sets.available or sets.contains("convars", name):
+            return
+        index = shared_suggestion_index()
+        suggestions = index.suggest("convars", name) if index.available else []
+        if suggestions and edit_distance(name, suggestions[0]) == 1:
+            self.checker.warning(f"Unknown convar '{name}'" + did_you_mean(suggestions[:1]), self.location(call, 0), "unknown-convar")
+
+    def check_attribute(self, call: CallInfo) -> None:
+
+        """ player.AddAttribute("damage bonus", 2.0, -1), ... """
+
+        name = self.literal(call, 0)
+        if name:
+            self.check_name("attributes", name, self.location(call, 0), f"Unknown attribute '{name}'", "unknown-attribute")
+
+    def check_input(self, call: CallInfo) -> None:
+
+        """ EntFire("target", "Input", "param"), ent.AcceptInput("Input", "param", null, null), ... """
+
+        input_argument, parameter_argument = INPUT_ARGUMENTS[call.method]
+        name = self.literal(call, input_argument)
+        if not name:
+            return
+        self.check_name("inputs", name, self.location(call, input_argument), f"Unknown input '{name}'", "unknown-input")
+
+        parameter = self.literal(call, parameter_argument)
+        if name.lower() == "addoutput" and parameter:
+            self.check_add_output(parameter, self.location(call, parameter_argument))
+
+    def check_add_output(self, parameter: str, location) -> None:
+
+        """
+        AddOutput parameter: "OnTrigger target:Input:param:delay:times" adds an output.
+        Without a target:input part it sets a keyvalue ("targetname foo") instead.
+        """
+
+        output, _, connection = parameter.strip().partition(" ")
+        fields = connection.split(":")
+        if len(fields) < 2:
+            return
+        self.check_name("outputs", output, location, f"Unknown output '{output}'", "unknown-output")
+        input_name = fields[1].strip()
+        if input_name:
+            self.check_name("inputs", input_name, location, f"Unknown input '{input_name}'", "unknown-input")
+
+    def check_output(self, call: CallInfo) -> None:
+
+        """ EntityOutputs.AddOutput(ent, "OnTrigger", "target", "Input", "", 0, -1), ent.ConnectOutput("OnTrigger", "Func"), ... """
+
+        output_argument, input_argument = OUTPUT_ARGUMENTS[call.callee if call.callee in OUTPUT_ARGUMENTS else call.method]
+        output = self.literal(call, output_argument)
+        if output:
+            self.check_name("outputs", output, self.location(call, output_argument), f"Unknown output '{output}'", "unknown-output")
+        input_name = self.literal(call, input_argument)
+        if input_name:
+            self.check_name("inputs", input_name, self.location(call, input_argument), f"Unknown input '{input_name}'", "unknown-input")
+
+    def keyvalue_kinds(self, key: str) -> set[str]:
+
+        """ Kinds a keyvalue has across entities; empty if it's unknown """
+
+        sets = shared_string_sets()
+        return {kind for kind in KEYVALUE_KINDS if sets.contains(f"keyvalues.{kind}", key)}
+
+    def check_keyvalue(self, key: str, accepted: set[str], how: str, location) -> None:
+
+        """ Warn if a keyvalue is unknown or none of its kinds can be set the way it is """
+
+        sets = shared_string_sets()
+        if not sets.available:
+            return
+
+        kinds = self.keyvalue_kinds(key)
+        if not kinds:
+            self.checker.warning(f"Unknown keyvalue '{key}'" + self.suggestions("keyvalues", key), location, "unknown-keyvalue")
+        elif not kinds & accepted:
+            kind_names = " or ".join(sorted(kinds))
+            self.checker.warning(f"Keyvalue '{key}' is a {kind_names}, it can't be set with {how}", location, "keyvalue-kind-mismatch")
+
+    def check_keyvalue_setter(self, call: CallInfo) -> None:
+
+        """ ent.KeyValueFromInt("health", 100), ... """
+
+        key = self.literal(call, 0)
+        if key:
+            self.check_keyvalue(key, KEYVALUE_SETTERS[call.method], call.method, self.location(call, 0))
+
+    def check_spawn_table(self, call: CallInfo) -> None:
+
+        """ SpawnEntityFromTable("prop_dynamic", { model = "...", origin = Vector(...), OnUser1 = "..." }) """
+
+        members = table_literal_members(call.argument_nodes[1]) if len(call.argument_nodes) > 1 else None
+        if not members:
+            return
+
+        sets = shared_string_sets()
+        for key, value in members.items():
+            # Outputs can be connected from the spawn table too
+            if key.lower() == "classname" or (sets.available and sets.contains("outputs", key)):
+                continue
+            kind = literal_kind(value) or self.constant_kind(value)
+            accepted = _LITERAL_KEYVALUE_KINDS.get(kind, set(KEYVALUE_KINDS))
+            how = f"a {kind} value" if kind else "this value"
+            member = value.parentCtx  # the tableMember, which starts at the key
+            self.check_keyvalue(key, accepted, how, self.checker.location(member.start.line, member.start.column))
+
+    def constant_kind(self, value) -> Optional[str]:
+
+        """ Literal kind of a Constants.<Enum>.<NAME> value, from its resolved type """
+
+        parts = value.getText().removeprefix("::").split(".")
+        if len(parts) != 3 or parts[0] != "Constants":
+            return None
+        constant = shared_constant_index().resolve(parts[1], parts[2])
+        return _CONSTANT_KINDS.get(constant.type) if constant else None
+
+    def check_spawn_entity(self, call: CallInfo) -> None:
+
+        self.check_classname(call)
+        self.check_spawn_table(call)
+
+    def check_classname(self, call: CallInfo) -> None:
+
+        """ SpawnEntityFromTable("prop_dynamic", {...}), Entities.FindByClassname(null, "tf_weapon_*") """
+
+        argument = CLASSNAME_ARGUMENTS[call.callee]
+        if len(call.literals) <= argument or not call.literals[argument]:
+            return
+
+        index = shared_entity_class_index()
+        if not index.available:
+            return
+
+        classname = call.literals[argument]
+        if not index.exists(classname):
+            suggestions = "" if classname.endswith(WILDCARD) else self.suggestions("classnames", classname.lower())
+            self.checker.warning(f"Unknown entity classname '{classname}'{suggestions}", self.location(call, argument), "unknown-classname")
+
+    def check_asset(self, call: CallInfo) -> None:
+
+        """ PrecacheModel("models/...mdl"), EmitSoundOn("Sound.Script", ent), ... """
+
+        argument, kinds = ASSET_ARGUMENTS[call.method]
+        if len(call.literals) > argument:
+            self.check_asset_name(call.literals[argument], kinds, self.location(call, argument))
+
+    def check_emit_sound_ex(self, call: CallInfo) -> None:
+
+        """ EmitSoundEx({ sound_name = "...", ... }) """
+
+        members = table_literal_members(call.argument_nodes[0]) if call.argument_nodes else None
+        if members and "sound_name" in members:
+            value = members["sound_name"]
+            line, column = value.start.line, value.start.column
+            self.check_asset_name(string_literal_value(value), SCRIPT_ARGUMENT[1], self.checker.location(line, column))
+
+    def check_asset_name(self, name: Optional[str], kinds: tuple[str, ...], location) -> None:
+
+        # An empty name clears custom models; dynamic names can't be checked
+        if not name:
+            return
+
+        index = shared_asset_index()
+        if not index.available:
+            return
+
+        if not any(index.contains(kind, name) for kind in kinds):
+            description = " or ".join(_ASSET_DESCRIPTIONS[kind] for kind in kinds)
+            message = f"Unknown {description} '{name}'" + self.suggestions(kinds[0], normalize_asset_name(kinds[0], name))
+            self.checker.warning(message, location, "unknown-asset")
+
+    def suggestions(self, vocabulary: str, name: str) -> str:
+
+        """ ", did you mean ...?" for a name missing from a vocabulary, if anything is close """
+
+        index = shared_suggestion_index()
+        return did_you_mean(index.suggest(vocabulary, name)) if index.available else ""
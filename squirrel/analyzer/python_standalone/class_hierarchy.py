@@ -0,0 +1,140 @@
+""" Workspace-wide class hierarchy index """
+
+from typing import Optional
+
+
+class ClassHierarchy:
+
+    """
+    Assigns every class an integer id and keeps, per class, a bitset of its ancestors
+    (the class itself included). Subclass checks are a single shift-and-mask.
+
+    Classes may be referenced as a base before they are declared; they get an id right away
+    and their ancestors are filled in once the declaration shows up. Redefining a class only
+    recomputes the masks of that class and its descendants.
+    """
+
+    NO_BASE = -1
+
+    def __init__(self):
+
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.base_ids: list[int] = []
+        self.ancestor_masks: list[int] = []
+        self.defined: list[bool] = []
+        self.version = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        return name in self.ids
+
+    def class_id(self, name: str) -> int:
+
+        """ Get the id of a class, allocating one for names not seen yet """
+
+        cid = self.ids.get(name)
+        if cid is None:
+            cid = len(self.names)
+            self.ids[name] = cid
+            self.names.append(name)
+            self.base_ids.append(self.NO_BASE)
+            self.ancestor_masks.append(1 << cid)
+            self.defined.append(False)
+        return cid
+
+    def define(self, name: str, base: Optional[str] = None) -> list[int]:
+
+        """
+        Declare (or redeclare) a class and its base class
+
+        Returns the ids of the classes whose ancestors changed: the class and all its descendants.
+        Raises ValueError if the declaration would make the hierarchy cyclic.
+        """
+
+        cid = self.class_id(name)
+        base_id = self.class_id(base) if base else self.NO_BASE
+        self.defined[cid] = True
+
+        if self.base_ids[cid] == base_id:
+            return []
+
+        if base_id != self.NO_BASE and self.is_subclass_id(base_id, cid):
+            raise ValueError(f"Class '{name}' cannot extend '{base}': cyclic inheritance")
+
+        affected = self.descendant_ids(cid)
+        self.base_ids[cid] = base_id
+        for affected_id in affected:
+            self.ancestor_masks[affected_id] = self._compute_mask(affected_id)
+
+        self.version += 1
+        return affected
+
+    def remove(self, name: str) -> list[int]:
+
+        """ Forget a class declaration. Its id stays reserved for descendants that still name it """
+
+        cid = self.ids.get(name)
+        if cid is None:
+            return []
+        self.defined[cid] = False
+        if self.base_ids[cid] == self.NO_BASE:
+            return []
+
+        affected = self.descendant_ids(cid)
+        self.base_ids[cid] = self.NO_BASE
+        for affected_id in affected:
+            self.ancestor_masks[affected_id] = self._compute_mask(affected_id)
+
+        self.version += 1
+        return affected
+
+    def _compute_mask(self, cid: int) -> int:
+
+        mask = 0
+        while cid != self.NO_BASE and not (mask >> cid) & 1:
+            mask |= 1 << cid
+            cid = self.base_ids[cid]
+        return mask
+
+    def descendant_ids(self, cid: int) -> list[int]:
+
+        """ Ids of a class and every class that (transitively) extends it """
+        return [other for other, mask in enumerate(self.ancestor_masks) if (mask >> cid) & 1]
+
+    def is_subclass_id(self, sub_id: int, super_id: int) -> bool:
+        return bool((self.ancestor_masks[sub_id] >> super_id) & 1)
+
+    def is_subclass(self, sub: str, sup: str) -> bool:
+
+        """ Check if 'sub' is 'sup' or inherits from it """
+
+        sub_id = self.ids.get(sub)
+        super_id = self.ids.get(sup)
+        if sub_id is None or super_id is None:
+            return False
+        return self.is_subclass_id(sub_id, super_id)
+
+    def base_of(self, name: str) -> Optional[str]:
+
+        """ Name of the direct base class, if any """
+
+        cid = self.ids.get(name)
+        if cid is None or self.base_ids[cid] == self.NO_BASE:
+            return None
+        return self.names[self.base_ids[cid]]
+
+    def ancestors(self, name: str) -> list[str]:
+
+        """ The class and its ancestors, nearest first """
+
+        result = []
+        cid = self.ids.get(name, self.NO_BASE)
+        seen = 0
+        while cid != self.NO_BASE and not (seen >> cid) & 1:
+            seen |= 1 << cid
+            result.append(self.names[cid])
+            cid = self.base_ids[cid]
+        return result
@@ -0,0 +1,92 @@
+""" Precompiled Constants.<Enum>.<NAME> index """
+
+import os
+from typing import Any, NamedTuple, Optional
+
+from globals_db import DATA_DIR, GlobalsDatabase
+from squirrel_types import SQUIRREL_TYPES, SquirrelType
+
+CONSTANTS_DATABASE_PATH = os.path.join(DATA_DIR, "constants.db")
+
+
+class Constant(NamedTuple):
+
+    """ Type name and value of a constant; value is None where the wiki gives none """
+
+    type: str
+    value: Any
+
+    @property
+    def squirrel_type(self) -> SquirrelType:
+        return SQUIRREL_TYPES[self.type]
+
+
+class ConstantIndex:
+
+    """
+    Enum name -> {constant name: Constant}
+
+    The database lists the enum names in one section and stores each enum in its own, so
+    resolving Constants.ETFCond.* only decodes ETFCond.
+    """
+
+    def __init__(self, path: str = CONSTANTS_DATABASE_PATH):
+
+        self.db = GlobalsDatabase(path)
+        self._enums: Optional[frozenset[str]] = None
+        self._members: dict[str, dict[str, Constant]] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def enums(self) -> frozenset[str]:
+        return self.load()
+
+    def load(self) -> frozenset[str]:
+
+        """ Read the enum names, once; each enum's members are still decoded on first use """
+
+        if self._enums is None:
+            self._enums = frozenset(self.db.get("enums", ()) if self.db.available else ())
+        return self._enums
+
+    def members(self, enum: str) -> Optional[dict[str, Constant]]:
+
+        """ Constants of an enum, or None if there is no such enum """
+
+        members = self._members.get(enum)
+        if members is None:
+            if enum not in self.enums:
+                return None
+            members = {name: Constant(*entry) for name, entry in self.db.get(f"enum:{enum}", {}).items()}
+            self._members[enum] = members
+        return members
+
+    def resolve(self, enum: str, name: str) -> Optional[Constant]:
+
+        """ Type and value of Constants.<enum>.<name>, or None if either is unknown """
+
+        members = self.members(enum)
+        return members.get(name) if members else None
+
+    def value(self, enum: str, name: str) -> Any:
+
+        """ Known value of a constant, for constant folding; None if unknown """
+
+        constant = self.resolve(enum, name)
+        return constant.value if constant else None
+
+
+_shared: Optional[ConstantIndex] = None
+
+
+def shared_constant_index() -> ConstantIndex:
+
+    """ Process-wide index, created on the first Constants reference seen """
+
+    global _shared
+    if _shared is None:
+        _shared = ConstantIndex()
+    return _shared
@@ -0,0 +1,407 @@
+""" Control-flow graphs for Squirrel function bodies """
+
+from array import array
+from typing import Any, Optional
+
+from antlr4 import ParserRuleContext
+from SquirrelParserParser import SquirrelParserParser as P
+
+from profiling import cache_lookup
+
+
+# Block kinds
+BLOCK_NORMAL = 0
+BLOCK_ENTRY  = 1
+BLOCK_EXIT   = 2
+BLOCK_LOOP   = 3  # loop header (condition / iteration)
+BLOCK_CATCH  = 4
+
+
+class ControlFlowGraph:
+
+    """
+    Control-flow graph of a single function body
+
+    Blocks are plain integers. Block 0 is the entry and block 1 the exit.
+    Everything is stored in flat integer arrays:
+
+        block_kinds        kind of each block
+        block_stmt_offsets statements of block b are statements[offsets[b]:offsets[b + 1]]
+        succ_offsets       successors of block b are succ_targets[offsets[b]:offsets[b + 1]]
+        pred_offsets       predecessors of block b are pred_targets[offsets[b]:offsets[b + 1]]
+
+    Statements are the parse contexts of the individual statements, in source order.
+    Compound statements (if, while, switch, ...) appear in the block that evaluates their head.
+    """
+
+    ENTRY = 0
+    EXIT  = 1
+
+    def __init__(self, statements: list[Any], block_kinds: array, block_stmt_offsets: array,
+                 succ_offsets: array, succ_targets: array, pred_offsets: array, pred_targets: array):
+
+        self.statements         = statements
+        self.block_kinds        = block_kinds
+        self.block_stmt_offsets = block_stmt_offsets
+        self.succ_offsets       = succ_offsets
+        self.succ_targets       = succ_targets
+        self.pred_offsets       = pred_offsets
+        self.pred_targets       = pred_targets
+        self._reachable: Optional[bytearray] = None
+
+    @property
+    def num_blocks(self) -> int:
+        return len(self.block_kinds)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.succ_targets)
+
+    def successors(self, block: int) -> array:
+
+        """ Successor blocks of a block """
+        return self.succ_targets[self.succ_offsets[block]:self.succ_offsets[block + 1]]
+
+    def predecessors(self, block: int) -> array:
+
+        """ Predecessor blocks of a block """
+        return self.pred_targets[self.pred_offsets[block]:self.pred_offsets[block + 1]]
+
+    def block_statements(self, block: int) -> list[Any]:
+
+        """ Statement contexts of a block, in execution order """
+        return self.statements[self.block_stmt_offsets[block]:self.block_stmt_offsets[block + 1]]
+
+    def reachable(self) -> bytearray:
+
+        """ Reachability flag per block, computed once from the entry block """
+
+        if self._reachable is None:
+            seen = bytearray(self.num_blocks)
+            seen[self.ENTRY] = 1
+            stack = [self.ENTRY]
+            succ_offsets, succ_targets = self.succ_offsets, self.succ_targets
+            while stack:
+                block = stack.pop()
+                for i in range(succ_offsets[block], succ_offsets[block + 1]):
+                    target = succ_targets[i]
+                    if not seen[target]:
+                        seen[target] = 1
+                        stack.append(target)
+            self._reachable = seen
+
+        return self._reachable
+
+    def unreachable_blocks(self) -> list[int]:
+
+        """ Blocks holding statements that can never execute """
+
+        reachable = self.reachable()
+        offsets = self.block_stmt_offsets
+        return [b for b in range(self.num_blocks) if not reachable[b] and offsets[b] != offsets[b + 1]]
+
+
+class _CFGBuilder:
+
+    """ Builds a ControlFlowGraph from a functionBody context """
+
+    def __init__(self):
+
+        self.statements: list[Any] = []
+        self.block_kinds = array('b')
+        self.block_first = array('i')  # first statement index of each block
+        self.block_last  = array('i')  # one past the last statement index of each block
+        self.edge_src    = array('i')
+        self.edge_dst    = array('i')
+
+        self.current: Optional[int] = None
+        # (break target, continue target) of the enclosing loops / switches
+        self.jump_targets: list[tuple[int, Optional[int]]] = []
+        # Catch blocks of the enclosing try statements
+        self.handlers: list[int] = []
+
+        self.new_block(BLOCK_ENTRY)
+        self.new_block(BLOCK_EXIT)
+
+        self.visitors = {
+            P.BlockStatementContext    : self.visit_block,
+            P.IfStatementContext       : self.visit_if,
+            P.WhileStatementContext    : self.visit_while,
+            P.DoWhileStatementContext  : self.visit_do_while,
+            P.ForStatementContext      : self.visit_for,
+            P.ForeachStatementContext  : self.visit_foreach,
+            P.SwitchStatementContext   : self.visit_switch,
+            P.TryStatementContext      : self.visit_try,
+            P.BreakStatementContext    : self.visit_break,
+            P.ContinueStatementContext : self.visit_continue,
+            P.ReturnStatementContext   : self.visit_return,
+            P.ThrowStatementContext    : self.visit_throw,
+        }
+
+    def new_block(self, kind: int = BLOCK_NORMAL) -> int:
+
+        """ Allocate a new, empty block """
+        self.block_kinds.append(kind)
+        self.block_first.append(-1)
+        self.block_last.append(-1)
+        return len(self.block_kinds) - 1
+
+    def add_edge(self, src: Optional[int], dst: int):
+
+        """ Add an edge, ignoring edges out of unreachable positions """
+        if src is not None:
+            self.edge_src.append(src)
+            self.edge_dst.append(dst)
+
+    def start(self, block: int):
+
+        """ Make a block the current one. A block only ever becomes current once,
+            which keeps its statements contiguous """
+        self.current = block
+        self.block_first[block] = self.block_last[block] = len(self.statements)
+
+    def emit(self, stmt) -> int:
+
+        """ Append a statement to the current block, opening a dead block if needed """
+        if self.current is None:
+            self.start(self.new_block())
+        self.statements.append(stmt)
+        self.block_last[self.current] = len(self.statements)
+        return self.current
+
+    def terminate(self, stmt, target: Optional[int]):
+
+        """ Emit a statement that transfers control away from the current block """
+        block = self.emit(stmt)
+        if target is not None:
+            self.add_edge(block, target)
+        self.current = None
+
+    def visit_statements(self, statements):
+        for stmt in statements:
+            self.visit_statement(stmt)
+
+    def visit_statement(self, stmt: P.StatementContext):
+
+        inner = stmt.getChild(0)
+        visitor = self.visitors.get(type(inner))
+        if visitor:
+            visitor(inner)
+        elif isinstance(inner, P.StatementContext):
+            self.visit_statement(inner)
+        elif isinstance(inner, ParserRuleContext):  # skip empty ';' statements
+            self.emit(inner)
+
+    def visit_block(self, ctx: P.BlockStatementContext):
+        self.visit_statements(ctx.statement())
+
+    def visit_if(self, ctx: P.IfStatementContext):
+
+        cond = self.emit(ctx)
+        join = self.new_block()
+
+        then_block = self.new_block()
+        self.add_edge(cond, then_block)
+        self.start(then_block)
+        self.visit_statement(ctx.statement(0))
+        self.add_edge(self.current, join)
+
+        if ctx.ELSE():
+            else_block = self.new_block()
+            self.add_edge(cond, else_block)
+            self.start(else_block)
+            self.visit_statement(ctx.statement(1))
+            self.add_edge(self.current, join)
+        else:
+            self.add_edge(cond, join)
+
+        self.start(join)
+
+    def visit_loop(self, ctx, body_ctx, update: bool = False):
+
+        """ Shared shape of while / for / foreach: header -> body -> [update] -> header """
+
+        header = self.new_block(BLOCK_LOOP)
+        after = self.new_block()
+        self.add_edge(self.current, header)
+        self.start(header)
+        self.emit(ctx)
+        self.add_edge(header, after)
+
+        continue_target = header
+        if update:
+            continue_target = self.new_block()
+            self.add_edge(continue_target, header)
+
+        body = self.new_block()
+        self.add_edge(header, body)
+        self.start(body)
+        self.jump_targets.append((after, continue_target))
+        self.visit_statement(body_ctx)
+        self.jump_targets.pop()
+        self.add_edge(self.current, continue_target)
+
+        self.start(after)
+
+    def visit_while(self, ctx: P.WhileStatementContext):
+        self.visit_loop(ctx, ctx.statement())
+
+    def visit_for(self, ctx: P.ForStatementContext):
+        self.visit_loop(ctx, ctx.statement(), update=True)
+
+    def visit_foreach(self, ctx: P.ForeachStatementContext):
+        self.visit_loop(ctx, ctx.statement())
+
+    def visit_do_while(self, ctx: P.DoWhileStatementContext):
+
+        body = self.new_block()
+        cond = self.new_block(BLOCK_LOOP)
+        after = self.new_block()
+        self.add_edge(self.current, body)
+        self.start(body)
+        self.jump_targets.append((after, cond))
+        self.visit_statement(ctx.statement())
+        self.jump_targets.pop()
+        self.add_edge(self.current, cond)
+
+        self.start(cond)
+        self.emit(ctx)
+        self.add_edge(cond, body)
+        self.add_edge(cond, after)
+        self.start(after)
+
+    def visit_switch(self, ctx: P.SwitchStatementContext):
+
+        dispatch = self.emit(ctx)
+        after = self.new_block()
+
+        # continue inside a switch still refers to the enclosing loop
+        continue_target = self.jump_targets[-1][1] if self.jump_targets else None
+        self.jump_targets.append((after, continue_target))
+
+        clauses = list(ctx.caseStatement())
+        if ctx.defaultStatement():
+            clauses.append(ctx.defaultStatement())
+        else:
+            self.add_edge(dispatch, after)
+
+        fallthrough: Optional[int] = None
+        for clause in clauses:
+            block = self.new_block()
+            self.add_edge(dispatch, block)
+            self.add_edge(fallthrough, block)
+            self.start(block)
+            self.visit_statements(clause.statement())
+            fallthrough = self.current
+
+        self.jump_targets.pop()
+        self.add_edge(fallthrough, after)
+        self.start(after)
+
+    def visit_try(self, ctx: P.TryStatementContext):
+
+        self.emit(ctx)
+        handler = self.new_block(BLOCK_CATCH)
+        after = self.new_block()
+
+        body = self.new_block()
+        self.add_edge(self.current, body)
+        self.start(body)
+
+        # Any block of the protected region may throw into the handler
+        first_block = body
+        self.handlers.append(handler)
+        self.visit_statement(ctx.statement(0))
+        self.handlers.pop()
+        for block in range(first_block, len(self.block_kinds)):
+            self.add_edge(block, handler)
+        self.add_edge(self.current, after)
+
+        self.start(handler)
+        self.visit_statement(ctx.statement(1))
+        self.add_edge(self.current, after)
+        self.start(after)
+
+    def visit_break(self, ctx: P.BreakStatementContext):
+        self.terminate(ctx, self.jump_targets[-1][0] if self.jump_targets else None)
+
+    def visit_continue(self, ctx: P.ContinueStatementContext):
+        targets = [c for _, c in self.jump_targets if c is not None]
+        self.terminate(ctx, targets[-1] if targets else None)
+
+    def visit_return(self, ctx: P.ReturnStatementContext):
+        self.terminate(ctx, ControlFlowGraph.EXIT)
+
+    def visit_throw(self, ctx: P.ThrowStatementContext):
+        self.terminate(ctx, self.handlers[-1] if self.handlers else ControlFlowGraph.EXIT)
+
+    def build(self, body: P.FunctionBodyContext) -> ControlFlowGraph:
+
+        """ Build the graph for a function body """
+
+        self.start(ControlFlowGraph.ENTRY)
+        self.visit_statements(body.statement())
+        self.add_edge(self.current, ControlFlowGraph.EXIT)
+
+        num_blocks = len(self.block_kinds)
+
+        # Lay statements out block by block
+        statements: list[Any] = []
+        block_stmt_offsets = array('i', [0])
+        for block in range(num_blocks):
+            first = self.block_first[block]
+            if first >= 0:
+                statements.extend(self.statements[first:self.block_last[block]])
+            block_stmt_offsets.append(len(statements))
+
+        edges = sorted(set(zip(self.edge_src, self.edge_dst)))
+        succ_offsets, succ_targets = _compress(num_blocks, edges)
+        pred_offsets, pred_targets = _compress(num_blocks, sorted((d, s) for s, d in edges))
+
+        return ControlFlowGraph(statements, self.block_kinds, block_stmt_offsets,
+                                succ_offsets, succ_targets, pred_offsets, pred_targets)
+
+
+def _compress(num_blocks: int, edges: list[tuple[int, int]]) -> tuple[array, array]:
+
+    """ Turn a sorted (src, dst) edge list into CSR offset / target arrays """
+
+    offsets = array('i', bytes(4 * (num_blocks + 1)))
+    targets = array('i', (dst for _, dst in edges))
+    for src, _ in edges:
+        offsets[src + 1] += 1
+    for i in range(num_blocks):
+        offsets[i + 1] += offsets[i]
+    return offsets, targets
+
+
+def build_cfg(body: P.FunctionBodyContext) -> ControlFlowGraph:
+
+    """ Build the control-flow graph of a function body """
+    return _CFGBuilder().build(body)
+
+
+class ControlFlowCache:
+
+    """ Builds each function's CFG once and hands the same graph to every analysis """
+
+    def __init__(self):
+        self._graphs: dict[int, tuple[Any, ControlFlowGraph]] = {}
+
+    def get(self, body: P.FunctionBodyContext) -> ControlFlowGraph:
+
+        """ Get (building on first use) the CFG of a function body """
+
+        entry = self._graphs.get(id(body))
+        hit = entry is not None and entry[0] is body
+        cache_lookup("cfg", body.start.line, hit)
+        if not hit:
+            entry = (body, build_cfg(body))
+            self._graphs[id(body)] = entry
+        return entry[1]
+
+    def clear(self):
+        self._graphs.clear()
+
+    def __len__(self):
+        return len(self._graphs)
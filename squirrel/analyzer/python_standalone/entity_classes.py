@@ -0,0 +1,69 @@
+""" Precompiled entity classname set for classname call checks """
+
+import os
+from typing import Optional
+
+from globals_db import DATA_DIR, GlobalsDatabase
+
+ENTITIES_DATABASE_PATH = os.path.join(DATA_DIR, "entities.db")
+
+# Functions taking a classname: name -> argument index
+CLASSNAME_ARGUMENTS = {
+    "SpawnEntityFromTable"            : 0,
+    "Entities.CreateByClassname"      : 0,
+    "Entities.FindByClassname"        : 1,
+    "Entities.FindByClassnameNearest" : 0,
+    "Entities.FindByClassnameWithin"  : 1,
+}
+
+# Finders match "prefix*" patterns, e.g. "tf_weapon_*"
+WILDCARD = "*"
+
+
+class EntityClassIndex:
+
+    """ Frozen set of spawnable classnames, read from disk on first use """
+
+    def __init__(self, path: str = ENTITIES_DATABASE_PATH):
+
+        self.db = GlobalsDatabase(path)
+        self._classnames: Optional[frozenset[str]] = None
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def classnames(self) -> frozenset[str]:
+        return self.load()
+
+    def load(self) -> frozenset[str]:
+
+        """ Build the classname set, once; the first classname check does this unless it was preloaded """
+
+        if self._classnames is None:
+            self._classnames = frozenset(self.db.get("classnames", ()) if self.db.available else ())
+        return self._classnames
+
+    def exists(self, classname: str) -> bool:
+
+        """ Check a classname, or with a trailing '*' that any classname has the prefix """
+
+        classname = classname.lower()
+        if classname.endswith(WILDCARD):
+            prefix = classname[:-1]
+            return any(name.startswith(prefix) for name in self.classnames)
+        return classname in self.classnames
+
+
+_shared: Optional[EntityClassIndex] = None
+
+
+def shared_entity_class_index() -> EntityClassIndex:
+
+    """ Process-wide index; build it before forking so workers share the set """
+
+    global _shared
+    if _shared is None:
+        _shared = EntityClassIndex()
+    return _shared
@@ -0,0 +1,66 @@
+""" Precompiled game event definitions for OnGameEvent_ callback checks """
+
+import os
+from typing import Optional
+
+from globals_db import DATA_DIR, GlobalsDatabase
+from squirrel_types import StructType, parse_type
+
+EVENTS_DATABASE_PATH = os.path.join(DATA_DIR, "events.db")
+
+CALLBACK_PREFIX = "OnGameEvent_"
+
+
+class GameEventIndex:
+
+    """
+    Event name -> params fields, read from disk when the first callback is analyzed
+
+    The database holds {event: ((field, type name), ...)}; the StructType of an event is only
+    built once a callback for it is seen.
+    """
+
+    def __init__(self, path: str = EVENTS_DATABASE_PATH):
+
+        self.db = GlobalsDatabase(path)
+        self._params_types: dict[str, StructType] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def events(self) -> dict[str, tuple]:
+        return self.load()
+
+    def load(self) -> dict[str, tuple]:
+
+        """ Decode the events section, once; the first callback does this unless it was preloaded """
+
+        return self.db.get("events", {}) if self.db.available else {}
+
+    def params_type(self, event: str) -> Optional[StructType]:
+
+        """ Type of the params table passed to OnGameEvent_<event>, or None for unknown events """
+
+        params_type = self._params_types.get(event)
+        if params_type is None:
+            fields = self.events.get(event)
+            if fields is None:
+                return None
+            params_type = StructType({name: parse_type(type_name) for name, type_name in fields})
+            self._params_types[event] = params_type
+        return params_type
+
+
+_shared: Optional[GameEventIndex] = None
+
+
+def shared_game_event_index() -> GameEventIndex:
+
+    """ Process-wide index, created on the first OnGameEvent_ callback seen """
+
+    global _shared
+    if _shared is None:
+        _shared = GameEventIndex()
+    return _shared
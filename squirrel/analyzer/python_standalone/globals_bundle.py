@@ -0,0 +1,132 @@
+""" Versioned manifest of the compiled globals files, written last by build_globals.py """
+
+import hashlib
+import os
+from typing import Optional
+
+from asset_index import ASSET_INDEX_PATH
+from constant_index import CONSTANTS_DATABASE_PATH
+from entity_classes import ENTITIES_DATABASE_PATH
+from game_events import EVENTS_DATABASE_PATH
+from globals_db import DATA_DIR, GlobalsDatabase, write_database
+from netprop_index import NETPROPS_DATABASE_PATH
+from string_sets import STRING_SETS_PATH
+from suggestion_index import SUGGESTIONS_DATABASE_PATH
+from vscript_api import API_DATABASE_PATH
+
+BUNDLE_PATH = os.path.join(DATA_DIR, "bundle.db")
+
+# Component -> file name in the data directory. Each file keeps its own format so every reader
+# still maps or decodes only the sections it touches.
+BUNDLE_FILES = {
+    "signatures"  : os.path.basename(API_DATABASE_PATH),
+    "constants"   : os.path.basename(CONSTANTS_DATABASE_PATH),
+    "events"      : os.path.basename(EVENTS_DATABASE_PATH),
+    "netprops"    : os.path.basename(NETPROPS_DATABASE_PATH),
+    "assets"      : os.path.basename(ASSET_INDEX_PATH),
+    "entities"    : os.path.basename(ENTITIES_DATABASE_PATH),
+    "string_sets" : os.path.basename(STRING_SETS_PATH),
+    "suggestions" : os.path.basename(SUGGESTIONS_DATABASE_PATH),
+}
+
+
+def file_digest(path: str) -> str:
+
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def write_bundle(data_dir: str = DATA_DIR, counts: Optional[dict[str, int]] = None) -> str:
+
+    """
+    Record the digest of every component file and return the bundle version
+
+    The version is a digest over the component digests, so it changes whenever any compiled file
+    does and identifies the data a report or an export was produced from.
+    """
+
+    components = {}
+    for name, file_name in BUNDLE_FILES.items():
+        path = os.path.join(data_dir, file_name)
+        components[name] = (file_name, file_digest(path), os.path.getsize(path))
+
+    version = hashlib.sha1("".join(digest for _, digest, _ in components.values()).encode("ascii")).hexdigest()
+    write_database(os.path.join(data_dir, os.path.basename(BUNDLE_PATH)), {
+        "version"    : version,
+        "components" : components,
+        "counts"     : dict(counts or {}),
+    })
+    return version
+
+
+class GlobalsBundle:
+
+    """
+    The manifest of one build: its version, component files and entry counts
+
+    Opening the bundle reads only the manifest; the component files are opened by their own
+    readers when first needed.
+    """
+
+    def __init__(self, path: str = BUNDLE_PATH):
+
+        self.path = path
+        self.db = GlobalsDatabase(path)
+        self._stale: Optional[list[str]] = None
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.db.get("version") if self.db.available else None
+
+    @property
+    def components(self) -> dict[str, tuple[str, str, int]]:
+        return self.db.get("components", {}) if self.db.available else {}
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return self.db.get("counts", {}) if self.db.available else {}
+
+    def component_path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(self.path), BUNDLE_FILES[name])
+
+    def stale_components(self) -> list[str]:
+
+        """ Components whose file is missing or differs from the build recorded in the manifest """
+
+        stale = []
+        for name, (file_name, digest, size) in self.components.items():
+            path = os.path.join(os.path.dirname(self.path), file_name)
+            if not os.path.exists(path) or os.path.getsize(path) != size or file_digest(path) != digest:
+                stale.append(name)
+        return stale
+
+    def stale_warning(self) -> Optional[str]:
+
+        """ Warning naming the stale components, or None; the files are checked on the first call only """
+
+        if self._stale is None:
+            self._stale = self.stale_components()
+        if not self._stale:
+            return None
+        return (f"Warning: compiled globals out of date ({', '.join(self._stale)} changed since bundle "
+                f"{self.version[:12]}); rerun build_globals.py")
+
+
+_shared: Optional[GlobalsBundle] = None
+
+
+def shared_globals_bundle() -> GlobalsBundle:
+
+    """ Process-wide manifest """
+
+    global _shared
+    if _shared is None:
+        _shared = GlobalsBundle()
+    return _shared
@@ -0,0 +1,145 @@
+""" Compact section database for precompiled VScript globals """
+
+import mmap
+import os
+import pickle
+import struct
+from typing import Any, Optional
+
+from profiling import cache_lookup
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+MAGIC = b"SQDB"
+FORMAT_VERSION = 1
+
+# magic, format version, index length
+_HEADER = struct.Struct("<4sHI")
+
+
+class GlobalsDatabaseError(Exception):
+
+    """ Raised for missing, truncated or incompatible database files """
+
+
+def write_database(path: str, sections: dict[str, Any]) -> None:
+
+    """
+    Write a database file
+
+    Layout: header | pickled index {key: (offset, length)} | pickled sections.
+    Each section is pickled on its own so readers only decode what they touch.
+    """
+
+    payloads = []
+    index: dict[str, tuple[int, int]] = {}
+    offset = 0
+    for key, value in sections.items():
+        payload = pickle.dumps(value, protocol=4)
+        index[key] = (offset, len(payload))
+        payloads.append(payload)
+        offset += len(payload)
+
+    index_bytes = pickle.dumps(index, protocol=4)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for payload in payloads:
+            f.write(payload)
+
+
+class GlobalsDatabase:
+
+    """
+    Read-only view of a database file
+
+    Nothing is read until the first access; then the file is memory-mapped, the index decoded,
+    and each section unpickled on first request and cached.
+    """
+
+    def __init__(self, path: str):
+
+        self.path = path
+        self.name = os.path.basename(path)
+        self._map: Optional[mmap.mmap] = None
+        self._index: dict[str, tuple[int, int]] = {}
+        self._base = 0
+        self._sections: dict[str, Any] = {}
+        # Whether the file exists, checked once; readers ask on every lookup
+        self._available: Optional[bool] = None
+
+    def _open(self) -> None:
+
+        if self._map is not None:
+            return
+        if not os.path.exists(self.path):
+            raise GlobalsDatabaseError(f"Globals database not found: {self.path} (run build_globals.py)")
+
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mapped) < _HEADER.size:
+            raise GlobalsDatabaseError(f"Truncated globals database: {self.path}")
+        magic, version, index_length = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise GlobalsDatabaseError(f"Incompatible globals database: {self.path} (run build_globals.py)")
+
+        self._index = pickle.loads(mapped[_HEADER.size:_HEADER.size + index_length])
+        self._base = _HEADER.size + index_length
+        self._map = mapped
+        self._available = True
+
+    @property
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = os.path.exists(self.path)
+        return self._available
+
+    def keys(self) -> list[str]:
+        self._open()
+        return list(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        self._open()
+        return key in self._index
+
+    def get(self, key: str, default: Any = None) -> Any:
+
+        """ Load a section, decoding it on first use """
+
+        if key in self._sections:
+            cache_lookup(self.name, key, True)
+            return self._sections[key]
+
+        cache_lookup(self.name, key, False)
+        self._open()
+        entry = self._index.get(key)
+        if entry is None:
+            return default
+
+        offset, length = entry
+        start = self._base + offset
+        value = pickle.loads(self._map[start:start + length])
+        self._sections[key] = value
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    @property
+    def loaded_sections(self) -> list[str]:
+        return list(self._sections)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._available = None
+
+
+_MISSING = object()
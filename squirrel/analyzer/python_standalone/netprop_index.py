@@ -0,0 +1,113 @@
+""" Precompiled netprop name index for NetProps.* call checks """
+
+import os
+from typing import Optional
+
+from globals_db import DATA_DIR, GlobalsDatabase
+
+NETPROPS_DATABASE_PATH = os.path.join(DATA_DIR, "netprops.db")
+
+# Kind codes stored in the index; array kinds are the scalar code + ARRAY
+NETPROP_KINDS = ("integer", "float", "string", "bool", "instance", "vector")
+ARRAY = 8
+
+# Accessor suffix -> kinds it can read or write. Ints and bools share storage in practice
+_ACCESSOR_KINDS = {
+    "Int"    : {0, 3},
+    "Float"  : {1},
+    "String" : {2},
+    "Bool"   : {3, 0},
+    "Entity" : {4},
+    "Vector" : {5},
+}
+
+# Accessors that only need the property to exist
+NAME_ONLY_ACCESSORS = {"GetPropArraySize", "GetPropInfo", "GetPropType", "HasProp"}
+
+NETPROP_ACCESSORS = NAME_ONLY_ACCESSORS | {
+    f"{verb}Prop{suffix}{array}"
+    for verb in ("Get", "Set")
+    for suffix in _ACCESSOR_KINDS
+    for array in ("", "Array")
+}
+
+
+def kind_code(kind: str) -> int:
+
+    """ Encode a properties.json kind ('integer', 'float_array', ...) """
+
+    if kind.endswith("_array"):
+        return NETPROP_KINDS.index(kind[:-6]) | ARRAY
+    return NETPROP_KINDS.index(kind)
+
+
+def kind_name(code: int) -> str:
+
+    name = NETPROP_KINDS[code & ~ARRAY]
+    return f"{name}_array" if code & ARRAY else name
+
+
+class NetPropIndex:
+
+    """ Hashed netprop name -> kind index, read from disk on first use """
+
+    def __init__(self, path: str = NETPROPS_DATABASE_PATH):
+
+        self.db = GlobalsDatabase(path)
+        self._props: Optional[dict[str, int]] = None
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def props(self) -> dict[str, int]:
+        return self.load()
+
+    def load(self) -> dict[str, int]:
+
+        """ Read the index, once; the first NetProps call does this unless it was preloaded """
+
+        if self._props is None:
+            self._props = self.db.get("netprops", {}) if self.db.available else {}
+        return self._props
+
+    def kind(self, name: str) -> Optional[str]:
+
+        """ Kind of a netprop, or None if unknown """
+
+        code = self.props.get(name)
+        return None if code is None else kind_name(code)
+
+    def check_access(self, accessor: str, name: str) -> Optional[str]:
+
+        """ Describe why an accessor can't be used on a netprop, or None if it can """
+
+        code = self.props.get(name)
+        if code is None:
+            return f"Unknown netprop '{name}'"
+        if accessor in NAME_ONLY_ACCESSORS:
+            return None
+
+        body = accessor[len("GetProp"):]  # GetProp / SetProp have the same length
+        wants_array = body.endswith("Array")
+        suffix = body[:-5] if wants_array else body
+
+        if (code & ~ARRAY) not in _ACCESSOR_KINDS[suffix]:
+            return f"Netprop '{name}' is {kind_name(code)}, not accessible with {accessor}"
+        if wants_array and not code & ARRAY:
+            return f"Netprop '{name}' is not an array, use {accessor[:-5]}"
+        return None
+
+
+_shared: Optional[NetPropIndex] = None
+
+
+def shared_netprop_index() -> NetPropIndex:
+
+    """ Process-wide index, created on the first NetProps call seen """
+
+    global _shared
+    if _shared is None:
+        _shared = NetPropIndex()
+    return _shared
@@ -0,0 +1,408 @@
+"""
+Per-phase profiling for squirrel_analyzer.py: --profile (time, cProfile), --memprofile
+(tracemalloc) and --trace (Chrome trace events)
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, Optional, Union
+
+# Phases in pipeline order; the report lists any others after these
+PHASES = ("lex", "parse", "walk", "check", "strip", "format")
+
+# Receives (cache, key, hit) from the lookups of the caches that report them, while a trace is
+# being recorded
+_cache_observer: Optional[Callable[[str, Any, bool], None]] = None
+
+
+def observe_caches(observer: Optional[Callable[[str, Any, bool], None]]) -> None:
+    global _cache_observer
+    _cache_observer = observer
+
+
+def cache_lookup(cache: str, key: Any, hit: bool) -> None:
+
+    """ Called by a cache on every lookup; free unless a trace is being recorded """
+
+    if _cache_observer is not None:
+        _cache_observer(cache, key, hit)
+
+
+def count_nodes(tree) -> int:
+
+    """ Rule contexts and terminal nodes in an ANTLR parse tree """
+
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        children = getattr(node, "children", None)
+        if children:
+            stack.extend(children)
+    return count
+
+
+def function_label(key: tuple[str, int, str]) -> str:
+
+    """ "file:line(function)" as pstats prints it, with the directory dropped """
+
+    file_name, line, function = key
+    if file_name == "~":
+        return function
+    return f"{os.path.basename(file_name)}:{line}({function})"
+
+
+class PhaseProfiler:
+
+    """
+    Accumulates wall and CPU time per named phase, plus counters such as tokens and parse nodes
+
+    With top > 0 each phase also runs under its own cProfile.Profile, so hotspots are reported per
+    phase rather than for the whole run. Phases must not nest: only one profiler can be active.
+    """
+
+    enabled = True
+
+    def __init__(self, top: int = 10):
+
+        self.top = top
+        self.wall: dict[str, float] = {}
+        self.cpu: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.counts: dict[str, int] = {}
+        self.profiles: dict[str, cProfile.Profile] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+
+        profile = None
+        if self.top > 0:
+            profile = self.profiles.setdefault(name, cProfile.Profile())
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.wall[name] = self.wall.get(name, 0.0) + time.perf_counter() - wall
+            self.cpu[name] = self.cpu.get(name, 0.0) + time.process_time() - cpu
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def hotspots(self, name: str) -> list[dict[str, Any]]:
+
+        """ The phase's top functions by own time """
+
+        profile = self.profiles.get(name)
+        if profile is None:
+            return []
+
+        stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return [{
+            "function" : function_label(key),
+            "calls"    : calls,
+            "own_s"    : own,
+            "total_s"  : total,
+        } for key, (_, calls, own, total, _) in ranked]
+
+    def phase_names(self) -> list[str]:
+        return [name for name in PHASES if name in self.wall] + [name for name in self.wall if name not in PHASES]
+
+    def report(self) -> dict[str, Any]:
+
+        """ JSON-ready summary, included under "profile" in --format json """
+
+        return {
+            "phases": {name: {
+                "wall_s"   : self.wall[name],
+                "cpu_s"    : self.cpu[name],
+                "calls"    : self.calls[name],
+                "hotspots" : self.hotspots(name),
+            } for name in self.phase_names()},
+            "counts": dict(self.counts),
+        }
+
+    def format_text(self) -> str:
+
+        lines = ["=== Profile ===", f"{'phase':<8} {'wall':>10} {'cpu':>10}"]
+        for name in self.phase_names():
+            lines.append(f"{name:<8} {self.wall[name] * 1e3:>8.1f}ms {self.cpu[name] * 1e3:>8.1f}ms")
+        lines.append(f"{'total':<8} {sum(self.wall.values()) * 1e3:>8.1f}ms {sum(self.cpu.values()) * 1e3:>8.1f}ms")
+        if self.counts:
+            lines.append("  ".join(f"{name}: {value}" for name, value in self.counts.items()))
+
+        for name in self.phase_names():
+            hotspots = self.hotspots(name)
+            if not hotspots:
+                continue
+            lines.append("")
+            lines.append(f"--- {name}: top {len(hotspots)} by own time")
+            for entry in hotspots:
+                lines.append(f"{entry['own_s'] * 1e3:>9.1f}ms {entry['total_s'] * 1e3:>9.1f}ms "
+                             f"{entry['calls']:>8}  {entry['function']}")
+        return "\n".join(lines)
+
+
+class MemoryProfiler:
+
+    """
+    Peak and retained traced memory per phase, with the allocation sites that grew the most
+
+    tracemalloc starts with the first phase and runs until close(). Around each phase a snapshot is taken before and
+    after: peak is the high-water mark above the level the phase started at, retained is what the
+    phase still holds when it ends, and the sites are the snapshot difference by source line. A
+    phase run several times keeps its largest peak and sums the rest.
+    """
+
+    enabled = True
+
+    # Not the profiler's own bookkeeping
+    ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    )
+
+    def __init__(self, top: int = 10):
+
+        self.top = top
+        self.peak: dict[str, int] = {}
+        self.retained: dict[str, int] = {}
+        self.traced_after: dict[str, int] = {}
+        self.calls: dict[str, int] = {}
+        self.counts: dict[str, int] = {}
+        self.sites: dict[str, dict[str, list[int]]] = {}
+        self.started = False
+
+    def close(self) -> None:
+
+        """ Stop tracing if this profiler started it; the results are kept """
+
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    def snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self.ignored)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+
+        before = self.snapshot() if self.top > 0 else None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak[name] = max(self.peak.get(name, 0), peak - start)
+            self.retained[name] = self.retained.get(name, 0) + current - start
+            self.traced_after[name] = current
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+            if before is not None:
+                sites = self.sites.setdefault(name, {})
+                for diff in self.snapshot().compare_to(before, "lineno"):
+                    if diff.size_diff <= 0:
+                        continue
+                    frame = diff.traceback[0]
+                    site = sites.setdefault(f"{os.path.basename(frame.filename)}:{frame.lineno}", [0, 0])
+                    site[0] += diff.size_diff
+                    site[1] += diff.count_diff
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def allocation_sites(self, name: str) -> list[dict[str, Any]]:
+
+        """ The phase's top source lines by memory still allocated at its end """
+
+        ranked = sorted(self.sites.get(name, {}).items(), key=lambda item: item[1][0], reverse=True)[:self.top]
+        return [{"site": site, "bytes": size, "blocks": blocks} for site, (size, blocks) in ranked]
+
+    def phase_names(self) -> list[str]:
+        return [name for name in PHASES if name in self.peak] + [name for name in self.peak if name not in PHASES]
+
+    def report(self) -> dict[str, Any]:
+
+        """ JSON-ready summary, included under "memory" in --format json """
+
+        return {
+            "phases": {name: {
+                "peak_bytes"         : self.peak[name],
+                "retained_bytes"     : self.retained[name],
+                "traced_after_bytes" : self.traced_after[name],
+                "calls"              : self.calls[name],
+                "allocation_sites"   : self.allocation_sites(name),
+            } for name in self.phase_names()},
+            "counts": dict(self.counts),
+        }
+
+    def format_text(self) -> str:
+
+        lines = ["=== Memory ===", f"{'phase':<8} {'peak':>10} {'retained':>10} {'traced':>10}"]
+        for name in self.phase_names():
+            lines.append(f"{name:<8} {self.peak[name] / 1024:>8.0f}KB {self.retained[name] / 1024:>8.0f}KB "
+                         f"{self.traced_after[name] / 1024:>8.0f}KB")
+        if self.counts:
+            lines.append("  ".join(f"{name}: {value}" for name, value in self.counts.items()))
+
+        for name in self.phase_names():
+            sites = self.allocation_sites(name)
+            if not sites:
+                continue
+            lines.append("")
+            lines.append(f"--- {name}: top {len(sites)} allocation sites")
+            for entry in sites:
+                lines.append(f"{entry['bytes'] / 1024:>9.1f}KB {entry['blocks']:>8}  {entry['site']}")
+        return "\n".join(lines)
+
+
+class TraceRecorder:
+
+    """
+    Chrome trace events for the phases of this process, viewable in chrome://tracing or Perfetto
+
+    Each phase is a complete ("X") event; spans opened with a category of "file" wrap the phases
+    of one file and collect its counters as arguments. Cache lookups become instant ("i") events
+    once the recorder is passed to observe_caches. Timestamps come from the monotonic
+    perf_counter clock, which worker processes share on the platforms we run on, so their events
+    merge onto one timeline.
+    """
+
+    enabled = True
+
+    def __init__(self):
+
+        self.pid = os.getpid()
+        self.events: list[dict[str, Any]] = []
+        self._open_args: list[dict[str, Any]] = []
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter_ns() / 1000
+
+    @contextlib.contextmanager
+    def phase(self, name: str, category: str = "phase") -> Iterator[None]:
+
+        args: dict[str, Any] = {}
+        self._open_args.append(args)
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.events.append({
+                "name" : name,
+                "cat"  : category,
+                "ph"   : "X",
+                "ts"   : start,
+                "dur"  : self.now() - start,
+                "pid"  : self.pid,
+                "tid"  : self.pid,
+                "args" : args,
+            })
+            self._open_args.pop()
+
+    def count(self, name: str, value: int) -> None:
+
+        """ Add to the counters of the outermost open span, normally the file's """
+
+        if self._open_args:
+            args = self._open_args[0]
+            args[name] = args.get(name, 0) + value
+
+    def cache_lookup(self, cache: str, key: Any, hit: bool) -> None:
+        self.events.append({
+            "name" : f"{cache} {'hit' if hit else 'miss'}",
+            "cat"  : "cache",
+            "ph"   : "i",
+            "s"    : "t",
+            "ts"   : self.now(),
+            "pid"  : self.pid,
+            "tid"  : self.pid,
+            "args" : {"key": str(key)},
+        })
+
+    def drain(self) -> list[dict[str, Any]]:
+
+        """ The events recorded so far, handed over (by worker processes) and forgotten """
+
+        events, self.events = self.events, []
+        return events
+
+
+def write_trace(path: str, events: list[dict[str, Any]], process_names: dict[int, str]) -> None:
+
+    """ A trace file with the events and a name for each process id """
+
+    metadata = [{
+        "name" : "process_name",
+        "ph"   : "M",
+        "pid"  : pid,
+        "tid"  : pid,
+        "args" : {"name": name},
+    } for pid, name in process_names.items()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+
+class ProfilerGroup:
+
+    """ Several profilers over the same phases; the first given is the outermost """
+
+    enabled = True
+
+    def __init__(self, *profilers):
+        self.profilers = profilers
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            for profiler in self.profilers:
+                stack.enter_context(profiler.phase(name))
+            yield
+
+    def count(self, name: str, value: int) -> None:
+        for profiler in self.profilers:
+            profiler.count(name, value)
+
+
+class _NullProfiler:
+
+    """ Stand-in when profiling is off: phases cost one call and nothing is recorded """
+
+    enabled = False
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        return contextlib.nullcontext()
+
+    def count(self, name: str, value: int) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+Profiler = Union[PhaseProfiler, MemoryProfiler, TraceRecorder, ProfilerGroup]
+
+
+def profiler_or_null(profiler: Optional[Profiler]):
+    return profiler if profiler is not None else NULL_PROFILER
@@ -9,9 +9,10 @@ Usage:
 """
 
 import argparse
+import contextlib
 import sys
 import os
-from typing import Optional, Any
+from typing import Callable, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import re
@@ -20,6 +21,8 @@ import json
 # ANTLR imports (will be generated)
 try:
     from antlr4 import *
+    from control_flow import ControlFlowCache
+    from call_checks import CallSiteChecker
     ANTLR_AVAILABLE = True
 
     # These will be generated by ANTLR
@@ -33,6 +36,17 @@ except ImportError:
     ANTLR_AVAILABLE = False
 
 from squirrel_types import *
+from class_hierarchy import ClassHierarchy
+from vscript_api import VScriptApi
+from constant_index import shared_constant_index
+from entity_classes import shared_entity_class_index
+from game_events import CALLBACK_PREFIX, shared_game_event_index
+from globals_bundle import shared_globals_bundle
+from netprop_index import shared_netprop_index
+from string_sets import shared_string_sets
+from suggestion_index import closest, did_you_mean, shared_suggestion_index
+from profiling import (MemoryProfiler, PhaseProfiler, Profiler, ProfilerGroup, TraceRecorder, observe_caches,
+                       profiler_or_null, write_trace)
 
 HELP_TEXT = """
 
@@ -41,6 +55,9 @@ HELP_TEXT = """
     python squirrel_analyzer.py --strip script.tnut           # Strip annotations
     python squirrel_analyzer.py --check --strip script.tnut   # Both operations
     python squirrel_analyzer.py --output clean.tnut script.tnut # Save stripped version
+    python squirrel_analyzer.py --profile script.tnut          # Time each phase, with hotspots
+    python squirrel_analyzer.py --memprofile script.tnut       # Memory per phase, with allocation sites
+    python squirrel_analyzer.py --jobs 4 --trace out.json *.tnut # Timeline of a parallel run
 """
 
 
@@ -105,6 +122,8 @@ class SymbolTable:
         self.parent = parent
         self.symbols: dict[str, Symbol] = {}
         self.children: list['SymbolTable'] = []
+        # Resolves names missing from the root scope (e.g. lazily loaded API globals)
+        self.fallback: Optional[Callable[[str], Optional[SquirrelType]]] = None
         if parent:
             parent.children.append(self)
 
@@ -122,6 +141,12 @@ class SymbolTable:
             return self.symbols[name]
         if self.parent:
             return self.parent.lookup(name)
+        if self.fallback:
+            symbol_type = self.fallback(name)
+            if symbol_type is not None:
+                symbol = Symbol(name, symbol_type, SourceLocation(0, 0), is_initialized=True)
+                self.define(symbol)
+                return symbol
         return None
 
     # Look up a symbol only in this scope
@@ -225,12 +250,21 @@ class SquirrelTypeChecker:
     annotation_style = 1 # 1: colon separator, 2: C-style space separator
 
     # Initialize built-in symbols
-    def __init__(self):
+    def __init__(self, profiler: Optional[Profiler] = None):
 
         self.messages = []
         self.symbol_table = SymbolTable()
         self.current_scope = self.symbol_table
         self.current_file = ""
+        # CFGs are built once per function and shared by every flow analysis
+        self.cfgs = ControlFlowCache() if ANTLR_AVAILABLE else None
+        # Classes of every checked file, indexed for O(1) subclass checks
+        self.class_hierarchy = ClassHierarchy()
+        self.class_types: dict[str, ClassType] = {}
+        # String arguments of engine API calls, checked against the compiled globals
+        self.call_checks = CallSiteChecker(self) if ANTLR_AVAILABLE else None
+        # --profile / --memprofile: measures each phase of every check
+        self.profiler = profiler_or_null(profiler)
 
         self._init_builtins()
 
@@ -242,6 +276,10 @@ class SquirrelTypeChecker:
 
         for name, type_ in SQUIRREL_TYPES.items():
             self.symbol_table.define( Symbol( name, type_, SourceLocation(0, 0) ) )
+
+        # Engine API: signatures are decoded per class / function on first reference
+        self.api = VScriptApi( hierarchy=self.class_hierarchy )
+        self.symbol_table.fallback = self.api.lookup
         # self.symbol_table.define(Symbol("int", INT_TYPE, SourceLocation(0, 0)))
         # self.symbol_table.define(Symbol("char", CHAR_TYPE, SourceLocation(0, 0)))
         # self.symbol_table.define(Symbol("float", FLOAT_TYPE, SourceLocation(0, 0)))
@@ -260,6 +298,10 @@ class SquirrelTypeChecker:
         """ Add an info message """
         self.messages.append(AnalyzerMessage(ErrorSeverity.INFO, message, location, code))
 
+    def location(self, line: int, column: int) -> SourceLocation:
+        """ Location in the file being checked """
+        return SourceLocation(line, column, self.current_file)
+
     def enter_scope(self) -> SymbolTable:
 
         """ Enter a new scope """
@@ -277,6 +319,8 @@ class SquirrelTypeChecker:
         """ Check a file """
         self.current_file = filename
         self.messages.clear()
+        if self.cfgs is not None:
+            self.cfgs.clear()
 
         if not ANTLR_AVAILABLE:
             self.error("ANTLR4 not available for parsing", SourceLocation(1, 1))
@@ -298,79 +342,217 @@ class SquirrelTypeChecker:
             from type_extractor import SquirrelTypeExtractor
             
             extractor = SquirrelTypeExtractor()
-            result = extractor.extract_from_string(source_code)
+            result = extractor.extract_from_string(source_code, self.profiler)
             
             if not result["success"]:
                 self.error(f"Parse error: {result['error']}", SourceLocation(1, 1))
                 return
+
+            with self.profiler.phase("check"):
+                self.check_extracted(result)
+
+        except ImportError:
+            self.error("Type extractor not available", SourceLocation(1, 1))
+        except Exception as e:
+            self.error(f"Type extraction failed: {str(e)}", SourceLocation(1, 1))
+
+    def check_extracted(self, result: dict[str, Any]) -> None:
+
+        """ Report and check what the extractor found in the current file """
+
+        # Process extracted variables
+        for var in result["variables"]:
+            location = SourceLocation(var.location[0], var.location[1], self.current_file)
             
-            # Process extracted variables
-            for var in result["variables"]:
-                location = SourceLocation(var.location[0], var.location[1], self.current_file)
+            if var.type_annotation:
+                # Report type annotation found
+                var_type = var.type_annotation
+                scope_info = f" in {var.scope}" if var.scope != "global" else ""
                 
-                if var.type_annotation:
-                    # Report type annotation found
-                    var_type = var.type_annotation
-                    scope_info = f" in {var.scope}" if var.scope != "global" else ""
-                    
-                    if var.is_local:
-                        self.info(f"Local variable '{var.name}': {var_type}{scope_info}", location)
-                    elif var.is_parameter:
-                        self.info(f"Parameter '{var.name}': {var_type}{scope_info}", location)
-                    elif var.is_field:
-                        self.info(f"Field '{var.name}': {var_type}{scope_info}", location)
-                    else:
-                        self.info(f"Variable '{var.name}': {var_type}{scope_info}", location)
-                    
-                    # Store type information for later use
-                    print(f"--- {var.name} ==> {var_type} ({var.scope})")
+                if var.is_local:
+                    self.info(f"Local variable '{var.name}': {var_type}{scope_info}", location)
+                elif var.is_parameter:
+                    self.info(f"Parameter '{var.name}': {var_type}{scope_info}", location)
+                elif var.is_field:
+                    self.info(f"Field '{var.name}': {var_type}{scope_info}", location)
+                else:
+                    self.info(f"Variable '{var.name}': {var_type}{scope_info}", location)
+        
+        # Process extracted functions
+        for func in result["functions"]:
+            location = SourceLocation(func.location[0], func.location[1], self.current_file)
             
-            # Process extracted functions
-            for func in result["functions"]:
-                location = SourceLocation(func.location[0], func.location[1], self.current_file)
-                
-                # Report function with return type
-                if func.return_type:
-                    self.info(f"Function '{func.name}' returns: {func.return_type}", location)
-                    print(f"--- function {func.name} ==> {func.return_type}")
-                
-                # Report parameters with types
-                for param in func.parameters:
+            # Report function with return type
+            if func.return_type:
+                self.info(f"Function '{func.name}' returns: {func.return_type}", location)
+            
+            # Report parameters with types
+            for param in func.parameters:
+                if param.type_annotation:
+                    param_location = SourceLocation(param.location[0], param.location[1], self.current_file)
+                    self.info(f"Parameter '{param.name}': {param.type_annotation}", param_location)
+        
+        self.register_classes(result["classes"])
+
+        # Process extracted classes
+        for cls in result["classes"]:
+            location = SourceLocation(cls.location[0], cls.location[1], self.current_file)
+            self.info(f"Class '{cls.name}' defined", location)
+            
+            if cls.base_class:
+                self.info(f"Class '{cls.name}' extends '{cls.base_class}'", location)
+            
+            # Report constructor and method types
+            if cls.constructor:
+                for param in cls.constructor.parameters:
                     if param.type_annotation:
                         param_location = SourceLocation(param.location[0], param.location[1], self.current_file)
-                        self.info(f"Parameter '{param.name}': {param.type_annotation}", param_location)
+                        self.info(f"Constructor parameter '{param.name}': {param.type_annotation}", param_location)
             
-            # Process extracted classes
-            for cls in result["classes"]:
+            for method in cls.methods:
+                if method.return_type:
+                    method_location = SourceLocation(method.location[0], method.location[1], self.current_file)
+                    self.info(f"Method '{method.name}' returns: {method.return_type}", method_location)
+
+        self.check_unreachable_code(result)
+        self.call_checks.check(result["calls"])
+        self.check_game_event_callbacks(result["functions"])
+        self.check_constants(result["constants"])
+
+    def register_classes(self, classes: list) -> None:
+
+        """ Add declared classes to the workspace hierarchy and the global scope """
+
+        for cls in classes:
+            try:
+                self.class_hierarchy.define(cls.name, cls.base_class)
+            except ValueError as e:
                 location = SourceLocation(cls.location[0], cls.location[1], self.current_file)
-                self.info(f"Class '{cls.name}' defined", location)
-                
-                if cls.base_class:
-                    self.info(f"Class '{cls.name}' extends '{cls.base_class}'", location)
-                
-                # Report constructor and method types
-                if cls.constructor:
-                    for param in cls.constructor.parameters:
-                        if param.type_annotation:
-                            param_location = SourceLocation(param.location[0], param.location[1], self.current_file)
-                            self.info(f"Constructor parameter '{param.name}': {param.type_annotation}", param_location)
-                
-                for method in cls.methods:
-                    if method.return_type:
-                        method_location = SourceLocation(method.location[0], method.location[1], self.current_file)
-                        self.info(f"Method '{method.name}' returns: {method.return_type}", method_location)
-            
-        except ImportError:
-            self.error("Type extractor not available", SourceLocation(1, 1))
-        except Exception as e:
-            self.error(f"Type extraction failed: {str(e)}", SourceLocation(1, 1))
+                self.error(str(e), location, "cyclic-inheritance")
+
+            class_type = self.class_types.get(cls.name)
+            if class_type is None:
+                class_type = ClassType(cls.name, hierarchy=self.class_hierarchy)
+                self.class_types[cls.name] = class_type
+            self.symbol_table.define(Symbol(cls.name, class_type, SourceLocation(cls.location[0], cls.location[1], self.current_file)))
+
+        # Members may name any class of the file, so resolve them once every class has a ClassType
+        for cls in classes:
+            class_type = self.class_types[cls.name]
+            members: dict[str, SquirrelType] = {}
+            for field in cls.fields:
+                members[field.name] = self.resolve_type(field.type_annotation)
+            for method in cls.methods:
+                members[method.name] = self.function_type(method)
+            constructor = self.function_type(cls.constructor, class_type) if cls.constructor else None
+            class_type.set_members(members, constructor)
+
+        # Link base types; bases may come from earlier files
+        for name, class_type in self.class_types.items():
+            base = self.class_hierarchy.base_of(name)
+            if base and base not in self.class_types and base in self.api.classes:
+                class_type.base_class = self.api.class_type(base)
+            else:
+                class_type.base_class = self.class_types.get(base) if base else None
+
+    def resolve_type(self, annotation: Optional[str]) -> SquirrelType:
+
+        """ Resolve a type annotation string, including user-declared classes """
+        return parse_type(annotation, self.class_types)
+
+    def function_type(self, func, return_type: Optional[SquirrelType] = None) -> FunctionType:
+
+        """ Build the FunctionType of an extracted function, method or constructor """
+
+        params = [self.resolve_type(param.type_annotation) for param in func.parameters if param.name != "..."]
+        if return_type is None:
+            return_type = self.resolve_type(func.return_type)
+        return FunctionType(params, return_type)
+
+    def check_unreachable_code(self, result: dict[str, Any]):
+
+        """ Warn about statements that can never execute """
+
+        bodies = [func.body for func in result["functions"]]
+        for cls in result["classes"]:
+            if cls.constructor:
+                bodies.append(cls.constructor.body)
+            bodies.extend(method.body for method in cls.methods)
+
+        for body in bodies:
+            if body is None:
+                continue
+            cfg = self.cfgs.get(body)
+            for block in cfg.unreachable_blocks():
+                stmt = cfg.block_statements(block)[0]
+                location = SourceLocation(stmt.start.line, stmt.start.column, self.current_file)
+                self.warning("Unreachable code", location, "unreachable-code")
+
+    # Game event callbacks: event names and the fields read from params
+    def check_game_event_callbacks(self, functions: list):
+
+        """ Check OnGameEvent_<event> names and the params fields their bodies read """
+
+        callbacks = [func for func in functions if func.name.startswith(CALLBACK_PREFIX)]
+        if not callbacks:
+            return
+
+        events = shared_game_event_index()
+        if not events.available:
+            return
+
+        from type_extractor import member_accesses
+
+        for func in callbacks:
+            event = func.name[len(CALLBACK_PREFIX):]
+            params_type = events.params_type(event)
+            if params_type is None:
+                suggestions = shared_suggestion_index().suggest("events", event)
+                self.warning(f"Unknown game event '{event}'" + did_you_mean([CALLBACK_PREFIX + name for name in suggestions]),
+                             self.location(*func.location), "unknown-game-event")
+                continue
+            if not func.parameters or func.body is None:
+                continue
+
+            params = func.parameters[0].name
+            for field, location in member_accesses(func.body, params):
+                if params_type.field_type(field) is None:
+                    self.warning(f"Game event '{event}' has no field '{field}'" + did_you_mean(closest(field, params_type.fields)),
+                                 self.location(*location), "unknown-event-field")
+
+    def check_constants(self, constants: list):
+
+        """ Resolve Constants.<Enum>.<NAME> references to their type and value, reporting unknown names """
+
+        if not constants:
+            return
+
+        index = shared_constant_index()
+        if not index.available:
+            return
+
+        for constant in constants:
+            members = index.members(constant.enum)
+            if members is None:
+                self.warning(f"Unknown enum 'Constants.{constant.enum}'" + did_you_mean(closest(constant.enum, index.enums)),
+                             self.location(*constant.location), "unknown-enum")
+                continue
+
+            resolved = index.resolve(constant.enum, constant.name)
+            if resolved is None:
+                self.warning(f"Unknown constant '{constant.name}' in Constants.{constant.enum}" + did_you_mean(closest(constant.name, members)),
+                             self.location(*constant.name_location), "unknown-constant")
+            else:
+                value = f" = {resolved.value!r}" if resolved.value is not None else ""
+                self.info(f"Constant 'Constants.{constant.enum}.{constant.name}': {resolved.type}{value}",
+                          self.location(*constant.name_location))
 
-    # Strip type annotations from source code
     def strip_type_annotations(self, source_code: str) -> str:
 
         """ Strip type annotations from source code """
-        stripper = TypeAnnotationStripper(source_code)
-        return stripper.strip_annotations()
+        with self.profiler.phase("strip"):
+            stripper = TypeAnnotationStripper(source_code)
+            return stripper.strip_annotations()
 
 
 # Main analyzer class that coordinates type checking and annotation stripping
@@ -378,8 +560,8 @@ class SquirrelAnalyzer:
 
     """ Main analyzer class that coordinates type checking and annotation stripping """
 
-    def __init__(self):
-        self.type_checker = SquirrelTypeChecker()
+    def __init__(self, profiler: Optional[Profiler] = None):
+        self.type_checker = SquirrelTypeChecker(profiler)
 
     # Analyze a Squirrel file
     def analyze_file(self, filename: str, check_types: bool = True, strip_annotations: bool = False) -> dict[str, Any]:
@@ -411,7 +593,7 @@ class SquirrelAnalyzer:
 
         # Type checking
         if check_types:
-            messages = self.type_checker.check_file(filename, source_code)
+            messages = list(self.type_checker.check_file(filename, source_code))
 
         # Strip type annotations
         if strip_annotations:
@@ -433,7 +615,7 @@ class SquirrelAnalyzer:
 
         # Type checking
         if check_types:
-            messages = self.type_checker.check_file(filename, source_code)
+            messages = list(self.type_checker.check_file(filename, source_code))
 
         # Strip type annotations
         if strip_annotations:
@@ -448,6 +630,52 @@ class SquirrelAnalyzer:
         }
 
 
+def _load_shared_indexes() -> None:
+
+    """ Read the process-wide indexes the checks use, so forked --jobs workers inherit them loaded """
+
+    shared_entity_class_index().load()
+    shared_netprop_index().load()
+    shared_constant_index().load()
+    shared_game_event_index().load()
+    string_sets = shared_string_sets()
+    if string_sets.available:
+        string_sets.load()
+
+
+# Analyzer and trace recorder of a --jobs worker process
+_worker: Optional[tuple[SquirrelAnalyzer, Optional[TraceRecorder]]] = None
+
+
+def _init_worker(trace: bool) -> None:
+
+    global _worker
+    tracer = TraceRecorder() if trace else None
+    if tracer:
+        observe_caches(tracer.cache_lookup)
+    _worker = (SquirrelAnalyzer(tracer), tracer)
+
+
+def _analyze_in_worker(filename: str, check_types: bool, strip_annotations: bool) -> tuple[dict[str, Any], list]:
+
+    """ Analyze one file in a worker; returns the result and the trace events it produced """
+
+    assert _worker is not None
+    analyzer, tracer = _worker
+    result = analyze_traced(analyzer, tracer, filename, check_types, strip_annotations)
+    result.pop("original_code", None)
+    return result, tracer.drain() if tracer else []
+
+
+def analyze_traced(analyzer: SquirrelAnalyzer, tracer: Optional[TraceRecorder], filename: str,
+                   check_types: bool, strip_annotations: bool) -> dict[str, Any]:
+
+    """ analyze_file inside a per-file trace span """
+
+    with tracer.phase(filename, "file") if tracer else contextlib.nullcontext():
+        return analyzer.analyze_file(filename, check_types=check_types, strip_annotations=strip_annotations)
+
+
 def main():
 
     """ Main entry point """
@@ -458,45 +686,106 @@ def main():
         epilog=HELP_TEXT
     )
 
-    parser.add_argument( "file", help="Squirrel source file to analyze" )
+    parser.add_argument( "files", nargs="+", metavar="file", help="Squirrel source file(s) to analyze" )
     parser.add_argument( "--check", "-c", action="store_true", default=True, help="Perform type checking (default: True)" )
     parser.add_argument( "--no-check", "-nc", action="store_false", dest="check", help="Skip type checking" )
     parser.add_argument( "--strip", "-s", action="store_true", help="Strip type annotations" )
-    parser.add_argument( "--output", "-o", help="Output file for stripped code" )
+    parser.add_argument( "--output", "-o", help="Output file for stripped code (single file only)" )
     parser.add_argument( "--format", "-fmt", choices=["text", "json"], default="text", help="Output format for messages" )
     parser.add_argument( "--verbose", "-v", action="store_true", default=False, help="Verbose output" )
+    parser.add_argument( "--jobs", "-j", type=int, default=1, help="Worker processes for multiple files (default: 1)" )
+    parser.add_argument( "--profile", action="store_true", help="Report wall and CPU time per phase, with cProfile hotspots" )
+    parser.add_argument( "--memprofile", action="store_true", help="Report peak and retained memory per phase, with allocation sites (tracemalloc)" )
+    parser.add_argument( "--profile-top", type=int, default=10, metavar="N", help="Hotspots / allocation sites listed per phase (default: 10, 0 for totals only)" )
+    parser.add_argument( "--trace", metavar="OUT.json", help="Write a Chrome trace-event timeline of files, phases, workers and cache lookups" )
 
     args = parser.parse_args()
 
-    analyzer = SquirrelAnalyzer()
-    result = analyzer.analyze_file( args.file, check_types=args.check, strip_annotations=args.strip )
-
-    if not result["success"]:
-        print( f"Error: {result['error']}", file=sys.stderr )
+    jobs = max(1, min(args.jobs, len(args.files)))
+    if args.output and len(args.files) > 1:
+        parser.error("--output takes a single file")
+    if jobs > 1 and (args.profile or args.memprofile):
+        parser.error("--profile and --memprofile measure this process; use --jobs 1")
+
+    memory_profiler = MemoryProfiler(top=args.profile_top) if args.memprofile else None
+    phase_profiler = PhaseProfiler(top=args.profile_top) if args.profile else None
+    tracer = TraceRecorder() if args.trace else None
+    # Memory snapshots are taken outside the timed region
+    profilers = [p for p in (memory_profiler, phase_profiler) if p is not None]
+    measured = [p for p in (*profilers, tracer) if p is not None]
+    profiler = measured[0] if len(measured) == 1 else ProfilerGroup(*measured) if measured else None
+    events = []
+
+    # Checked once here rather than per worker
+    stale_warning = shared_globals_bundle().stale_warning()
+    if stale_warning:
+        print(stale_warning, file=sys.stderr)
+
+    with tracer.phase("analyze", "batch") if tracer else contextlib.nullcontext():
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _load_shared_indexes()
+            with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(tracer is not None,)) as executor:
+                results = []
+                for result, worker_events in executor.map(_analyze_in_worker, args.files,
+                                                          [args.check] * len(args.files),
+                                                          [args.strip] * len(args.files)):
+                    results.append(result)
+                    events.extend(worker_events)
+        else:
+            if tracer:
+                observe_caches(tracer.cache_lookup)
+            analyzer = SquirrelAnalyzer(profiler)
+            results = [analyze_traced(analyzer, tracer, filename, args.check, args.strip) for filename in args.files]
+            observe_caches(None)
+
+    failed = False
+    for result in results:
+        if not result["success"]:
+            print( f"Error: {result['error']}", file=sys.stderr )
+            failed = True
+    if failed and len(args.files) == 1:
         sys.exit(1)
 
+    messages = [msg for result in results for msg in result["messages"]]
+
     # Output messages
-    if result["messages"]:
+    if messages or profiler:
+        phases = profiler_or_null(profiler)
         if args.format == "json":
-            message_dicts = []
-            for msg in result["messages"]:
-                message_dicts.append({
-                    "severity": msg.severity.value,
-                    "message": msg.message,
-                    "location": {
-                        "file": msg.location.file,
-                        "line": msg.location.line,
-                        "column": msg.location.column
-                    },
-                    "code": msg.code
-                })
-            print(json.dumps({"messages": message_dicts}, indent=2))
+            with phases.phase("format"):
+                message_dicts = []
+                for msg in messages:
+                    message_dicts.append({
+                        "severity": msg.severity.value,
+                        "message": msg.message,
+                        "location": {
+                            "file": msg.location.file,
+                            "line": msg.location.line,
+                            "column": msg.location.column
+                        },
+                        "code": msg.code
+                    })
+                output: dict[str, Any] = {"messages": message_dicts}
+            if phase_profiler:
+                output["profile"] = phase_profiler.report()
+            if memory_profiler:
+                output["memory"] = memory_profiler.report()
+            if messages or profilers:
+                print(json.dumps(output, indent=2))
         else:
-            for msg in result["messages"]:
-                print(str(msg))
+            with phases.phase("format"):
+                text = "\n".join(str(msg) for msg in messages)
+            if text:
+                print(text)
+            for report in profilers:
+                print(report.format_text())
 
     # Output stripped code
-    if args.strip and result["stripped_code"] is not None:
+    for filename, result in zip(args.files, results):
+        if not args.strip or not result["success"] or result["stripped_code"] is None:
+            continue
         if args.output:
             try:
                 with open(args.output, 'w', encoding='utf-8') as f:
@@ -506,11 +795,20 @@ def main():
                 print(f"Error writing output file: {str(e)}", file=sys.stderr)
                 sys.exit(1)
         elif args.verbose or not result["messages"]:
-            print("=== Stripped Code ===")
+            print("=== Stripped Code ===" if len(args.files) == 1 else f"=== Stripped Code: {filename} ===")
             print(result["stripped_code"])
 
+    if tracer:
+        events = tracer.drain() + events
+        # Workers are numbered in the order their first event happened
+        worker_pids = sorted({e["pid"] for e in events if e["pid"] != tracer.pid},
+                             key=lambda pid: min(e["ts"] for e in events if e["pid"] == pid))
+        process_names = {tracer.pid: "squirrel_analyzer", **{pid: f"worker {i + 1}" for i, pid in enumerate(worker_pids)}}
+        write_trace(args.trace, events, process_names)
+        print(f"Trace written to: {args.trace}", file=sys.stderr)
+
     # Exit with appropriate code
-    has_errors = any(msg.severity == ErrorSeverity.ERROR for msg in result["messages"])
+    has_errors = failed or any(msg.severity == ErrorSeverity.ERROR for msg in messages)
     sys.exit(1 if has_errors else 0)
 
 
@@ -1,6 +1,9 @@
 """ Squirrel types """
 
-from typing import Optional
+from typing import Callable, Iterable, Optional
+
+from class_hierarchy import ClassHierarchy
+from profiling import cache_lookup
 
 class SquirrelType:
 
@@ -28,7 +31,11 @@ class SquirrelType:
         if self == other or isinstance(other, AnyType):
             return True
         elif isinstance(self, NullType):
-            return isinstance(other, (NullType, OptionalType))
+            return isinstance(other, (NullType, OptionalType)) or (isinstance(other, UnionType) and NULL_TYPE in other.members)
+        elif isinstance(other, OptionalType):
+            return self.is_assignable_to(other.inner_type)
+        elif isinstance(other, UnionType):
+            return self in other.members or any(self.is_assignable_to(t) for t in other.types)
 
         return False
 
@@ -126,18 +133,119 @@ class TableType(SquirrelType):
         return super().is_assignable_to(other)
 
 
+class StructType(SquirrelType):
+
+    """ Table with a known set of fields, e.g. the params of a game event """
+
+    def __init__(self, fields: dict[str, SquirrelType]):
+
+        self.fields = fields
+        super().__init__("{" + ", ".join(f"{name}: {sqtype}" for name, sqtype in fields.items()) + "}")
+
+    def field_type(self, name: str) -> Optional[SquirrelType]:
+        return self.fields.get(name)
+
+    def is_assignable_to(self, other: 'SquirrelType') -> bool:
+
+        if other == TABLE_TYPE:
+            return True
+        if isinstance(other, StructType):
+            # Structural typing - every field of the target must be present and compatible
+            return all(name in self.fields and self.fields[name].is_assignable_to(sqtype) for name, sqtype in other.fields.items())
+        return super().is_assignable_to(other)
+
+
 class ClassType(SquirrelType):
 
-    """ Class type """
+    """
+    Class type
+
+    member_table() flattens the members of the class and all its bases into one dict, built on
+    first use and cached. Changing the members or the base of a class (through set_members or
+    base_class) drops the cached tables of the class and every subclass.
+    """
 
-    def __init__(self, name: str, members: Optional[dict[str, SquirrelType]] = None, base_class: Optional['ClassType'] = None):
+    CONSTRUCTOR = "constructor"
+
+    def __init__(self, name: str, members: Optional[dict[str, SquirrelType]] = None, base_class: Optional['ClassType'] = None,
+                 hierarchy: Optional[ClassHierarchy] = None, constructor: Optional[FunctionType] = None):
 
         self.members = members or {}
-        self.base_class = base_class
+        self.constructor = constructor
+        self.hierarchy = hierarchy
+        self.class_id = hierarchy.class_id(name) if hierarchy else ClassHierarchy.NO_BASE
+        self._base_class: Optional['ClassType'] = None
+        self._subclasses: dict[int, 'ClassType'] = {}
+        self._member_table: Optional[dict[str, SquirrelType]] = None
+        # Called once, before the first member lookup, for classes whose members are loaded on demand
+        self.member_loader: Optional[Callable[['ClassType'], None]] = None
         super().__init__(name)
+        self.base_class = base_class
+
+    @property
+    def base_class(self) -> Optional['ClassType']:
+        return self._base_class
+
+    @base_class.setter
+    def base_class(self, base_class: Optional['ClassType']):
+
+        if base_class is self._base_class:
+            return
+        if self._base_class is not None:
+            self._base_class._subclasses.pop(id(self), None)
+        if base_class is not None:
+            base_class._subclasses[id(self)] = self
+        self._base_class = base_class
+        self.invalidate_members()
+
+    def set_members(self, members: dict[str, SquirrelType], constructor: Optional[FunctionType] = None):
+
+        """ Replace the members declared by this class """
+        self.members = members
+        self.constructor = constructor
+        self.invalidate_members()
+
+    def invalidate_members(self):
+
+        """ Drop the cached member tables of this class and all its subclasses """
+
+        pending = [self]
+        seen: set[int] = set()
+        while pending:
+            cls = pending.pop()
+            if id(cls) in seen:
+                continue
+            seen.add(id(cls))
+            cls._member_table = None
+            pending.extend(cls._subclasses.values())
+
+    def member_table(self) -> dict[str, SquirrelType]:
+
+        """ Own and inherited members, including the constructor, nearest declaration first """
+
+        if self.member_loader is not None:
+            loader, self.member_loader = self.member_loader, None
+            loader(self)
+
+        cache_lookup("members", self.name, self._member_table is not None)
+        if self._member_table is None:
+            table = dict(self._base_class.member_table()) if self._base_class is not None else {}
+            table.update(self.members)
+            if self.constructor is not None:
+                table[self.CONSTRUCTOR] = self.constructor
+            self._member_table = table
+        return self._member_table
+
+    def lookup_member(self, name: str) -> Optional[SquirrelType]:
+
+        """ Find a member declared by this class or any of its bases """
+        return self.member_table().get(name)
 
     def is_assignable_to(self, other: 'SquirrelType') -> bool:
         if isinstance(other, ClassType):
+            # Indexed classes answer from the precomputed ancestor sets
+            if self.hierarchy is not None and self.hierarchy is other.hierarchy:
+                return self.hierarchy.is_subclass_id(self.class_id, other.class_id)
             # Check inheritance chain
             current: Optional['ClassType'] = self
             while current:
@@ -150,19 +258,25 @@ class ClassType(SquirrelType):
 
 class UnionType(SquirrelType):
 
-    """ Union type representing multiple possible types """
+    """
+    Union type representing multiple possible types
 
-    def __init__(self, types: set[SquirrelType]):
+    Members are kept in canonical form: nested unions are flattened, duplicates and members
+    subsumed by another member are dropped, and the rest is sorted by name into a tuple.
+    Use make_union() to also collapse single members, 'any' and 'null' (folded into OptionalType).
+    """
 
-        self.types = types
-        type_str = " | ".join(sorted(str(t) for t in types))
-        super().__init__(type_str)
+    def __init__(self, types: Iterable[SquirrelType]):
+
+        self.types: tuple[SquirrelType, ...] = _normalize_members(_flatten_members(types))
+        self.members = frozenset(self.types)
+        super().__init__(" | ".join(str(t) for t in self.types))
 
     def is_assignable_to(self, other: 'SquirrelType') -> bool:
 
         if isinstance(other, UnionType):
             # All our types must be assignable to at least one of their types
-            return all(any(t.is_assignable_to(ot) for ot in other.types) for t in self.types)
+            return all(t in other.members or any(t.is_assignable_to(ot) for ot in other.types) for t in self.types)
         # All our types must be assignable to the target type
         return all(t.is_assignable_to(other) for t in self.types)
 
@@ -174,19 +288,101 @@ class OptionalType(SquirrelType):
     def __init__(self, inner_type: SquirrelType):
 
         self.inner_type = inner_type
-        super().__init__(f"{inner_type}?")
+        super().__init__(f"({inner_type})?" if isinstance(inner_type, UnionType) else f"{inner_type}?")
 
     def is_assignable_to(self, other: 'SquirrelType') -> bool:
 
         if isinstance(other, OptionalType):
             return self.inner_type.is_assignable_to(other.inner_type)
 
-        if isinstance(other, UnionType) and NullType() in other.types:
-            return self.inner_type.is_assignable_to( UnionType( other.types - {NullType()} ) )
+        if isinstance(other, UnionType) and NULL_TYPE in other.members:
+            return self.inner_type.is_assignable_to( make_union( t for t in other.types if t != NULL_TYPE ) )
 
         return super().is_assignable_to(other)
 
 
+def _flatten_members(types: Iterable[SquirrelType]) -> set[SquirrelType]:
+
+    """ Collect union members, expanding nested unions and optionals (T? is T | null) """
+
+    flat: set[SquirrelType] = set()
+    pending = list(types)
+    while pending:
+        t = pending.pop()
+        if isinstance(t, UnionType):
+            pending.extend(t.types)
+        elif isinstance(t, OptionalType):
+            pending.append(t.inner_type)
+            flat.add(NULL_TYPE)
+        else:
+            flat.add(t)
+    return flat
+
+
+def _normalize_members(members: set[SquirrelType]) -> tuple[SquirrelType, ...]:
+
+    """ Drop members another member already accepts and sort the rest by name """
+
+    if ANY_TYPE in members:
+        return (ANY_TYPE,)
+
+    ordered = sorted(members, key=str)
+
+    # Primitives and null are only ever subsumed by an equal member, which the set already removed
+    candidates = [t for t in ordered if not isinstance(t, (PrimitiveType, NullType))]
+    if len(candidates) < 2:
+        return tuple(ordered)
+
+    subsumed = set()
+
+    # Indexed classes of one hierarchy: a class is subsumed if any other member is one of its ancestors
+    hierarchy = next((t.hierarchy for t in candidates if isinstance(t, ClassType) and t.hierarchy is not None), None)
+    indexed = [t for t in candidates if isinstance(t, ClassType) and t.hierarchy is hierarchy] if hierarchy else []
+    if indexed:
+        members_mask = 0
+        for t in indexed:
+            members_mask |= 1 << t.class_id
+        for t in indexed:
+            if hierarchy.ancestor_masks[t.class_id] & members_mask & ~(1 << t.class_id):
+                subsumed.add(id(t))
+
+    # Everything else is compared pairwise. Among mutually assignable members
+    # (e.g. array<any> and array<int>) the first by name is kept
+    indexed_ids = {id(t) for t in indexed}
+    others = [t for t in candidates if id(t) not in indexed_ids]
+    rank = {id(t): i for i, t in enumerate(ordered)}
+    for t in candidates:
+        if id(t) in subsumed:
+            continue
+        for u in (others if id(t) in indexed_ids else candidates):
+            if t is u or id(u) in subsumed:
+                continue
+            if t.is_assignable_to(u) and (rank[id(u)] < rank[id(t)] or not u.is_assignable_to(t)):
+                subsumed.add(id(t))
+                break
+
+    return tuple(t for t in ordered if id(t) not in subsumed)
+
+
+def make_union(types: Iterable[SquirrelType]) -> SquirrelType:
+
+    """ Build the canonical type for a union: T, T?, any, or a normalized UnionType """
+
+    members = _flatten_members(types)
+    has_null = NULL_TYPE in members
+    members.discard(NULL_TYPE)
+
+    if not members:
+        return NULL_TYPE
+
+    normalized = _normalize_members(members)
+    result = normalized[0] if len(normalized) == 1 else UnionType(normalized)
+
+    if has_null and not isinstance(result, AnyType):
+        return OptionalType(result)
+    return result
+
+
 NULL_TYPE      = NullType()
 
 INT_TYPE       = PrimitiveType("int")
@@ -221,4 +417,88 @@ SQUIRREL_TYPES: dict[str, SquirrelType] = {
     INSTANCE_TYPE.name : INSTANCE_TYPE,
     BLOB_TYPE.name     : BLOB_TYPE,
     ANY_TYPE.name      : ANY_TYPE
-}
\ No newline at end of file
+}
+
+def _split_top_level(text: str, separator: str) -> list[str]:
+
+    """ Split a type string on a separator that is not nested inside <>, () or {} """
+
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if text.startswith("->", i):
+            i += 2
+            continue
+        if char in "<({":
+            depth += 1
+        elif char in ">)}":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _matching_paren(text: str) -> int:
+
+    """ Index of the ')' closing the '(' at the start of text """
+
+    depth = 0
+    for i, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
+
+
+def parse_type(text: Optional[str], named_types: Optional[dict[str, SquirrelType]] = None) -> SquirrelType:
+
+    """
+    Turn a type annotation string ("int", "array<string>", "Foo|null", "(int) -> bool", "{a: int}", ...)
+    into a SquirrelType. Names that are neither built-in nor in named_types resolve to any.
+    """
+
+    if not text:
+        return ANY_TYPE
+    text = text.strip()
+
+    members = _split_top_level(text, "|")
+    if len(members) > 1:
+        return make_union(parse_type(member, named_types) for member in members)
+
+    if text.endswith("?"):
+        return OptionalType(parse_type(text[:-1], named_types))
+    if text.endswith("[]"):
+        return ArrayType(parse_type(text[:-2], named_types))
+    if text.startswith("array<") and text.endswith(">"):
+        return ArrayType(parse_type(text[6:-1], named_types))
+    if text.startswith("{") and text.endswith("}"):
+        fields = {}
+        for member in _split_top_level(text[1:-1], ","):
+            name, _, member_type = member.partition(":")
+            if name.strip():
+                fields[name.strip()] = parse_type(member_type, named_types)
+        return StructType(fields) if fields else TABLE_TYPE
+    if text.startswith("("):
+        close = _matching_paren(text)
+        if close == len(text) - 1:
+            return parse_type(text[1:-1], named_types)
+        params_text, return_text = text[1:close], text[close + 1:].strip().removeprefix("->")
+        params = [parse_type(p, named_types) for p in _split_top_level(params_text, ",") if p.strip()]
+        return FunctionType(params, parse_type(return_text, named_types))
+
+    if text == "void":
+        return NULL_TYPE
+    if text in SQUIRREL_TYPES:
+        return SQUIRREL_TYPES[text]
+    if named_types and text in named_types:
+        return named_types[text]
+    return ANY_TYPE
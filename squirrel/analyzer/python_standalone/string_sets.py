@@ -0,0 +1,140 @@
+""" Versioned bundle of name sets (convars, attributes, inputs, outputs, ...) """
+
+import hashlib
+import os
+import struct
+from typing import Iterable, Optional
+
+from globals_db import DATA_DIR, GlobalsDatabaseError
+
+STRING_SETS_PATH = os.path.join(DATA_DIR, "string_sets.bin")
+
+MAGIC = b"SQSS"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHH20s")  # magic, format version, set count, content digest
+_SET    = struct.Struct("<BII")      # name length, entry count, payload length
+
+SEPARATOR = "\n"
+
+
+def write_string_sets(path: str, sets: dict[str, Iterable[str]]) -> None:
+
+    """
+    Write named string sets into one file
+
+    Layout: header | per set: entry (name length, count, payload length), name, payload, where
+    the payload is the sorted names joined by newlines. The header carries a SHA-1 digest of
+    everything after it, which doubles as the data version.
+    """
+
+    body = bytearray()
+    for name, names in sets.items():
+        encoded_name = name.encode("utf-8")
+        sorted_names = sorted(set(names))
+        payload = SEPARATOR.join(sorted_names).encode("utf-8")
+        body += _SET.pack(len(encoded_name), len(sorted_names), len(payload))
+        body += encoded_name
+        body += payload
+
+    digest = hashlib.sha1(body).digest()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sets), digest))
+        f.write(body)
+
+
+class StringSets:
+
+    """
+    Read-only view of a string set bundle
+
+    The whole file is read with one read() on first use; each set is split into a frozenset
+    the first time it is queried. Lookups are case-insensitive: I/O names, convars and
+    attributes all resolve case-insensitively in the engine.
+    """
+
+    def __init__(self, path: str = STRING_SETS_PATH):
+
+        self.path = path
+        self.version: Optional[str] = None
+        self._payloads: Optional[dict[str, bytes]] = None
+        self._names: dict[str, tuple[str, ...]] = {}
+        self._folded: dict[str, frozenset[str]] = {}
+        # Whether the file exists, checked once; the name checks ask before every call site
+        self._available: Optional[bool] = None
+
+    @property
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = os.path.exists(self.path)
+        return self._available
+
+    def load(self) -> dict[str, bytes]:
+
+        """ Read the bundle, once; the first checked call does this unless it was preloaded """
+
+        if self._payloads is not None:
+            return self._payloads
+        if not self.available:
+            raise GlobalsDatabaseError(f"String sets not found: {self.path} (run build_globals.py)")
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        if len(data) < _HEADER.size:
+            raise GlobalsDatabaseError(f"Truncated string sets: {self.path}")
+        magic, version, set_count, digest = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise GlobalsDatabaseError(f"Incompatible string sets: {self.path} (run build_globals.py)")
+
+        payloads = {}
+        position = _HEADER.size
+        for _ in range(set_count):
+            name_length, _count, payload_length = _SET.unpack_from(data, position)
+            position += _SET.size
+            name = data[position:position + name_length].decode("utf-8")
+            position += name_length
+            payloads[name] = data[position:position + payload_length]
+            position += payload_length
+
+        self.version = digest.hex()
+        self._payloads = payloads
+        self._available = True
+        return payloads
+
+    @property
+    def set_names(self) -> list[str]:
+        return list(self.load())
+
+    def names(self, set_name: str) -> tuple[str, ...]:
+
+        """ Names of a set as written, sorted; empty for unknown sets """
+
+        names = self._names.get(set_name)
+        if names is None:
+            payload = self.load().get(set_name, b"")
+            names = tuple(payload.decode("utf-8").split(SEPARATOR)) if payload else ()
+            self._names[set_name] = names
+        return names
+
+    def contains(self, set_name: str, name: str) -> bool:
+
+        folded = self._folded.get(set_name)
+        if folded is None:
+            folded = frozenset(entry.lower() for entry in self.names(set_name))
+            self._folded[set_name] = folded
+        return name.lower() in folded
+
+
+_shared: Optional[StringSets] = None
+
+
+def shared_string_sets() -> StringSets:
+
+    """ Process-wide bundle, read on the first checked call """
+
+    global _shared
+    if _shared is None:
+        _shared = StringSets()
+    return _shared
@@ -0,0 +1,197 @@
+""" Trigram index for "did you mean" suggestions on unknown names """
+
+import os
+import pickle
+import zlib
+from array import array
+from collections import Counter
+from typing import Iterable, Optional
+
+from globals_db import DATA_DIR, GlobalsDatabase, write_database
+
+SUGGESTIONS_DATABASE_PATH = os.path.join(DATA_DIR, "suggest.db")
+
+# Trigram hits shared by more than this fraction of a vocabulary don't tell candidates apart
+COMMON_TRIGRAM_FRACTION = 0.2
+
+# Candidates re-ranked by edit distance after trigram scoring
+CANDIDATES = 24
+
+
+def trigrams(name: str) -> set[str]:
+
+    """ Case-insensitive trigrams of a name, padded so short names and word edges count """
+
+    padded = f"  {name.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+
+    """ Case-insensitive Levenshtein distance; stops early once every path exceeds limit """
+
+    a, b = a.lower(), b.lower()
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    # Paths mostly differ in a short stretch: only the middle needs the quadratic table
+    start = 0
+    while start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not b:
+        return len(a)
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_distance(name: str) -> int:
+
+    """ Edits allowed between a name and a suggestion for it """
+
+    return max(1, min(len(name) // 4, 6))
+
+
+def closest(name: str, candidates: Iterable[str], limit: int = 3) -> list[str]:
+
+    """ Up to limit candidates close to name by edit distance, for sets too small to index """
+
+    limit_distance = max_distance(name)
+    ranked = []
+    for candidate in candidates:
+        distance = edit_distance(name, candidate, limit_distance)
+        if distance <= limit_distance:
+            ranked.append((distance, candidate))
+    ranked.sort()
+    return [candidate for _, candidate in ranked[:limit]]
+
+
+def build_trigram_index(names: Iterable[str]) -> bytes:
+
+    """
+    Compressed inverted index of a vocabulary
+
+    Pickled (sorted names, typecode, {trigram: (start, end)}, packed ids) where ids[start:end]
+    are the names containing the trigram. Trigrams common to more than COMMON_TRIGRAM_FRACTION
+    of the names are left out: they are skipped at query time anyway.
+    """
+
+    sorted_names = tuple(sorted(set(names)))
+    postings: dict[str, list[int]] = {}
+    for name_id, name in enumerate(sorted_names):
+        for gram in trigrams(name):
+            postings.setdefault(gram, []).append(name_id)
+
+    typecode = "H" if len(sorted_names) <= 0xFFFF else "I"
+    common = _common_limit(len(sorted_names))
+    ids = array(typecode)
+    ranges = {}
+    for gram, gram_ids in sorted(postings.items()):
+        if len(gram_ids) <= common:
+            ranges[gram] = (len(ids), len(ids) + len(gram_ids))
+            ids.extend(gram_ids)
+
+    return zlib.compress(pickle.dumps((sorted_names, typecode, ranges, ids.tobytes()), protocol=4), 9)
+
+
+def _common_limit(vocabulary_size: int) -> int:
+    return max(CANDIDATES, int(vocabulary_size * COMMON_TRIGRAM_FRACTION))
+
+
+def write_suggestion_index(path: str, vocabularies: dict[str, Iterable[str]]) -> None:
+    write_database(path, {vocabulary: build_trigram_index(names) for vocabulary, names in vocabularies.items()})
+
+
+class _Vocabulary:
+
+    def __init__(self, packed: bytes):
+
+        self.names, typecode, self.ranges, ids = pickle.loads(zlib.decompress(packed))
+        self.ids = memoryview(ids).cast(typecode)
+
+    def postings(self, gram: str) -> Optional[memoryview]:
+
+        span = self.ranges.get(gram)
+        return None if span is None else self.ids[span[0]:span[1]]
+
+
+class SuggestionIndex:
+
+    """
+    Ranked suggestions for names missing from a vocabulary
+
+    Candidates are the names sharing the most trigrams with the query, counted over the inverted
+    index; only those few are ranked by edit distance. Each vocabulary is decompressed on its
+    first miss.
+    """
+
+    def __init__(self, path: str = SUGGESTIONS_DATABASE_PATH):
+
+        self.db = GlobalsDatabase(path)
+        self._vocabularies: dict[str, _Vocabulary] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    def _vocabulary(self, vocabulary: str) -> Optional[_Vocabulary]:
+
+        loaded = self._vocabularies.get(vocabulary)
+        if loaded is None:
+            packed = self.db.get(vocabulary) if self.db.available else None
+            if packed is None:
+                return None
+            loaded = _Vocabulary(packed)
+            self._vocabularies[vocabulary] = loaded
+        return loaded
+
+    def suggest(self, vocabulary: str, name: str, limit: int = 3) -> list[str]:
+
+        """ Up to limit names close to name, best first """
+
+        loaded = self._vocabulary(vocabulary)
+        if loaded is None or not name:
+            return []
+
+        counts: Counter = Counter()
+        for gram in trigrams(name):
+            ids = loaded.postings(gram)
+            if ids is not None:
+                counts.update(ids)
+
+        return closest(name, (loaded.names[name_id] for name_id, _ in counts.most_common(CANDIDATES)), limit)
+
+
+def did_you_mean(suggestions: list[str]) -> str:
+
+    """ Message suffix for a list of suggestions """
+
+    if not suggestions:
+        return ""
+    return ", did you mean " + " or ".join(f"'{suggestion}'" for suggestion in suggestions) + "?"
+
+
+_shared: Optional[SuggestionIndex] = None
+
+
+def shared_suggestion_index() -> SuggestionIndex:
+
+    """ Process-wide index, opened on the first unknown name """
+
+    global _shared
+    if _shared is None:
+        _shared = SuggestionIndex()
+    return _shared
@@ -3,9 +3,13 @@
 Test script for the Squirrel Static Type Analyzer
 """
 
+import json
 import os
+import subprocess
 import sys
+import tempfile
 from squirrel_analyzer import SquirrelAnalyzer, ErrorSeverity
+from profiling import MemoryProfiler, PhaseProfiler, TraceRecorder, observe_caches, write_trace
 
 def test_basic_functionality():
     """Test basic analyzer functionality"""
@@ -126,6 +130,100 @@ def test_example_files():
     
     return True
 
+def test_phase_profile():
+    """Test per-phase timings and hotspots"""
+    print("\nTesting phase profiling...")
+
+    profiler = PhaseProfiler(top=3)
+    analyzer = SquirrelAnalyzer(profiler)
+    analyzer.analyze_string("local x: int = 1\nfunction f(a: string): int { return 1 }",
+                            check_types=True, strip_annotations=True)
+
+    report = profiler.report()
+    assert list(report["phases"]) == ["lex", "parse", "walk", "check", "strip"], report["phases"].keys()
+    assert report["counts"]["tokens"] > 10 and report["counts"]["parse_nodes"] > report["counts"]["tokens"]
+    for name, phase in report["phases"].items():
+        assert phase["calls"] == 1 and phase["wall_s"] >= 0, name
+        assert 0 < len(phase["hotspots"]) <= 3, name
+    assert "parse" in profiler.format_text()
+    print("✓ Every phase timed with its hotspots")
+
+    return True
+
+def test_memory_profile():
+    """Test per-phase peak, retained memory and allocation sites"""
+    print("\nTesting memory profiling...")
+
+    profiler = MemoryProfiler(top=3)
+    analyzer = SquirrelAnalyzer(profiler)
+    analyzer.analyze_string("local values: array<int> = [1, 2, 3]\nfunction f(a: string): int { return 1 }",
+                            check_types=True, strip_annotations=True)
+    profiler.close()
+
+    report = profiler.report()
+    assert list(report["phases"]) == ["lex", "parse", "walk", "check", "strip"], report["phases"].keys()
+    assert report["counts"]["parse_nodes"] > 0
+    parse = report["phases"]["parse"]
+    assert parse["peak_bytes"] >= parse["retained_bytes"] > 0
+    assert parse["allocation_sites"] and all(site["bytes"] > 0 for site in parse["allocation_sites"])
+    assert "allocation sites" in profiler.format_text()
+    print("✓ Every phase has its peak, retained memory and allocation sites")
+
+    return True
+
+def test_trace_events():
+    """Test Chrome trace events for files, phases and cache lookups"""
+    print("\nTesting trace events...")
+
+    tracer = TraceRecorder()
+    analyzer = SquirrelAnalyzer(tracer)
+    observe_caches(tracer.cache_lookup)
+    try:
+        with tracer.phase("example.nut", "file"):
+            analyzer.analyze_string("function f(a: int): int {\n    return a\n    a++\n}", check_types=True)
+    finally:
+        observe_caches(None)
+
+    events = tracer.drain()
+    assert not tracer.events
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert list(spans) == ["lex", "parse", "walk", "check", "example.nut"], list(spans)
+    file_span = spans["example.nut"]
+    assert file_span["cat"] == "file" and file_span["args"]["tokens"] > 0
+    for name in ("lex", "parse", "walk", "check"):
+        assert file_span["ts"] <= spans[name]["ts"] and spans[name]["dur"] <= file_span["dur"], name
+    assert any(e["ph"] == "i" and e["name"] == "cfg miss" for e in events)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        write_trace(path, events, {tracer.pid: "analyzer"})
+        with open(path, "r", encoding="utf-8") as f:
+            trace = json.load(f)
+    assert trace["traceEvents"][0] == {"name": "process_name", "ph": "M", "pid": tracer.pid, "tid": tracer.pid,
+                                       "args": {"name": "analyzer"}}
+    print(f"✓ {len(events)} events: file span around its phases, with cache lookups")
+
+    return True
+
+def test_json_output_with_profile():
+    """Test that --format json stays one JSON document with the profile reports"""
+    print("\nTesting JSON output with profiling...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "example.nut")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("local x: int = 1\nfunction f(a: int): int { return a }\n")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "squirrel_analyzer.py")
+        completed = subprocess.run([sys.executable, script, path, "--format", "json", "--profile", "--memprofile"],
+                                   capture_output=True, text=True, check=False)
+
+    output = json.loads(completed.stdout)
+    assert set(output) == {"messages", "profile", "memory"}, set(output)
+    assert any(msg["message"] == "Local variable 'x': int" for msg in output["messages"])
+    print("✓ Messages, profile and memory report parse as one document")
+
+    return True
+
 def run_all_tests():
     """Run all tests"""
     print("Squirrel Static Type Analyzer - Test Suite")
@@ -135,7 +233,11 @@ def run_all_tests():
         test_basic_functionality,
         test_type_errors,
         test_annotation_stripping,
-        test_example_files
+        test_example_files,
+        test_phase_profile,
+        test_memory_profile,
+        test_trace_events,
+        test_json_output_with_profile
     ]
     
     passed = 0
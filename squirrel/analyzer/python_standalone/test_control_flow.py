@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the control-flow graph builder
+"""
+
+from antlr4 import InputStream, CommonTokenStream
+from SquirrelParserLexer import SquirrelParserLexer
+from SquirrelParserParser import SquirrelParserParser
+from control_flow import ControlFlowGraph, ControlFlowCache, BLOCK_LOOP, build_cfg
+from squirrel_analyzer import SquirrelAnalyzer
+
+
+def parse_function_body(source_code: str):
+    """Parse source code and return the body of its first function"""
+    parser = SquirrelParserParser(CommonTokenStream(SquirrelParserLexer(InputStream(source_code))))
+    tree = parser.program()
+    return tree.statement(0).functionStatement().functionBody()
+
+
+def statement_texts(cfg: ControlFlowGraph, block: int):
+    return [stmt.getText() for stmt in cfg.block_statements(block)]
+
+
+def test_straight_line():
+    """A body without branches is a single block between entry and exit"""
+    cfg = build_cfg(parse_function_body("function f() { local a = 1; a += 2; return a; }"))
+
+    assert statement_texts(cfg, ControlFlowGraph.ENTRY) == ["locala=1;", "a+=2;", "returna;"]
+    assert list(cfg.successors(ControlFlowGraph.ENTRY)) == [ControlFlowGraph.EXIT]
+    assert list(cfg.predecessors(ControlFlowGraph.EXIT)) == [ControlFlowGraph.ENTRY]
+    assert cfg.unreachable_blocks() == []
+
+
+def test_if_else_join():
+    """Both branches of an if/else flow into a common join block"""
+    cfg = build_cfg(parse_function_body("""
+    function f(x) {
+        if (x) { x = 1; } else { x = 2; }
+        return x;
+    }
+    """))
+
+    cond_succs = list(cfg.successors(ControlFlowGraph.ENTRY))
+    assert len(cond_succs) == 2
+    joins = {tuple(cfg.successors(b)) for b in cond_succs}
+    assert len(joins) == 1
+    join = joins.pop()[0]
+    assert statement_texts(cfg, join) == ["returnx;"]
+
+
+def test_loops_break_continue():
+    """break leaves the loop, continue goes back to the header"""
+    cfg = build_cfg(parse_function_body("""
+    function f(items) {
+        foreach (item in items) {
+            if (item) continue;
+            break;
+        }
+        return 0;
+    }
+    """))
+
+    headers = [b for b in range(cfg.num_blocks) if cfg.block_kinds[b] == BLOCK_LOOP]
+    assert len(headers) == 1
+    header = headers[0]
+
+    continue_block = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b) == ["continue;"])
+    break_block = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b) == ["break;"])
+    assert list(cfg.successors(continue_block)) == [header]
+    after = cfg.successors(break_block)[0]
+    assert statement_texts(cfg, after) == ["return0;"]
+    assert after in cfg.successors(header)
+
+
+def test_switch_fallthrough_and_try():
+    """Cases fall through, and a throw inside try lands in the catch block"""
+    cfg = build_cfg(parse_function_body("""
+    function f(x) {
+        switch (x) {
+            case 1: x = 2;
+            case 2: x = 3; break;
+            default: x = 4;
+        }
+        try { throw "bad"; } catch (e) { x = 5; }
+        return x;
+    }
+    """))
+
+    case1 = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b) == ["x=2;"])
+    case2 = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b)[:1] == ["x=3;"])
+    assert case2 in cfg.successors(case1)
+
+    thrower = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b) == ['throw"bad";'])
+    handler = next(b for b in range(cfg.num_blocks) if statement_texts(cfg, b) == ["x=5;"])
+    assert handler in cfg.successors(thrower)
+    assert cfg.unreachable_blocks() == []
+
+
+def test_unreachable_code():
+    """Statements after return are unreachable and reported once"""
+    cfg = build_cfg(parse_function_body("function f() { return 1; local dead = 2; dead++; }"))
+
+    dead = cfg.unreachable_blocks()
+    assert len(dead) == 1
+    assert statement_texts(cfg, dead[0]) == ["localdead=2;", "dead++;"]
+
+    analyzer = SquirrelAnalyzer()
+    result = analyzer.analyze_string("function f() { return 1; local dead = 2; }")
+    codes = [msg.code for msg in result["messages"]]
+    assert codes.count("unreachable-code") == 1
+
+
+def test_cache_builds_once():
+    """The cache hands the same graph to every analysis"""
+    body = parse_function_body("function f() { return 1; }")
+    cache = ControlFlowCache()
+    assert cache.get(body) is cache.get(body)
+    assert len(cache) == 1
+
+
+if __name__ == "__main__":
+    for test in (test_straight_line, test_if_else_join, test_loops_break_continue,
+                 test_switch_fallthrough_and_try, test_unreachable_code, test_cache_builds_once):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Test script for the precompiled VScript globals
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from asset_index import AssetIndex, write_asset_index
+from build_globals import STRING_COMPLETION_LISTS, compile_signature, compile_functions, export_string_completions, GLOBALS_PARSING_DIR
+from constant_index import ConstantIndex
+from game_events import shared_game_event_index
+from globals_bundle import BUNDLE_FILES, GlobalsBundle, write_bundle
+from globals_db import GlobalsDatabase, write_database
+from netprop_index import NetPropIndex
+from squirrel_analyzer import SquirrelTypeChecker
+from squirrel_types import ClassType, FunctionType, parse_type
+from string_sets import StringSets, write_string_sets
+from suggestion_index import SuggestionIndex, edit_distance, write_suggestion_index
+
+
+def test_database_roundtrip():
+    """Sections are written once and decoded individually on demand"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test.db")
+        write_database(path, {"a": {"x": 1}, "b": [1, 2, 3]})
+
+        db = GlobalsDatabase(path)
+        assert db.loaded_sections == []
+        assert db["b"] == [1, 2, 3]
+        assert db.loaded_sections == ["b"]
+        assert db.get("missing") is None
+        db.close()
+
+
+def test_compile_signatures():
+    """Wiki signatures compile into typed parameter tuples"""
+    params, return_type = compile_signature(
+        "CBaseEntity.AcceptInput(input: string, param: string, activator: handle, caller: handle) -> bool", set())
+    assert return_type == "bool"
+    assert params[2] == ("activator", "instance", False)
+
+    params, return_type = compile_signature("EntFire(target: string, delay: float = 0) -> void", set())
+    assert params == (("target", "string", False), ("delay", "float", True))
+
+    params, _ = compile_signature("CBaseEntity.AddEFlags(flags: FEntityEFlags) -> void", {"FEntityEFlags"})
+    assert params[0][1] == "int"
+
+    sections = compile_functions(GLOBALS_PARSING_DIR)
+    assert "GetPropInt" in sections["class:CNetPropManager"]["methods"]
+    assert "EntFire" in sections["globals"]
+    # The repeated last class table is not taken for global functions
+    assert "ToQAngle" not in sections["globals"]
+
+
+def test_api_loads_lazily():
+    """API classes are only decoded when a file references them"""
+    checker = SquirrelTypeChecker()
+    assert checker.api.db.loaded_sections == []
+
+    netprops = checker.symbol_table.lookup("NetProps")
+    assert isinstance(netprops.type, ClassType) and netprops.type.name == "CNetPropManager"
+    assert "class:CNetPropManager" not in checker.api.db.loaded_sections
+
+    get_prop_int = netprops.type.lookup_member("GetPropInt")
+    assert str(get_prop_int) == "(instance, string) -> int"
+    assert "class:CNetPropManager" in checker.api.db.loaded_sections
+    assert "class:CBaseEntity" not in checker.api.db.loaded_sections
+
+    # Engine classes inherit their bases' methods
+    player = checker.symbol_table.lookup("CTFPlayer").type
+    assert isinstance(player.lookup_member("GetOrigin"), FunctionType)
+    assert player.is_assignable_to(checker.symbol_table.lookup("CBaseEntity").type)
+
+    assert isinstance(checker.symbol_table.lookup("EntFire").type, FunctionType)
+    assert checker.symbol_table.lookup("NotAnApiFunction") is None
+
+
+def test_netprop_index():
+    """Netprop names and accessor kinds are checked against properties.json"""
+    index = NetPropIndex()
+    assert index.kind("m_iTargetFade") == "integer"
+    assert index.check_access("GetPropInt", "m_iTargetFade") is None
+    assert index.check_access("SetPropFloat", "m_iTargetFade") is not None
+    assert index.check_access("GetPropInt", "m_iNotAProp").startswith("Unknown netprop")
+    # Array props can be read element 0 at a time, scalar props can't be indexed
+    assert index.check_access("GetPropInt", "m_iAmmo") is None
+    assert index.check_access("GetPropIntArray", "m_iTargetFade") is not None
+
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("netprops.nut", """
+    local fade = NetProps.GetPropInt(self, "m_iTargetFade");
+    NetProps.SetPropFloat(self, "m_iTargetFade", 1.0);
+    NetProps.GetPropInt(self, "m_iTargetFaed");
+    NetProps.GetPropInt(self, name);
+    """)
+    codes = [msg.code for msg in messages if msg.code]
+    assert codes == ["netprop-kind-mismatch", "unknown-netprop"]
+
+    # Root-scoped calls are the usual VScript form
+    messages = checker.check_file("root.nut", """
+    ::NetProps.GetPropInt(self, "m_iTargetFaed");
+    ::Entities.FindByClassname(null, "tf_playerx");
+    """)
+    codes = [msg.code for msg in messages if msg.code]
+    assert codes == ["unknown-netprop", "unknown-classname"], codes
+
+
+def test_asset_index():
+    """Front-coded asset lists are searched in place, across block boundaries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "assets.idx")
+        models = [f"models/props/crate{i:03}.mdl" for i in range(100)]
+        write_asset_index(path, {"models": models, "sounds": ["#Music/Theme.wav", "ambient/bird1.wav"]})
+
+        index = AssetIndex(path)
+        assert index.count("models") == 100
+        assert all(index.contains("models", name) for name in models)
+        assert index.contains("models", "MODELS\\props\\crate050.mdl")
+        assert not index.contains("models", "models/props/crate100.mdl")
+        assert not index.contains("models", "a.mdl")
+        assert list(index.iter_prefix("models", "models/props/crate09")) == models[90:]
+        assert index.contains("sounds", ")music/theme.wav")
+        assert not index.contains("particles", "anything")
+        index.close()
+
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("assets.nut", """
+    PrecacheModel("models/ambulance.mdl");
+    PrecacheModel("models/ambulanse.mdl");
+    EmitSoundOn("Achievement.Earned", self);
+    self.EmitSound("ambient/bird1.wav");
+    EmitSoundEx({ sound_name: "Not.A.Sound", entity: self });
+    self.SetCustomModel("");
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(3, "unknown-asset"), (6, "unknown-asset")]
+
+
+def test_suggestions():
+    """Misspelled names get the closest vocabulary entries, best first"""
+    assert edit_distance("models/crate.mdl", "models/crates.mdl") == 1
+    assert edit_distance("m_iTargetFaed", "m_iTargetFade") == 2
+    assert edit_distance("abcdef", "uvwxyz", limit=2) == 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "suggest.db")
+        write_suggestion_index(path, {"netprops": ["m_iHealth", "m_iHealth2", "m_flSpeed", "m_iTeamNum"]})
+
+        index = SuggestionIndex(path)
+        assert index.suggest("netprops", "m_iHelth") == ["m_iHealth", "m_iHealth2"]
+        assert index.suggest("netprops", "m_iHelth", limit=1) == ["m_iHealth"]
+        assert index.suggest("netprops", "completely_different") == []
+        assert index.suggest("models", "m_iHealth") == []
+
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("suggest.nut", """
+    NetProps.GetPropInt(self, "m_iTargetFaed");
+    PrecacheModel("models/ambulanse.mdl");
+    """)
+    assert "did you mean 'm_iTargetFade'" in messages[0].message
+    assert "did you mean 'models/ambulance.mdl'" in messages[1].message
+
+
+def test_entity_classnames():
+    """Classname literals are checked against entities.json, wildcards by prefix"""
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("classnames.nut", """
+    local prop = SpawnEntityFromTable("prop_dynamic", {});
+    local maker = Entities.CreateByClassname("env_entity_maker");
+    local weapon = Entities.FindByClassname(null, "tf_weapon_*");
+    local gun = Entities.FindByClassname(null, "tf_weapon_scattergnu");
+    Entities.FindByClassnameNearest("no_such_*", Vector(), 100.0);
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(5, "unknown-classname"), (6, "unknown-classname")]
+    assert [msg.message for msg in messages if msg.code][0].endswith("did you mean 'tf_weapon_scattergun'?")
+
+
+def test_game_event_callbacks():
+    """Callback names and params fields are checked against the event definitions"""
+    checker = SquirrelTypeChecker()
+    params_type = shared_game_event_index().params_type("player_death")
+    assert params_type.field_type("userid") == parse_type("int")
+    assert params_type.field_type("weapon") == parse_type("string")
+
+    messages = checker.check_file("events.nut", """
+    function OnGameEvent_player_death(params) {
+        local victim = GetPlayerFromUserID(params.userid);
+        local weapon = params["weapon"];
+        if (params.atacker) {}
+    }
+    local Events = {
+        function OnGameEvent_player_spwan(params) {},
+        function OnGameEvent_teamplay_round_start(params) { return params.full_reset; }
+    };
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(5, "unknown-event-field"), (8, "unknown-game-event")]
+    messages = [msg.message for msg in messages if msg.code]
+    assert messages[0].endswith("did you mean 'attacker'?")
+    assert "'OnGameEvent_player_spawn'" in messages[1]
+
+    # A nested function's own params is a different table
+    messages = checker.check_file("shadow.nut", """
+    function OnGameEvent_player_death(params) {
+        local f = function(params) { return params.bogus_field }
+        local g = function(other) { return params.bogus_field }
+    }
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(4, "unknown-event-field")], codes
+
+
+def test_constants():
+    """Constants.<Enum>.<NAME> resolve to typed values and unknown names are reported"""
+    index = ConstantIndex()
+    assert index.resolve("ETFCond", "TF_COND_AIMING") == ("int", 0)
+    assert index.resolve("Math", "Pi").squirrel_type == parse_type("float")
+    assert index.value("FButtons", "IN_ATTACK") == 1
+    assert index.resolve("ETFCond", "TF_COND_NOPE") is None
+    assert isinstance(index.enums, frozenset) and "ETFCond" in index.enums
+    assert index.members("ENope") is None
+
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("constants.nut", """
+    local cond = Constants.ETFCond.TF_COND_AIMING;
+    local typo = Constants.ETFCond.TF_COND_AIMNG;
+    local team = Constants.ETFTeams.TF_TEAM_RED;
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(3, "unknown-constant"), (4, "unknown-enum")]
+    messages = [msg.message for msg in messages if msg.code]
+    assert messages[0].endswith("did you mean 'TF_COND_AIMING'?")
+    assert messages[1].endswith("did you mean 'ETFTeam'?")
+
+    messages = checker.check_file("resolved.nut", """
+    local cond = Constants.ETFCond.TF_COND_AIMING;
+    SpawnEntityFromTable("info_target", { targetname: Constants.ETFCond.TF_COND_AIMING });
+    """)
+    assert "Constant 'Constants.ETFCond.TF_COND_AIMING': int = 0" in [msg.message for msg in messages]
+    assert [msg.code for msg in messages if msg.code] == ["keyvalue-kind-mismatch"]
+
+
+def test_string_sets():
+    """Bundled name sets load in one read and back the convar/attribute/I/O checks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sets.bin")
+        write_string_sets(path, {"inputs": ["Kill", "Open", "Kill"], "outputs": []})
+
+        sets = StringSets(path)
+        assert sets.set_names == ["inputs", "outputs"]
+        assert sets.names("inputs") == ("Kill", "Open")
+        assert sets.contains("inputs", "kill")
+        assert not sets.contains("outputs", "OnTrigger")
+        assert not sets.contains("missing", "Kill")
+        assert len(sets.version) == 40
+
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("sets.nut", """
+    Convars.SetValue("sv_gravity", 100);
+    Convars.SetValue("sv_cheats", 1);
+    local gravity = Convars.GetInt("sv_gravty");
+    local cheats = Convars.GetInt("sv_cheats");
+    player.AddAttribute("damage bonsu", 2.0, -1);
+    EntFire("door", "AddOutput", "OnFullyOpen !self:Kil::0:-1");
+    EntFire("door", "AddOutput", "targetname door2");
+    door.AcceptInput("Open", "", null, null);
+    EntityOutputs.AddOutput(door, "OnTriger", "door", "Close", "", 0, -1);
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(3, "convar-not-allowed"), (4, "unknown-convar"), (6, "unknown-attribute"),
+                     (7, "unknown-input"), (10, "unknown-output")]
+
+
+def test_keyvalue_kinds():
+    """KeyValueFrom* setters and spawn tables are checked against the keyvalue kinds"""
+    checker = SquirrelTypeChecker()
+    messages = checker.check_file("keyvalues.nut", """
+    ent.KeyValueFromInt("health", 100);
+    ent.KeyValueFromInt("targetname", 1);
+    ent.KeyValueFromString("origin", "0 0 0");
+    ent.KeyValueFromFloat("origin", 1.0);
+    ent.KeyValueFromString("helth", "1");
+    local prop = SpawnEntityFromTable("prop_dynamic", {
+        model: "models/ambulance.mdl",
+        origin: Vector(1, 2, 3),
+        angles: "0 90 0",
+        health: -5,
+        targetname: Vector(0, 0, 0),
+        OnUser1: "!self,Kill,,0,-1"
+    });
+    """)
+    codes = [(msg.location.line, msg.code) for msg in messages if msg.code]
+    assert codes == [(3, "keyvalue-kind-mismatch"), (5, "keyvalue-kind-mismatch"), (6, "unknown-keyvalue"),
+                     (12, "keyvalue-kind-mismatch")]
+
+
+def test_globals_bundle():
+    """The manifest versions the compiled files together and notices a file that changed"""
+    bundle = GlobalsBundle()
+    assert bundle.available and len(bundle.version) == 40
+    assert set(bundle.components) == set(BUNDLE_FILES)
+    assert bundle.counts["classnames"] > 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in BUNDLE_FILES:
+            shutil.copy(bundle.component_path(name), tmp)
+        version = write_bundle(tmp)
+        assert version == bundle.version
+
+        copy = GlobalsBundle(os.path.join(tmp, "bundle.db"))
+        assert copy.stale_components() == []
+        assert copy.stale_warning() is None
+        write_database(os.path.join(tmp, BUNDLE_FILES["events"]), {"events": {}})
+        assert copy.stale_components() == ["events"]
+
+        # The warning reflects the files as they were when it was first asked for
+        assert GlobalsBundle(os.path.join(tmp, "bundle.db")).stale_warning().startswith("Warning: compiled globals out of date (events")
+        assert copy.stale_warning() is None
+
+
+def test_string_completions_export():
+    """Compiled lists replace their entries in stringCompletions.json; hand-maintained ones stay"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stringCompletions.json")
+        hand = ["!self", "!activator"]
+        with open(path, "w") as f:
+            json.dump([hand if name is None else ["stale"] for name in STRING_COMPLETION_LISTS], f)
+
+        lists = {name: [f"{name}_a", f"{name}_b"] for name in STRING_COMPLETION_LISTS if name}
+        assert export_string_completions(path, lists) == len(lists)
+        assert export_string_completions(path, lists) == 0
+
+        with open(path) as f:
+            completions = json.load(f)
+        assert completions[0] == ["inputs_a", "inputs_b"]
+        assert completions[2] == hand
+
+
+if __name__ == "__main__":
+    for test in (test_database_roundtrip, test_compile_signatures, test_api_loads_lazily, test_netprop_index,
+                 test_asset_index, test_suggestions, test_entity_classnames, test_game_event_callbacks,
+                 test_constants, test_string_sets, test_keyvalue_kinds, test_globals_bundle,
+                 test_string_completions_export):
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the Squirrel type model
+"""
+
+from class_hierarchy import ClassHierarchy
+from profiling import observe_caches
+from squirrel_types import (ClassType, UnionType, OptionalType, make_union, parse_type,
+                            ANY_TYPE, INT_TYPE, STRING_TYPE, NULL_TYPE)
+from squirrel_analyzer import SquirrelTypeChecker
+
+
+def test_class_hierarchy_index():
+    """Ancestor sets answer subclass checks and follow redefinitions"""
+    hierarchy = ClassHierarchy()
+
+    # Bases may be referenced before they are declared
+    hierarchy.define("Student", "Person")
+    hierarchy.define("Person")
+    hierarchy.define("Animal")
+
+    assert hierarchy.is_subclass("Student", "Person")
+    assert hierarchy.is_subclass("Student", "Student")
+    assert not hierarchy.is_subclass("Person", "Student")
+    assert hierarchy.ancestors("Student") == ["Student", "Person"]
+
+    # Rebasing a class updates it and all of its descendants
+    hierarchy.define("Grad", "Student")
+    affected = hierarchy.define("Person", "Animal")
+    assert sorted(hierarchy.names[i] for i in affected) == ["Grad", "Person", "Student"]
+    assert hierarchy.is_subclass("Grad", "Animal")
+
+    # Redefining with the same base is a no-op
+    version = hierarchy.version
+    assert hierarchy.define("Person", "Animal") == []
+    assert hierarchy.version == version
+
+    try:
+        hierarchy.define("Animal", "Grad")
+        assert False, "Cyclic inheritance should be rejected"
+    except ValueError:
+        pass
+
+
+def test_class_type_assignability():
+    """Indexed ClassTypes use the hierarchy, plain ones walk base_class"""
+    hierarchy = ClassHierarchy()
+    hierarchy.define("Base")
+    hierarchy.define("Derived", "Base")
+
+    base = ClassType("Base", hierarchy=hierarchy)
+    derived = ClassType("Derived", hierarchy=hierarchy)
+    assert derived.is_assignable_to(base)
+    assert not base.is_assignable_to(derived)
+    assert derived.is_assignable_to(ANY_TYPE)
+
+    plain_base = ClassType("Base")
+    plain_derived = ClassType("Derived", base_class=plain_base)
+    assert plain_derived.is_assignable_to(plain_base)
+
+
+def test_checker_registers_classes():
+    """The checker indexes classes across files"""
+    checker = SquirrelTypeChecker()
+    checker.check_file("a.nut", "class Person { name = null; }")
+    checker.check_file("b.nut", "class Student extends Person { id = null; }")
+
+    student = checker.class_types["Student"]
+    person = checker.class_types["Person"]
+    assert student.base_class is person
+    assert student.is_assignable_to(person)
+    assert checker.symbol_table.lookup("Student").type is student
+
+
+def test_flattened_member_tables():
+    """Member tables include inherited members and follow ancestor changes"""
+    checker = SquirrelTypeChecker()
+    checker.check_file("people.nut", """
+    class Person {
+        name: string;
+        grades: array<int>;
+        constructor(name: string) { this.name = name; }
+        function addGrade(grade: int): void { this.grades.append(grade); }
+    }
+    class Student extends Person {
+        id: int;
+    }
+    """)
+
+    student = checker.class_types["Student"]
+    assert str(student.lookup_member("grades")) == "array<int>"
+    assert str(student.lookup_member("addGrade")) == "(int) -> null"
+    assert str(student.lookup_member("constructor")) == "(string) -> Person"
+    assert student.lookup_member("id") is not None
+    assert student.member_table() is student.member_table()
+
+    # Redefining an ancestor invalidates the cached table of its subclasses
+    checker.check_file("people.nut", "class Person { nickname: string; }")
+    assert student.lookup_member("grades") is None
+    assert str(student.lookup_member("nickname")) == "string"
+
+    # Lookups report whether the flattened table was reused; a rebuild reuses the base's table
+    student.invalidate_members()
+    lookups = []
+    observe_caches(lambda cache, key, hit: lookups.append((cache, key, hit)))
+    try:
+        student.lookup_member("id")
+        student.lookup_member("nickname")
+    finally:
+        observe_caches(None)
+    assert lookups == [("members", "Student", False), ("members", "Person", True), ("members", "Student", True)], lookups
+
+
+def test_canonical_unions():
+    """Unions are flattened, deduplicated, sorted and fold null into optionals"""
+    nested = UnionType([STRING_TYPE, UnionType([INT_TYPE, STRING_TYPE])])
+    assert nested.types == (INT_TYPE, STRING_TYPE)
+    assert nested == UnionType([INT_TYPE, STRING_TYPE])
+
+    assert make_union([INT_TYPE, ANY_TYPE]) is ANY_TYPE
+    assert make_union([INT_TYPE, INT_TYPE]) is INT_TYPE
+    assert make_union([NULL_TYPE]) is NULL_TYPE
+
+    optional = make_union([INT_TYPE, NULL_TYPE])
+    assert isinstance(optional, OptionalType) and optional.inner_type is INT_TYPE
+    assert str(parse_type("string|null|int")) == "(int | string)?"
+    assert str(parse_type("array<int>|array<any>")) == "array<any>"
+
+    # Subclasses are subsumed by their bases
+    hierarchy = ClassHierarchy()
+    hierarchy.define("Base")
+    hierarchy.define("Derived", "Base")
+    base = ClassType("Base", hierarchy=hierarchy)
+    derived = ClassType("Derived", hierarchy=hierarchy)
+    assert make_union([derived, base]) is base
+
+    # Members are assignable to the unions that contain them
+    assert INT_TYPE.is_assignable_to(parse_type("int|string"))
+    assert NULL_TYPE.is_assignable_to(parse_type("int|null"))
+    assert not parse_type("int|string").is_assignable_to(INT_TYPE)
+
+
+if __name__ == "__main__":
+    for test in (test_class_hierarchy_index, test_class_type_assignability, test_checker_registers_classes,
+                 test_flattened_member_tables, test_canonical_unions):
+        test()
+        print(f"✓ {test.__name__}")
@@ -7,11 +7,12 @@ from Squirrel source code by walking the parse tree.
 """
 
 from typing import Dict, List, Optional, Set, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from antlr4 import *
 from SquirrelParserParser import SquirrelParserParser
 from SquirrelParserListener import SquirrelParserListener
 from squirrel_types import *
+from profiling import Profiler, count_nodes, profiler_or_null
 
 
 @dataclass
@@ -35,6 +36,7 @@ class FunctionInfo:
     return_type: Optional[str]
     location: tuple  # (line, column)
     scope: str
+    body: Any = field(default=None, repr=False, compare=False)  # functionBody parse context
 
 
 @dataclass
@@ -48,6 +50,132 @@ class ClassInfo:
     location: tuple  # (line, column)
 
 
+@dataclass
+class CallInfo:
+    """Information about a call expression"""
+    callee: str  # callee expression text without a leading '::', e.g. 'NetProps.GetPropInt'
+    arguments: List[str]  # argument expression texts
+    literals: List[Optional[str]]  # value of each argument that is a plain string literal
+    argument_locations: List[tuple]  # (line, column) of each argument
+    location: tuple  # (line, column)
+    scope: str
+    argument_nodes: List[Any] = field(default_factory=list, repr=False, compare=False)
+
+    @property
+    def method(self) -> str:
+        """Last segment of the callee, e.g. 'GetPropInt'"""
+        return self.callee.rsplit('.', 1)[-1]
+
+
+@dataclass
+class ConstantInfo:
+    """Information about a Constants.<Enum>.<NAME> reference"""
+    enum: str
+    name: str
+    location: tuple  # (line, column) of the enum name
+    name_location: tuple  # (line, column) of the constant name
+    scope: str
+
+
+def string_literal_value(expression_ctx) -> Optional[str]:
+    """Return the value of an expression that is nothing but a string literal"""
+    ctx = expression_ctx
+    while ctx is not None and not isinstance(ctx, SquirrelParserParser.LiteralContext):
+        if ctx.getChildCount() != 1 or not isinstance(ctx.getChild(0), ParserRuleContext):
+            return None
+        ctx = ctx.getChild(0)
+    if ctx is None or not ctx.STRING():
+        return None
+
+    text = ctx.STRING().getText()
+    if text.startswith('@"'):
+        return text[2:-1].replace('""', '"')
+    return text[1:-1].replace('\\"', '"').replace("\\'", "'")
+
+
+def literal_kind(expression_ctx) -> Optional[str]:
+    """Return 'number', 'bool', 'string', 'null' or 'vector' for literal-like expressions (-1, "a", Vector(...))"""
+    ctx = expression_ctx
+    while ctx is not None:
+        if isinstance(ctx, SquirrelParserParser.LiteralContext):
+            if ctx.STRING():
+                return "string"
+            scalar = ctx.scalar()
+            if scalar.INTEGER() or scalar.FLOAT():
+                return "number"
+            return "null" if scalar.NULL() else "bool"
+        if isinstance(ctx, SquirrelParserParser.UnaryExpressionContext) and (ctx.MINUS() or ctx.PLUS()):
+            ctx = ctx.unaryExpression()
+            continue
+        if isinstance(ctx, SquirrelParserParser.PostfixExpressionContext) and ctx.LPAREN():
+            return "vector" if ctx.postfixExpression().getText() == "Vector" else None
+        if ctx.getChildCount() != 1 or not isinstance(ctx.getChild(0), ParserRuleContext):
+            return None
+        ctx = ctx.getChild(0)
+    return None
+
+
+def table_literal_members(expression_ctx) -> Optional[Dict[str, Any]]:
+    """Return {key: value expression} of an expression that is nothing but a table literal"""
+    ctx = expression_ctx
+    while ctx is not None and not isinstance(ctx, SquirrelParserParser.TableLiteralContext):
+        if ctx.getChildCount() != 1 or not isinstance(ctx.getChild(0), ParserRuleContext):
+            return None
+        ctx = ctx.getChild(0)
+    if ctx is None:
+        return None
+
+    members = {}
+    for member in ctx.tableMember():
+        if member.FUNCTION() or not member.expression():
+            continue
+        if member.identifier():
+            key = member.identifier().getText()
+        elif member.STRING():
+            key = member.STRING().getText()[1:-1]
+        else:
+            key = string_literal_value(member.expression(0))
+            if key is None:
+                continue
+        members[key] = member.expression()[-1]
+    return members
+
+
+def declares_parameter(ctx, name: str) -> bool:
+    """Whether ctx is a function, method or constructor with a parameter called name"""
+    parameter_list = ctx.parameterList() if hasattr(ctx, "parameterList") else None
+    if parameter_list is None:
+        return False
+    return any(param.identifier() is not None and param.identifier().getText() == name
+               for param in parameter_list.parameter())
+
+
+def member_accesses(root_ctx, object_name: str) -> List[tuple]:
+    """
+    Return (member, (line, column)) of every object_name.member / object_name["member"] under root_ctx
+
+    Nested functions whose own parameter shadows object_name are skipped.
+    """
+    accesses = []
+    pending = [root_ctx]
+    while pending:
+        ctx = pending.pop()
+        if ctx is not root_ctx and declares_parameter(ctx, object_name):
+            continue
+        if isinstance(ctx, SquirrelParserParser.PostfixExpressionContext) and ctx.postfixExpression() \
+                and ctx.postfixExpression().getText() == object_name:
+            if ctx.DOT():
+                member = ctx.identifier()
+                accesses.append((member.getText(), (member.start.line, member.start.column)))
+            elif ctx.LBRACKET():
+                key = string_literal_value(ctx.expression())
+                if key is not None:
+                    accesses.append((key, (ctx.expression().start.line, ctx.expression().start.column)))
+        if isinstance(ctx, ParserRuleContext) and ctx.children:
+            pending.extend(reversed(ctx.children))
+    return accesses
+
+
 class TypeExtractionListener(SquirrelParserListener):
     """
     ANTLR Listener that walks the parse tree and extracts type information
@@ -57,6 +185,8 @@ class TypeExtractionListener(SquirrelParserListener):
         self.variables: List[VariableInfo] = []
         self.functions: List[FunctionInfo] = []
         self.classes: List[ClassInfo] = []
+        self.calls: List[CallInfo] = []
+        self.constants: List[ConstantInfo] = []
         self.current_scope = ["global"]
         self.current_class: Optional[ClassInfo] = None
         self.current_function: Optional[FunctionInfo] = None
@@ -87,6 +217,42 @@ class TypeExtractionListener(SquirrelParserListener):
             return text
         return str(type_annotation_ctx)
     
+    def extract_parameters(self, parameter_list_ctx, scope: str) -> List[VariableInfo]:
+        """Extract the parameters of a function declaration"""
+        parameters = []
+        if parameter_list_ctx:
+            for param_ctx in parameter_list_ctx.parameter():
+                if param_ctx.VARPARAMS():
+                    # Handle varargs ...
+                    param_info = VariableInfo(
+                        name="...",
+                        type_annotation="varargs",
+                        location=self.get_location(param_ctx),
+                        scope=scope,
+                        is_parameter=True
+                    )
+                else:
+                    param_name = param_ctx.identifier().getText()
+                    param_type = None
+                    if param_ctx.typeAnnotation():
+                        param_type = self.extract_type_annotation(param_ctx.typeAnnotation())
+                    
+                    default_value = None
+                    if param_ctx.expression():
+                        default_value = param_ctx.expression().getText()
+                    
+                    param_info = VariableInfo(
+                        name=param_name,
+                        type_annotation=param_type,
+                        location=self.get_location(param_ctx),
+                        scope=scope,
+                        is_parameter=True,
+                        default_value=default_value
+                    )
+                
+                parameters.append(param_info)
+        return parameters
+    
     # Local variable declarations
     def enterLocalDeclStatement(self, ctx: SquirrelParserParser.LocalDeclStatementContext):
         """Handle local variable declarations: local name: type = value"""
@@ -116,40 +282,7 @@ class TypeExtractionListener(SquirrelParserListener):
     def enterFunctionStatement(self, ctx: SquirrelParserParser.FunctionStatementContext):
         """Handle function declarations: function name(params): returnType { ... }"""
         func_name = ctx.identifier().getText()
-        
-        # Extract parameters
-        parameters = []
-        if ctx.parameterList():
-            for param_ctx in ctx.parameterList().parameter():
-                if param_ctx.VARPARAMS():
-                    # Handle varargs ...
-                    param_info = VariableInfo(
-                        name="...",
-                        type_annotation="varargs",
-                        location=self.get_location(param_ctx),
-                        scope=f"{self.get_current_scope()}.{func_name}",
-                        is_parameter=True
-                    )
-                else:
-                    param_name = param_ctx.identifier().getText()
-                    param_type = None
-                    if param_ctx.typeAnnotation():
-                        param_type = self.extract_type_annotation(param_ctx.typeAnnotation())
-                    
-                    default_value = None
-                    if param_ctx.expression():
-                        default_value = param_ctx.expression().getText()
-                    
-                    param_info = VariableInfo(
-                        name=param_name,
-                        type_annotation=param_type,
-                        location=self.get_location(param_ctx),
-                        scope=f"{self.get_current_scope()}.{func_name}",
-                        is_parameter=True,
-                        default_value=default_value
-                    )
-                
-                parameters.append(param_info)
+        parameters = self.extract_parameters(ctx.parameterList(), f"{self.get_current_scope()}.{func_name}")
         
         # Extract return type
         return_type = None
@@ -161,7 +294,8 @@ class TypeExtractionListener(SquirrelParserListener):
             parameters=parameters,
             return_type=return_type,
             location=self.get_location(ctx),
-            scope=self.get_current_scope()
+            scope=self.get_current_scope(),
+            body=ctx.functionBody()
         )
         
         self.functions.append(func_info)
@@ -173,6 +307,34 @@ class TypeExtractionListener(SquirrelParserListener):
         self.current_scope.pop()
         self.current_function = None
     
+    # Functions declared inside table literals: { function name(params) { ... } }
+    def enterTableMember(self, ctx: SquirrelParserParser.TableMemberContext):
+        """Handle table member functions"""
+        if not ctx.FUNCTION():
+            return
+        func_name = ctx.identifier().getText()
+        
+        return_type = None
+        if ctx.typeAnnotation():
+            return_type = self.extract_type_annotation(ctx.typeAnnotation())
+        
+        func_info = FunctionInfo(
+            name=func_name,
+            parameters=self.extract_parameters(ctx.parameterList(), f"{self.get_current_scope()}.{func_name}"),
+            return_type=return_type,
+            location=self.get_location(ctx),
+            scope=self.get_current_scope(),
+            body=ctx.functionBody()
+        )
+        
+        self.functions.append(func_info)
+        self.current_scope.append(func_name)
+    
+    def exitTableMember(self, ctx: SquirrelParserParser.TableMemberContext):
+        """Exit table member function scope"""
+        if ctx.FUNCTION():
+            self.current_scope.pop()
+    
     # Class declarations
     def enterClassStatement(self, ctx: SquirrelParserParser.ClassStatementContext):
         """Handle class declarations: class Name extends Base { ... }"""
@@ -180,7 +342,8 @@ class TypeExtractionListener(SquirrelParserListener):
         
         base_class = None
         if ctx.expression():  # extends clause
-            base_class = ctx.expression().getText()
+            # "extends ::Base" names the same class as "extends Base"
+            base_class = ctx.expression().getText().removeprefix("::")
         
         class_info = ClassInfo(
             name=class_name,
@@ -272,7 +435,8 @@ class TypeExtractionListener(SquirrelParserListener):
             parameters=parameters,
             return_type=None,  # Constructors don't have return types
             location=self.get_location(ctx),
-            scope=self.get_current_scope()
+            scope=self.get_current_scope(),
+            body=ctx.functionBody()
         )
         
         self.current_class.constructor = constructor_info
@@ -334,7 +498,8 @@ class TypeExtractionListener(SquirrelParserListener):
             parameters=parameters,
             return_type=return_type,
             location=self.get_location(ctx),
-            scope=self.get_current_scope()
+            scope=self.get_current_scope(),
+            body=ctx.functionBody()
         )
         
         self.current_class.methods.append(method_info)
@@ -344,6 +509,44 @@ class TypeExtractionListener(SquirrelParserListener):
         """Exit method scope"""
         if len(self.current_scope) > 1:
             self.current_scope.pop()
+    
+    # Call expressions and constant references
+    def enterPostfixExpression(self, ctx: SquirrelParserParser.PostfixExpressionContext):
+        """Handle calls: callee(arguments) and Constants.Enum.NAME"""
+        if ctx.DOT():
+            self.record_constant(ctx)
+            return
+        if not ctx.LPAREN() or not ctx.postfixExpression():
+            return
+        
+        arguments = ctx.argumentList().expression() if ctx.argumentList() else []
+        
+        call_info = CallInfo(
+            # ::NetProps.GetPropInt is the same root-table function as NetProps.GetPropInt
+            callee=ctx.postfixExpression().getText().removeprefix("::"),
+            arguments=[arg.getText() for arg in arguments],
+            literals=[string_literal_value(arg) for arg in arguments],
+            argument_locations=[self.get_location(arg) for arg in arguments],
+            location=self.get_location(ctx),
+            scope=self.get_current_scope(),
+            argument_nodes=list(arguments)
+        )
+        
+        self.calls.append(call_info)
+    
+    def record_constant(self, ctx: SquirrelParserParser.PostfixExpressionContext):
+        """Record Constants.Enum.NAME member accesses"""
+        enum_ctx = ctx.postfixExpression()
+        if not enum_ctx.DOT() or enum_ctx.postfixExpression().getText().removeprefix("::") != "Constants":
+            return
+        
+        self.constants.append(ConstantInfo(
+            enum=enum_ctx.identifier().getText(),
+            name=ctx.identifier().getText(),
+            location=self.get_location(enum_ctx.identifier()),
+            name_location=self.get_location(ctx.identifier()),
+            scope=self.get_current_scope()
+        ))
 
 
 class SquirrelTypeExtractor:
@@ -355,40 +558,53 @@ class SquirrelTypeExtractor:
     def __init__(self):
         self.listener = TypeExtractionListener()
     
-    def extract_from_string(self, source_code: str) -> Dict[str, Any]:
+    def extract_from_string(self, source_code: str, profiler: Optional[Profiler] = None) -> Dict[str, Any]:
         """
         Extract type information from source code string
+
+        profiler, when given, times the lex, parse and walk phases separately and counts tokens
+        and parse-tree nodes.
         
         Returns:
             Dict containing variables, functions, and classes with their type info
         """
+        profiler = profiler_or_null(profiler)
         try:
-            # Create ANTLR input stream
-            input_stream = InputStream(source_code)
-            
-            # Create lexer
-            from SquirrelParserLexer import SquirrelParserLexer
-            lexer = SquirrelParserLexer(input_stream)
-            
-            # Create token stream
-            token_stream = CommonTokenStream(lexer)
-            
-            # Create parser
-            from SquirrelParserParser import SquirrelParserParser
-            parser = SquirrelParserParser(token_stream)
+            with profiler.phase("lex"):
+                # Create ANTLR input stream
+                input_stream = InputStream(source_code)
+                
+                # Create lexer
+                from SquirrelParserLexer import SquirrelParserLexer
+                lexer = SquirrelParserLexer(input_stream)
+                
+                # Create token stream, lexed up front so the parse phase is only parsing
+                token_stream = CommonTokenStream(lexer)
+                token_stream.fill()
             
-            # Parse the program
-            tree = parser.program()
+            with profiler.phase("parse"):
+                # Create parser
+                parser = SquirrelParserParser(token_stream)
+                
+                # Parse the program
+                tree = parser.program()
             
             # Walk the tree with our listener
-            walker = ParseTreeWalker()
-            walker.walk(self.listener, tree)
+            with profiler.phase("walk"):
+                walker = ParseTreeWalker()
+                walker.walk(self.listener, tree)
+
+            if profiler.enabled:
+                profiler.count("tokens", len(token_stream.tokens))
+                profiler.count("parse_nodes", count_nodes(tree))
             
             return {
                 "success": True,
                 "variables": self.listener.variables,
                 "functions": self.listener.functions,
                 "classes": self.listener.classes,
+                "calls": self.listener.calls,
+                "constants": self.listener.constants,
                 "error": None
             }
             
@@ -398,6 +614,8 @@ class SquirrelTypeExtractor:
                 "variables": [],
                 "functions": [],
                 "classes": [],
+                "calls": [],
+                "constants": [],
                 "error": str(e)
             }
     
@@ -415,6 +633,8 @@ class SquirrelTypeExtractor:
                 "variables": [],
                 "functions": [],
                 "classes": [],
+                "calls": [],
+                "constants": [],
                 "error": f"Error reading file: {str(e)}"
             }
     
@@ -0,0 +1,123 @@
+""" Lazily loaded VScript API types from the precompiled signature database """
+
+import os
+from typing import Iterator, Mapping, Optional
+
+from class_hierarchy import ClassHierarchy
+from globals_db import DATA_DIR, GlobalsDatabase
+from squirrel_types import *
+
+API_DATABASE_PATH = os.path.join(DATA_DIR, "vscript_api.db")
+
+
+class _ApiClassNames(Mapping):
+
+    """ Class names seen by parse_type; a class is only materialized when a signature names it """
+
+    def __init__(self, api: 'VScriptApi'):
+        self.api = api
+
+    def __getitem__(self, name: str) -> SquirrelType:
+        if name not in self.api.classes:
+            raise KeyError(name)
+        return self.api.class_type(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self.api.classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.api.classes)
+
+    def __len__(self) -> int:
+        return len(self.api.classes)
+
+
+class VScriptApi:
+
+    """
+    Types of the engine classes, singletons and global functions
+
+    Referencing a class creates its ClassType (and its bases); the method signatures of a class
+    are only decoded when one of its members is first looked up. Global functions are decoded
+    one by one as they are referenced.
+    """
+
+    def __init__(self, path: str = API_DATABASE_PATH, hierarchy: Optional[ClassHierarchy] = None):
+
+        self.db = GlobalsDatabase(path)
+        self.hierarchy = hierarchy if hierarchy is not None else ClassHierarchy()
+        self.class_types: dict[str, ClassType] = {}
+        self.global_types: dict[str, FunctionType] = {}
+        self.named_types = _ApiClassNames(self)
+
+    @property
+    def available(self) -> bool:
+        return self.db.available
+
+    @property
+    def classes(self) -> dict[str, Optional[str]]:
+        return self.db.get("classes", {}) if self.db.available else {}
+
+    def lookup(self, name: str) -> Optional[SquirrelType]:
+
+        """ Type of a global name: an API class, a singleton instance or a global function """
+
+        if not self.db.available:
+            return None
+        if name in self.classes:
+            return self.class_type(name)
+        instance_class = self.db.get("instances", {}).get(name)
+        if instance_class:
+            return self.class_type(instance_class)
+        return self.global_function(name)
+
+    def class_type(self, name: str) -> ClassType:
+
+        """ ClassType of an API class; members are loaded on first member lookup """
+
+        class_type = self.class_types.get(name)
+        if class_type is not None:
+            return class_type
+
+        class_type = ClassType(name, hierarchy=self.hierarchy)
+        class_type.member_loader = self._load_members
+        self.class_types[name] = class_type
+
+        base = self.classes.get(name)
+        if base and base in self.classes:
+            self.hierarchy.define(name, base)
+            class_type.base_class = self.class_type(base)
+        else:
+            self.hierarchy.define(name)
+
+        return class_type
+
+    def global_function(self, name: str) -> Optional[FunctionType]:
+
+        """ FunctionType of a global function, decoded on first reference """
+
+        function_type = self.global_types.get(name)
+        if function_type is None:
+            entry = self.db.get("globals", {}).get(name)
+            if entry is None:
+                return None
+            function_type = self.function_type(entry)
+            self.global_types[name] = function_type
+        return function_type
+
+    def function_type(self, entry: tuple) -> FunctionType:
+
+        """ Build a FunctionType from a compiled (params, return type, obsolete) entry """
+
+        params, return_type, _ = entry
+        param_types = [parse_type(param_type, self.named_types) for _, param_type, _ in params]
+        return FunctionType(param_types, parse_type(return_type, self.named_types))
+
+    def _load_members(self, class_type: ClassType) -> None:
+
+        data = self.db.get(f"class:{class_type.name}")
+        if data is None:
+            return
+        members = {name: self.function_type(entry) for name, entry in data["methods"].items()}
+        constructor = self.function_type(data["constructor"]) if data["constructor"] else None
+        class_type.set_members(members, constructor)